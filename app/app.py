@@ -1,10 +1,21 @@
 # CÓDIGO FINAL E DEFINITIVO com tudo na página principal
 import streamlit as st
-import pandas as pd
-import joblib
 from google.oauth2 import service_account
 import gcsfs
-import re
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.artifacts import carregar_artefatos_app, carregar_em_segundo_plano
+from src.embedding_cache import ArmazemEmbeddings, DIRETORIO_CACHE_PADRAO
+from src.embeddings import CodificadorTexto
+from src.feature_engineering import ExtratorSkills, calcular_similaridade_pareada
+from src.encoder import COLUNAS_ORIGEM_VAGA
+from src.explanations import TOP_K_PADRAO, explicacao_candidato, explicar_ranking, resumo_explicacoes, top_k_do_ranking
+from src.instrumentation import esta_ativa, medir, novo_registro
+from src.ranking import obter_ranking, pontuar_candidatos
+from src.recommendations import PERCENTUAL_TOP_PADRAO, recomendacoes_da_vaga
+from src.service import URL_SERVICO_PADRAO, ClienteServico
 
 # --- Configuração da Página e Funções ---
 st.set_page_config(
@@ -14,9 +25,16 @@ st.set_page_config(
     initial_sidebar_state="collapsed" # Esconde a barra lateral por padrão
 )
 
+# Painel de depuração escondido: ?debug=1 na URL mede os reruns desta sessão (só dela: a
+# medição liga no registro do rerun, não no processo); DECISION_INSTRUMENTACAO=1 liga para todas
+if st.query_params.get('debug') == '1':
+    st.session_state['modo_depuracao'] = True
+modo_depuracao = st.session_state.get('modo_depuracao', False) or esta_ativa()
+registro_rerun = novo_registro(ativo=modo_depuracao)
+
 @st.cache_resource
 def load_artifacts_from_gcs(bucket_name):
-    # ... (esta função está correta, não muda) ...
+    """Carrega os artefatos do app a partir do cache local, revalidado contra o bucket."""
     try:
         with st.spinner("🔐 Autenticando com Google Cloud..."):
             creds_info = st.secrets["gcs_credentials"]
@@ -26,51 +44,82 @@ def load_artifacts_from_gcs(bucket_name):
             ]
             creds = service_account.Credentials.from_service_account_info(creds_info, scopes=scopes)
             gcs = gcsfs.GCSFileSystem(project=creds_info['project_id'], token=creds)
-        
-        caminho_modelo_gcs = f"gs://{bucket_name}/models/recruitment_model.joblib"
-        caminho_colunas_gcs = f"gs://{bucket_name}/models/model_columns.joblib"
-        caminho_dataset_gcs = f"gs://{bucket_name}/data/df_mestre_preprocessado.parquet"
 
+        # Downloads em paralelo, só do que mudou no bucket; o dataset compacto não traz os CVs para a memória
         with st.spinner("📦 Carregando modelo, colunas e dataset do GCS..."):
-            with gcs.open(caminho_modelo_gcs, 'rb') as f:
-                model = joblib.load(f)
-            with gcs.open(caminho_colunas_gcs, 'rb') as f:
-                model_columns = joblib.load(f)
-            df_app = pd.read_parquet(caminho_dataset_gcs, filesystem=gcs)
-        
-        # Carregando o modelo de linguagem para a otimização de CV
-        from sentence_transformers import SentenceTransformer
-        lang_model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
+            artefatos = carregar_artefatos_app(gcs, f"gs://{bucket_name}")
 
-        return model, model_columns, df_app, lang_model
+        return (artefatos['modelo'], artefatos['codificador'], artefatos['dataset_app'],
+                artefatos['indice_ranking'], artefatos['buscador_candidatos'])
     except Exception as e:
         st.error(f"❌ Erro fatal ao carregar artefatos do GCS: {e}")
-        return None, None, None, None
-
-def gerar_recomendacoes_vaga(df_ranked, top_n_percent=0.20):
-    # ... (esta função está correta, não muda) ...
-    if df_ranked.empty:
-        return [], []
-    top_candidates = df_ranked.head(max(1, int(len(df_ranked) * top_n_percent)))
-    skill_columns = [col for col in top_candidates.columns if col.startswith('skill_')]
-    skill_counts = top_candidates[skill_columns].sum()
-    frequent_skills = skill_counts[skill_counts > 0].sort_values(ascending=False)
-    if frequent_skills.empty:
-        return [], []
-    vaga_text = (str(df_ranked['principais_atividades'].iloc[0]) + " " + str(df_ranked['competencia_tecnicas_e_comportamentais'].iloc[0])).lower()
-    recomendacoes = []
-    common_skills_list = frequent_skills.index.str.replace('skill_', '').str.replace('_', ' ').tolist()
-    for skill_name in common_skills_list:
-        if not re.search(r'\b' + re.escape(skill_name) + r'\b', vaga_text, re.IGNORECASE):
-            recomendacoes.append(skill_name.title())
-    return common_skills_list, recomendacoes
+        return None, None, None, None, None
+
+@st.cache_resource
+def load_language_model():
+    """Modelo de linguagem carregado em segundo plano: o Ranking fica disponível antes dele.
+
+    O modo do backend (fp32/int8, janelas) vem de DECISION_EMBEDDINGS_MODO e DECISION_EMBEDDINGS_JANELAS.
+    """
+    return carregar_em_segundo_plano(CodificadorTexto)
+
+def obter_language_model():
+    """Espera o carregamento em segundo plano (só nas abas que usam embeddings)."""
+    futuro = load_language_model()
+    try:
+        if not futuro.done():
+            with st.spinner("Carregando modelo de linguagem... (pode levar um minuto)"):
+                return futuro.result()
+        return futuro.result()
+    except Exception as e:
+        st.error(f"❌ Erro ao carregar o modelo de linguagem: {e}")
+        st.stop()
+
+@st.cache_resource
+def load_embedding_cache(identificador):
+    """Cache de embeddings compartilhado entre sessões (e com o retreino, se no mesmo disco), por modo do backend."""
+    return ArmazemEmbeddings(identificador, diretorio=DIRETORIO_CACHE_PADRAO)
+
+@st.cache_resource
+def load_cliente_servico():
+    """Cliente do serviço de pontuação (DECISION_SERVICO_URL), compartilhado entre sessões; None sem serviço."""
+    return ClienteServico(URL_SERVICO_PADRAO) if URL_SERVICO_PADRAO else None
+
+def codificar_textos(textos, persistir=True):
+    """Embeddings pelo serviço, se configurado; senão (ou se ele falhar) no próprio processo."""
+    def codificar_local():
+        lang_model = obter_language_model()
+        return load_embedding_cache(lang_model.identificador).codificar(textos, lang_model, persistir=persistir)
+    if cliente_servico is not None:
+        return cliente_servico.codificar(textos, codificar_local)
+    return codificar_local()
+
+@st.cache_resource
+def load_extrator_skills(colunas_modelo):
+    """Extrator de habilidades (uma passada por texto) com o vocabulário do modelo."""
+    return ExtratorSkills.das_colunas(colunas_modelo)
+
+@st.cache_data
+def recomendacoes_online(vaga, assinatura, _df_resultados, _extrator, percentual_top):
+    """Recomendações de uma vaga ranqueada na hora; recalculadas quando as candidaturas mudam."""
+    return recomendacoes_da_vaga(_df_resultados, _extrator, percentual_top)
+
+@st.cache_data
+def explicacoes_online(vaga, assinatura, _df_resultados, _model, _codificador):
+    """Contribuições TreeSHAP de uma vaga ranqueada na hora, em um lote com todas as candidaturas."""
+    return explicar_ranking(_df_resultados, _model, _codificador, TOP_K_PADRAO)
 
 # --- Interface Principal ---
 st.image("https://pos.fiap.com.br/wp-content/uploads/2022/07/pos-tech-fiap.svg", width=250)
 st.title("🤖 Decision AI: Otimizador de Recrutamento")
 
 BUCKET = "datathon-decision-ai-bolanos" 
-model, model_columns, df_app, lang_model = load_artifacts_from_gcs(BUCKET)
+with medir('artefatos'):
+    model, codificador, dataset_app, indice_ranking, buscador_candidatos = load_artifacts_from_gcs(BUCKET)
+cliente_servico = load_cliente_servico()
+pontuador = cliente_servico.pontuar if cliente_servico is not None else pontuar_candidatos
+if cliente_servico is None:
+    load_language_model()  # dispara o carregamento em segundo plano
 
 with st.expander("ℹ️ Sobre o Projeto e Modelo", expanded=True): # expanded=True para que apareça aberto por padrão
     st.header("Datathon")
@@ -91,17 +140,41 @@ with st.expander("ℹ️ Sobre o Projeto e Modelo", expanded=True): # expanded=T
         st.metric("Recall (Contratados)", "51%")
     st.caption("Apoiado por Streamlit e Google Cloud.")
     
-if model is None or df_app is None or lang_model is None:
+if model is None or dataset_app is None:
     st.error("A aplicação não pôde ser iniciada. Verifique os erros de carregamento acima.")
     st.stop()
 
-if 'titulo_vaga' in df_app.columns:
+extrator_skills = load_extrator_skills(tuple(codificador.colunas))
+
+if 'titulo_vaga' in dataset_app.columns:
     st.markdown("---")
-    lista_vagas = sorted(df_app['titulo_vaga'].astype(str).unique())
-    vaga_selecionada = st.selectbox("**Selecione uma Vaga para Análise:**", options=lista_vagas, index=0)
+    # Lista de vagas e intervalos de linhas vêm prontos no dataset do app
+    vaga_selecionada = st.selectbox("**Selecione uma Vaga para Análise:**", options=dataset_app.lista_vagas, index=0)
 
     if vaga_selecionada:
-        df_filtrado_vaga = df_app[df_app['titulo_vaga'] == vaga_selecionada].copy()
+        # Vem do índice pré-calculado (memory-map); no fallback, pontua a fatia da vaga no dataset.
+        # A assinatura das candidaturas (e não só a contagem) diz se o índice ainda vale para a vaga
+        assinatura_vaga = dataset_app.assinatura(vaga_selecionada)
+        with medir('ranking') as medicao:
+            df_resultados, veio_do_indice = obter_ranking(
+                vaga_selecionada, indice_ranking,
+                lambda: dataset_app.candidaturas_da_vaga(vaga_selecionada),
+                model, codificador, assinatura=assinatura_vaga, pontuador=pontuador,
+            )
+            medicao.definir_linhas(len(df_resultados))
+        # Recomendações da aba "Otimizar Vaga": prontas no índice; no fallback, calculadas uma vez por vaga/assinatura
+        # (a contagem faz o papel da assinatura em datasets gravados antes delas)
+        with medir('otimizar_vaga'):
+            percentual_top = indice_ranking.percentual_top if indice_ranking is not None else PERCENTUAL_TOP_PADRAO
+            recomendacoes_vaga = indice_ranking.recomendacoes(vaga_selecionada) if veio_do_indice else None
+            if recomendacoes_vaga is None:
+                recomendacoes_vaga = recomendacoes_online(vaga_selecionada, assinatura_vaga or len(df_resultados), df_resultados, extrator_skills, percentual_top)
+        # Explicações do match score: gravadas no índice; no fallback, um lote por vaga/assinatura
+        with medir('explicacoes', len(df_resultados)):
+            if not top_k_do_ranking(df_resultados) and not df_resultados.empty:
+                df_resultados = df_resultados.join(explicacoes_online(vaga_selecionada, assinatura_vaga or len(df_resultados), df_resultados, model, codificador))
+            if top_k_do_ranking(df_resultados):
+                df_resultados['principais_fatores'] = resumo_explicacoes(df_resultados, codificador.colunas)
         
         tab_ranking, tab_otimiza_vaga, tab_otimiza_cv = st.tabs([
             "🏆 Ranking de Candidatos", 
@@ -112,19 +185,8 @@ if 'titulo_vaga' in df_app.columns:
         with tab_ranking:
             # ... (código da aba de ranking, sem alterações) ...
             st.header(f"Ranking para: {vaga_selecionada}")
-            
-            colunas_categoricas = ['nivel profissional', 'nivel_academico', 'nivel_ingles', 'nivel_espanhol', 'vaga_sap', 'tipo_contratacao']
-            colunas_categoricas_existentes = [col for col in colunas_categoricas if col in df_filtrado_vaga.columns]
-            df_pred_processed = pd.get_dummies(df_filtrado_vaga, columns=colunas_categoricas_existentes, prefix=colunas_categoricas_existentes)
-            for col in model_columns:
-                if col in df_pred_processed.columns and df_pred_processed[col].dtype == 'object':
-                    df_pred_processed[col] = pd.to_numeric(df_pred_processed[col], errors='coerce').fillna(0)
-            X_pred = df_pred_processed.reindex(columns=model_columns, fill_value=0)
-
-            pred_probs = model.predict_proba(X_pred)[:, 1]
-            df_resultados = df_filtrado_vaga.copy()
-            df_resultados['match_score'] = (pred_probs * 100)
-            df_resultados = df_resultados.sort_values(by='match_score', ascending=False)
+            if not veio_do_indice:
+                st.caption("Ranking calculado na hora (vaga ou candidatos mais novos que o índice pré-calculado).")
             
             col1, col2, col3 = st.columns(3)
             col1.metric("Total de Candidatos", len(df_resultados))
@@ -132,7 +194,7 @@ if 'titulo_vaga' in df_app.columns:
             col3.metric("Match Score Médio", f"{df_resultados['match_score'].mean():.2f}%")
             
             cols_ranking = ['nome', 'match_score', 'similitude_cv_vaga', 'anos_experiencia', 'email']
-            cols_ranking_existentes = [col for col in cols_ranking if col in df_resultados.columns]
+            cols_ranking_existentes = [col for col in cols_ranking + ['principais_fatores'] if col in df_resultados.columns]
             
             if cols_ranking_existentes:
                 st.dataframe(
@@ -143,17 +205,63 @@ if 'titulo_vaga' in df_app.columns:
                         "match_score": st.column_config.ProgressColumn("Match Score (%)", format="%.2f%%", min_value=0, max_value=100),
                         "similitude_cv_vaga": st.column_config.NumberColumn("Similitude CV", format="%.2f"),
                         "anos_experiencia": st.column_config.NumberColumn("Anos Exp.", format="%d anos"),
-                        "email": st.column_config.TextColumn("E-mail")
+                        "email": st.column_config.TextColumn("E-mail"),
+                        "principais_fatores": st.column_config.TextColumn("Principais fatores", help="↑ aumenta, ↓ reduz o match score"),
                     },
                     hide_index=True
                 )
 
+            if 'principais_fatores' in df_resultados.columns and not df_resultados.empty:
+                with st.expander("🧠 Por que este Match Score?"):
+                    posicao_exp = st.selectbox(
+                        "Candidato:", options=range(min(len(df_resultados), 50)),
+                        format_func=lambda i: str(df_resultados['nome'].iloc[i]) if 'nome' in df_resultados.columns else str(df_resultados['codigo_profissional'].iloc[i]),
+                        key="explicacao_candidato")
+                    df_explicacao = explicacao_candidato(df_resultados, posicao_exp, codificador.colunas)
+                    st.caption("Contribuição de cada característica para o score (escala logit, TreeSHAP): "
+                               "positivas aumentam, negativas reduzem o match score.")
+                    st.bar_chart(df_explicacao.set_index('feature')['contribuicao'])
+
+            if dataset_app.caminho_cvs and 'codigo_profissional' in df_resultados.columns and not df_resultados.empty:
+                with st.expander("📄 Ver CV de um candidato"):
+                    posicao = st.selectbox(
+                        "Candidato:", options=range(min(len(df_resultados), 50)),
+                        format_func=lambda i: str(df_resultados['nome'].iloc[i]) if 'nome' in df_resultados.columns else str(df_resultados['codigo_profissional'].iloc[i]),
+                        key="cv_candidato")
+                    codigo = str(df_resultados['codigo_profissional'].iloc[posicao])
+                    # O CV é lido do disco só agora; não fica no dataset em memória
+                    st.text(dataset_app.cvs([codigo]).get(codigo) or "CV não disponível.")
+
+            if buscador_candidatos is not None:
+                with st.expander("🔎 Buscar no banco completo de candidatos"):
+                    st.write("Busca semântica entre **todos** os candidatos (não só os que se aplicaram a esta vaga); "
+                             "os CVs mais próximos da vaga são então ranqueados pelo modelo.")
+                    if st.button("Buscar candidatos", key="buscar_banco_completo"):
+                        with st.spinner("Buscando candidatos..."):
+                            texto_vaga_busca = (str(df_resultados['principais_atividades'].iloc[0]) + " " + str(df_resultados['competencia_tecnicas_e_comportamentais'].iloc[0]))
+                            embedding_vaga_busca = codificar_textos([texto_vaga_busca])[0]
+                            dados_vaga = {col: df_resultados[col].iloc[0] for col in COLUNAS_ORIGEM_VAGA if col in df_resultados.columns}
+                            df_banco = buscador_candidatos.recomendar(embedding_vaga_busca, dados_vaga, model, codificador, pontuador=pontuador)
+                        st.dataframe(
+                            df_banco[[col for col in cols_ranking if col in df_banco.columns]].head(50),
+                            use_container_width=True,
+                            column_config={
+                                "nome": st.column_config.TextColumn("Nome do Candidato", width="large"),
+                                "match_score": st.column_config.ProgressColumn("Match Score (%)", format="%.2f%%", min_value=0, max_value=100),
+                                "similitude_cv_vaga": st.column_config.NumberColumn("Similitude CV", format="%.2f"),
+                                "anos_experiencia": st.column_config.NumberColumn("Anos Exp.", format="%d anos"),
+                                "email": st.column_config.TextColumn("E-mail")
+                            },
+                            hide_index=True
+                        )
+
         with tab_otimiza_vaga:
             # ... (código da aba de otimização de vaga, sem alterações) ...
             st.header("🤖 Assistente de Otimização de Vaga")
             st.markdown("A IA analisou os CVs dos candidatos com maior *match score* e sugere melhorias para a descrição da vaga.")
             
-            common_skills, recommendations = gerar_recomendacoes_vaga(df_resultados)
+            common_skills = [skill for skill, _ in recomendacoes_vaga['skills']] if recomendacoes_vaga else []
+            recommendations = recomendacoes_vaga['recomendacoes'] if recomendacoes_vaga else []
 
             st.markdown("---")
             st.subheader("💡 Palavras-chave Recomendadas")
@@ -168,9 +276,10 @@ if 'titulo_vaga' in df_app.columns:
 
             with st.expander("Ver lógica da IA"):
                 st.markdown("#### Como as recomendações foram geradas?")
-                st.write(f"1. A IA selecionou os **{max(1, int(len(df_resultados) * 0.20))} melhores candidatos** (top 20%) com base no *match score*.")
+                n_top = recomendacoes_vaga['n_top'] if recomendacoes_vaga else 0
+                st.write(f"1. A IA selecionou os **{n_top} melhores candidatos** (top {percentual_top:.0%}) com base no *match score*.")
                 st.write("2. Analisou os CVs deste grupo e identificou as habilidades mais frequentes.")
-                st.code(f"Habilidades mais comuns no top 20%: {', '.join(common_skills[:5])}...")
+                st.code(f"Habilidades mais comuns no top {percentual_top:.0%}: {', '.join(common_skills[:5])}...")
                 st.write("3. Comparou essas habilidades com o texto da descrição da vaga atual.")
                 st.write("4. As sugestões acima são as habilidades frequentes nos melhores candidatos que **não** foram encontradas na sua descrição.")
 
@@ -182,20 +291,18 @@ if 'titulo_vaga' in df_app.columns:
             cv_usuario = st.text_area("Cole o texto completo do seu CV aqui:", height=300, placeholder="Ex: Formação Acadêmica...")
             
             if st.button("Analisar meu CV", type="primary"):
-                if cv_usuario and lang_model:
-                    with st.spinner("Analisando seu CV..."):
-                        from sentence_transformers import util
-                        texto_vaga_completo = (str(df_filtrado_vaga['principais_atividades'].iloc[0]) + " " + str(df_filtrado_vaga['competencia_tecnicas_e_comportamentais'].iloc[0]))
+                if cv_usuario:
+                    with st.spinner("Analisando seu CV..."), medir('analise_cv'):
+                        texto_vaga_completo = (str(df_resultados['principais_atividades'].iloc[0]) + " " + str(df_resultados['competencia_tecnicas_e_comportamentais'].iloc[0]))
                         
-                        embedding_vaga = lang_model.encode(texto_vaga_completo, convert_to_tensor=True)
-                        embedding_cv = lang_model.encode(cv_usuario, convert_to_tensor=True)
-                        score_semantico = util.cos_sim(embedding_vaga, embedding_cv).item() * 100
-
-                        skills_list = [col.replace('skill_', '').replace('_', ' ') for col in model_columns if col.startswith('skill_')]
-                        habilidades_faltantes = []
-                        for skill in skills_list:
-                            if re.search(r'\b' + re.escape(skill) + r'\b', texto_vaga_completo, re.IGNORECASE) and not re.search(r'\b' + re.escape(skill) + r'\b', cv_usuario, re.IGNORECASE):
-                                habilidades_faltantes.append(skill.title())
+                        # A vaga vem do cache; o CV do usuário é codificado, mas não é persistido
+                        embedding_vaga = codificar_textos([texto_vaga_completo])
+                        embedding_cv = codificar_textos([cv_usuario], persistir=False)
+                        score_semantico = float(calcular_similaridade_pareada(embedding_vaga, embedding_cv)[0]) * 100
+
+                        skills_vaga = set(recomendacoes_vaga['skills_vaga']) if recomendacoes_vaga else extrator_skills.skills_presentes(texto_vaga_completo)
+                        skills_cv = extrator_skills.skills_presentes(cv_usuario)
+                        habilidades_faltantes = [skill.title() for skill in extrator_skills.skills if skill in skills_vaga and skill not in skills_cv]
                                 
                     st.markdown("---")
                     st.subheader("Resultados da Análise:")
@@ -220,4 +327,20 @@ if 'titulo_vaga' in df_app.columns:
                 else:
                     st.error("Por favor, cole o texto do seu CV para análise.")
 else:
-    st.warning("A coluna 'titulo_vaga' não foi encontrada no dataset.")
\ No newline at end of file
+    st.warning("A coluna 'titulo_vaga' não foi encontrada no dataset.")
+
+if modo_depuracao:
+    with st.expander("🛠️ Depuração: tempos deste rerun"):
+        resumo_rerun = registro_rerun.resumo()
+        total = sum(linha['duracao'] for linha in resumo_rerun if linha['nivel'] == 0)
+        st.caption(f"Etapas medidas neste rerun: {total * 1000:.1f} ms (tempo de parede, CPU, pico de RSS e linhas por etapa).")
+        st.dataframe(
+            [{'etapa': '\u2003' * linha['nivel'] + linha['caminho'].rpartition(';')[2], 'chamadas': linha['chamadas'],
+              'ms': linha['duracao'] * 1000, 'CPU (ms)': linha['cpu'] * 1000, 'pico RSS (MB)': linha['pico_rss_mb'],
+              'linhas': linha['linhas']} for linha in resumo_rerun],
+            use_container_width=True, hide_index=True,
+            column_config={"ms": st.column_config.NumberColumn(format="%.2f"), "CPU (ms)": st.column_config.NumberColumn(format="%.2f")},
+        )
+        col1, col2 = st.columns(2)
+        col1.download_button("Baixar JSON", registro_rerun.como_json(), file_name="rerun.json", mime="application/json")
+        col2.download_button("Baixar CSV", registro_rerun.como_csv(), file_name="rerun.csv", mime="text/csv")
\ No newline at end of file
@@ -0,0 +1,77 @@
+# benchmarks/bench_carregamento.py
+"""Benchmark de throughput do carregamento em streaming (applicants.json -> Parquet).
+
+Para cada tamanho gera um applicants.json sintético e mede, em um processo novo,
+registros/s e pico de RSS do conversor em lotes e do caminho antigo
+(`pd.read_json(orient='index')` + `json_normalize` por seção).
+
+Uso:
+    python benchmarks/bench_carregamento.py --tamanhos 1000 10000 50000
+"""
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, RAIZ)
+from dados_sinteticos import gerar_applicants_json
+
+def _rodar_streaming(caminho_json, diretorio, tamanho_lote):
+    from src.preprocessing import converter_json_para_parquet, achatar_applicant
+    return converter_json_para_parquet(caminho_json, os.path.join(diretorio, 'applicants.parquet'), achatar_applicant, tamanho_lote=tamanho_lote)
+
+def _rodar_antigo(caminho_json, diretorio, tamanho_lote):
+    import pandas as pd
+    df = pd.read_json(caminho_json, orient='index')
+    partes = [pd.json_normalize(df[secao]).add_prefix(prefixo) for secao, prefixo in
+              [('infos_basicas', 'basicas_'), ('informacoes_pessoais', 'pessoais_'), ('informacoes_profissionais', 'profissionais_'),
+               ('formacao_e_idiomas', 'formacao_'), ('cargo_atual', 'cargo_atual_')]]
+    df_flat = pd.concat(partes + [df[['cv_pt', 'cv_en']].reset_index(drop=True)], axis=1)
+    df_flat.to_parquet(os.path.join(diretorio, 'applicants_antigo.parquet'))
+    return len(df_flat)
+
+def _medir(metodo, caminho_json, diretorio, tamanho_lote, fila):
+    import pandas, pyarrow.parquet  # noqa: F401  (importa antes de medir a linha de base)
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    linhas = {'streaming': _rodar_streaming, 'antigo': _rodar_antigo}[metodo](caminho_json, diretorio, tamanho_lote)
+    duracao = time.perf_counter() - inicio
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    fila.put((linhas, duracao, base, pico))
+
+def medir_em_processo(metodo, caminho_json, diretorio, tamanho_lote):
+    """Roda em um processo novo para que o pico de RSS não seja contaminado por medições anteriores."""
+    ctx = mp.get_context('spawn')
+    fila = ctx.Queue()
+    processo = ctx.Process(target=_medir, args=(metodo, caminho_json, diretorio, tamanho_lote, fila))
+    processo.start()
+    resultado = fila.get()
+    processo.join()
+    return resultado
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--tamanho-lote', type=int, default=5000)
+    parser.add_argument('--metodos', nargs='+', default=['streaming', 'antigo'], choices=['streaming', 'antigo'])
+    args = parser.parse_args()
+
+    print(f"{'registros':>10} | {'arquivo (MB)':>12} | {'método':<9} | {'registros/s':>11} | {'RSS base (MB)':>13} | {'pico RSS (MB)':>13}")
+    print("-" * 84)
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.tamanhos:
+            caminho_json = os.path.join(tmp, f'applicants_{n}.json')
+            gerar_applicants_json(caminho_json, n)
+            tamanho_mb = os.path.getsize(caminho_json) / 2**20
+            for metodo in args.metodos:
+                linhas, duracao, base, pico = medir_em_processo(metodo, caminho_json, tmp, args.tamanho_lote)
+                # ru_maxrss é em KB no Linux
+                print(f"{linhas:>10} | {tamanho_mb:>12.1f} | {metodo:<9} | {linhas / duracao:>11.0f} | {base / 1024:>13.1f} | {pico / 1024:>13.1f}")
+            os.remove(caminho_json)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/bench_codificador.py
+"""Micro-benchmark da montagem da matriz de features: `get_dummies` + `reindex` vs. `CodificadorFeatures`.
+
+Mede uma linha (requisição do app) e lotes grandes (índice de ranking, retreino) e confere
+que as duas matrizes são iguais quando não há nulos nas categóricas.
+
+Uso:
+    python benchmarks/bench_codificador.py --lotes 1 100 10000 200000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.encoder import COLUNAS_CATEGORICAS, CodificadorFeatures
+from dados_sinteticos import gerar_df_mestre
+
+def matriz_antiga(df, model_columns):
+    """Caminho anterior do app (aba de Ranking)."""
+    categoricas = [col for col in COLUNAS_CATEGORICAS if col in df.columns]
+    df_processado = pd.get_dummies(df, columns=categoricas, prefix=categoricas)
+    for col in model_columns:
+        if col in df_processado.columns and df_processado[col].dtype == 'object':
+            df_processado[col] = pd.to_numeric(df_processado[col], errors='coerce').fillna(0)
+    return df_processado.reindex(columns=model_columns, fill_value=0)
+
+def cronometrar(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lotes', type=int, nargs='+', default=[1, 100, 10000, 200000])
+    args = parser.parse_args()
+
+    df = gerar_df_mestre(max(args.lotes), 1000)
+    codificador = CodificadorFeatures().fit(df)
+    model_columns = codificador.colunas
+
+    print(f"{'linhas':>8} | {'get_dummies (ms)':>16} | {'codificador (ms)':>16} | {'CSR (ms)':>9} | {'ganho':>6}")
+    print("-" * 68)
+    for n in args.lotes:
+        lote = df.iloc[:n]
+        repeticoes = max(1, 2000 // n)
+        antigo = matriz_antiga(lote, model_columns)
+        assert np.array_equal(antigo.to_numpy(dtype=np.float32), codificador.transform(lote))
+        assert np.array_equal(codificador.transform(lote, esparso=True).toarray(), codificador.transform(lote))
+
+        t_antigo = cronometrar(lambda: matriz_antiga(lote, model_columns), repeticoes)
+        t_novo = cronometrar(lambda: codificador.transform(lote), repeticoes)
+        t_csr = cronometrar(lambda: codificador.transform(lote, esparso=True), repeticoes)
+        print(f"{n:>8} | {t_antigo * 1000:>16.2f} | {t_novo * 1000:>16.2f} | {t_csr * 1000:>9.2f} | {t_antigo / t_novo:>5.1f}x")
+
+if __name__ == '__main__':
+    main()
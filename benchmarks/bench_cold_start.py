@@ -0,0 +1,153 @@
+# benchmarks/bench_cold_start.py
+"""Benchmark do cold start do app: tempo até o primeiro ranking, antes e depois do cache de artefatos.
+
+Monta um "bucket" em um diretório local servido por um filesystem fsspec com latência e
+banda simuladas, e compara:
+  - antigo: downloads sequenciais, dataset inteiro (com CVs) e modelo de linguagem
+    carregado antes do app ficar interativo;
+  - novo (frio): downloads em paralelo, leitura projetada e modelo de linguagem em
+    segundo plano, com o cache local vazio;
+  - novo (quente): mesmo caminho com o cache já preenchido (só revalida as versões).
+
+Uso:
+    python benchmarks/bench_cold_start.py --linhas 20000 --latencia-ms 80 --banda-mb 40 --tempo-modelo 5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from fsspec.implementations.local import LocalFileSystem
+from xgboost import XGBClassifier
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.artifacts import CacheArtefatos, carregar_artefatos_app, carregar_em_segundo_plano
+from src.encoder import CodificadorFeatures
+from src.ranking import construir_indice_ranking, obter_ranking
+from dados_sinteticos import gerar_df_mestre
+
+class ArquivoLento:
+    """Arquivo que limita a banda de leitura (simula o download do bucket)."""
+
+    def __init__(self, arquivo, banda):
+        self._arquivo = arquivo
+        self._banda = banda
+
+    def read(self, *args):
+        dados = self._arquivo.read(*args)
+        time.sleep(len(dados) / self._banda)
+        return dados
+
+    def readinto(self, buffer):
+        n = self._arquivo.readinto(buffer)
+        time.sleep((n or 0) / self._banda)
+        return n
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self._arquivo.close()
+
+    def __getattr__(self, nome):
+        return getattr(self._arquivo, nome)
+
+class SistemaArquivosSimulado(LocalFileSystem):
+    """Diretório local com latência por requisição e banda por conexão, como um bucket remoto."""
+
+    def __init__(self, latencia, banda, **kwargs):
+        super().__init__(skip_instance_cache=True, **kwargs)
+        self.latencia = latencia
+        self.banda = banda
+
+    def info(self, path, **kwargs):
+        time.sleep(self.latencia)
+        return super().info(path, **kwargs)
+
+    def _open(self, path, mode='rb', **kwargs):
+        time.sleep(self.latencia)
+        return ArquivoLento(super()._open(path, mode=mode, **kwargs), self.banda)
+
+def montar_bucket(raiz, n_linhas, tamanho_cv):
+    """Dataset com CVs longos, modelo, codificador e índice de ranking, no layout do bucket."""
+    rng = np.random.default_rng(0)
+    palavras = np.array("experiência desenvolvimento sistemas projetos java python sap sql cliente equipe análise dados".split())
+    df = gerar_df_mestre(n_linhas, max(10, n_linhas // 100))
+    n_palavras = tamanho_cv // 10
+    for coluna in ('cv_pt', 'cv_en'):
+        df[coluna] = [' '.join(rng.choice(palavras, n_palavras)) for _ in range(n_linhas)]
+    codificador = CodificadorFeatures().fit(df)
+    model = XGBClassifier(n_estimators=100, max_depth=6, tree_method='hist').fit(codificador.to_dataframe(df), df['contratado'])
+
+    os.makedirs(os.path.join(raiz, 'models'))
+    os.makedirs(os.path.join(raiz, 'data'))
+    joblib.dump(model, os.path.join(raiz, 'models', 'recruitment_model.joblib'))
+    joblib.dump(codificador.colunas, os.path.join(raiz, 'models', 'model_columns.joblib'))
+    codificador.salvar(os.path.join(raiz, 'models', 'feature_encoder.joblib'))
+    df.to_parquet(os.path.join(raiz, 'data', 'df_mestre_preprocessado.parquet'), index=False)
+    construir_indice_ranking(df, model, codificador, os.path.join(raiz, 'models', 'ranking_index.arrow'))
+
+def carregar_modelo_linguagem(segundos):
+    """Substituto do SentenceTransformer: só o tempo de carga importa aqui."""
+    time.sleep(segundos)
+    return object()
+
+def primeiro_ranking(df_app, indice, model, codificador):
+    vaga = sorted(df_app['titulo_vaga'].astype(str).unique())[0]
+    return obter_ranking(vaga, indice, lambda: df_app[df_app['titulo_vaga'].astype(str) == vaga], model, codificador)
+
+def caminho_antigo(fs, raiz, tempo_modelo):
+    """Sequencial, como o `load_artifacts_from_gcs` original."""
+    inicio = time.perf_counter()
+    with fs.open(f"{raiz}/models/recruitment_model.joblib", 'rb') as f:
+        model = joblib.load(f)
+    with fs.open(f"{raiz}/models/model_columns.joblib", 'rb') as f:
+        model_columns = joblib.load(f)
+    df_app = pd.read_parquet(f"{raiz}/data/df_mestre_preprocessado.parquet", filesystem=fs)
+    carregar_modelo_linguagem(tempo_modelo)
+    primeiro_ranking(df_app, None, model, CodificadorFeatures.de_colunas_modelo(model_columns))
+    return time.perf_counter() - inicio, time.perf_counter() - inicio, df_app.memory_usage(deep=True).sum()
+
+def caminho_novo(fs, raiz, cache, tempo_modelo):
+    inicio = time.perf_counter()
+    futuro = carregar_em_segundo_plano(carregar_modelo_linguagem, tempo_modelo)
+    artefatos = carregar_artefatos_app(fs, raiz, cache=cache, carregar_buscador=False)
+    dataset_app = artefatos['dataset_app']
+    vaga = dataset_app.lista_vagas[0]
+    obter_ranking(vaga, artefatos['indice_ranking'], lambda: dataset_app.candidaturas_da_vaga(vaga),
+                  artefatos['modelo'], artefatos['codificador'], assinatura=dataset_app.assinatura(vaga))
+    t_ranking = time.perf_counter() - inicio
+    futuro.result()
+    return t_ranking, time.perf_counter() - inicio, dataset_app.memoria()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=20000)
+    parser.add_argument('--tamanho-cv', type=int, default=4000, help="Caracteres por CV (cv_pt e cv_en).")
+    parser.add_argument('--latencia-ms', type=float, default=80)
+    parser.add_argument('--banda-mb', type=float, default=40, help="MB/s por conexão.")
+    parser.add_argument('--tempo-modelo', type=float, default=5, help="Segundos para carregar o modelo de linguagem.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        raiz = os.path.join(diretorio, 'bucket')
+        montar_bucket(raiz, args.linhas, args.tamanho_cv)
+        tamanho = os.path.getsize(os.path.join(raiz, 'data', 'df_mestre_preprocessado.parquet')) / 2**20
+        print(f"Bucket simulado: dataset de {tamanho:.1f} MB, latência {args.latencia_ms:.0f} ms, {args.banda_mb:.0f} MB/s por conexão")
+
+        fs = SistemaArquivosSimulado(args.latencia_ms / 1000, args.banda_mb * 2**20)
+        cache = CacheArtefatos(fs, diretorio=os.path.join(diretorio, 'cache'))
+        print(f"\n{'caminho':<14} | {'1º ranking (s)':>14} | {'modelo de linguagem pronto (s)':>30} | {'df_app (MB)':>11}")
+        print("-" * 80)
+        for nome, funcao in (('antigo', lambda: caminho_antigo(fs, raiz, args.tempo_modelo)),
+                             ('novo (frio)', lambda: caminho_novo(fs, raiz, cache, args.tempo_modelo)),
+                             ('novo (quente)', lambda: caminho_novo(fs, raiz, cache, args.tempo_modelo))):
+            t_ranking, t_total, memoria = funcao()
+            print(f"{nome:<14} | {t_ranking:>14.2f} | {t_total:>30.2f} | {memoria / 2**20:>11.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/bench_embeddings.py
+"""Benchmark do backend de embeddings: textos/s e concordância (cosseno) com o fp32 atual.
+
+Compara o `SentenceTransformer.encode` em fp32 (caminho atual) com o `CodificadorTexto`
+em fp32 e int8 (quantização dinâmica), com e sem janelas para CVs longos. A concordância
+é o cosseno entre o vetor de cada texto e o vetor de referência do mesmo texto; os modos
+com janelas são comparados também com a referência em janelas fp32 (o truncamento muda
+o vetor de propósito, então a comparação com o fp32 truncado mede outra coisa).
+
+Requer `sentence-transformers` e acesso ao modelo (Hugging Face Hub ou cache local).
+
+Uso:
+    python benchmarks/bench_embeddings.py --textos 2000 --threads 4
+    python benchmarks/bench_embeddings.py --dataset data/df_mestre_preprocessado.parquet --textos 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.embeddings import NOME_MODELO_LINGUAGEM, CodificadorTexto
+
+PALAVRAS = ("experiência desenvolvimento sistemas projetos java python sap sql cliente equipe análise dados "
+            "gestão implantação suporte infraestrutura requisitos testes integração banco relatórios").split()
+
+def gerar_textos(n, seed=0):
+    """Textos com comprimento log-normal, como os CVs: muitos curtos e uma cauda bem longa."""
+    rng = np.random.default_rng(seed)
+    tamanhos = np.clip(rng.lognormal(mean=5.5, sigma=1.0, size=n), 5, 3000).astype(int)
+    return [' '.join(rng.choice(PALAVRAS, tamanho)) for tamanho in tamanhos]
+
+def carregar_textos(caminho, n, seed=0):
+    cvs = pd.read_parquet(caminho, columns=['cv_pt'])['cv_pt'].dropna().drop_duplicates()
+    return cvs.sample(min(n, len(cvs)), random_state=seed).tolist()
+
+def cossenos(a, b):
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return np.einsum('ij,ij->i', a, b)
+
+def medir(modelo, textos, batch_size):
+    inicio = time.perf_counter()
+    vetores = np.asarray(modelo.encode(textos, batch_size=batch_size, convert_to_numpy=True), dtype=np.float32)
+    return vetores, len(textos) / (time.perf_counter() - inicio)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--textos', type=int, default=2000)
+    parser.add_argument('--dataset', default=None, help="Parquet com a coluna cv_pt (padrão: textos sintéticos).")
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--threads', type=int, default=None)
+    args = parser.parse_args()
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    textos = carregar_textos(args.dataset, args.textos) if args.dataset else gerar_textos(args.textos)
+    referencia_st = SentenceTransformer(NOME_MODELO_LINGUAGEM, device='cpu')
+
+    backends = [
+        ('SentenceTransformer fp32', referencia_st),
+        ('CodificadorTexto fp32', CodificadorTexto(modelo=referencia_st, modo='fp32')),
+        ('CodificadorTexto int8', CodificadorTexto(modelo=referencia_st, modo='int8')),
+        ('CodificadorTexto fp32 + janelas', CodificadorTexto(modelo=referencia_st, modo='fp32', janelas=True)),
+        ('CodificadorTexto int8 + janelas', CodificadorTexto(modelo=referencia_st, modo='int8', janelas=True)),
+    ]
+    n_tokens = np.array([len(ids) for ids in referencia_st.tokenizer(textos, add_special_tokens=False, verbose=False)['input_ids']])
+    print(f"{len(textos)} textos | tokens: mediana {int(np.median(n_tokens))}, p95 {int(np.percentile(n_tokens, 95))} | "
+          f"{(n_tokens > referencia_st.max_seq_length - 2).mean():.0%} maiores que max_seq_length={referencia_st.max_seq_length}")
+    medir(referencia_st, textos[:32], args.batch_size)  # aquecimento
+
+    print(f"\n{'backend':<32} | {'textos/s':>9} | {'cos vs fp32 (média / p5 / mín)':>30} | {'cos vs fp32+janelas (média / mín)':>33}")
+    print("-" * 115)
+    vetores_fp32 = vetores_janelas = None
+    for nome, modelo in backends:
+        vetores, taxa = medir(modelo, textos, args.batch_size)
+        if vetores_fp32 is None:
+            vetores_fp32 = vetores
+        if nome == 'CodificadorTexto fp32 + janelas':
+            vetores_janelas = vetores
+        cos = cossenos(vetores, vetores_fp32)
+        contra_janelas = ''
+        if 'janelas' in nome:
+            cos_janelas = cossenos(vetores, vetores_janelas)
+            contra_janelas = f"{cos_janelas.mean():.4f} / {cos_janelas.min():.4f}"
+        print(f"{nome:<32} | {taxa:>9.1f} | {cos.mean():>10.4f} / {np.percentile(cos, 5):.4f} / {cos.min():.4f} | {contra_janelas:>33}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/bench_explicacoes.py
+"""Explicações por segundo: TreeSHAP nativo do XGBoost em lote vs. por linha vs. `shap.TreeExplainer`.
+
+Gera um df_mestre sintético, treina um XGBoost e explica as candidaturas de cada vaga por:
+  - por linha: `pred_contribs` de uma candidatura por vez (explicação sob demanda);
+  - lote por vaga: `pred_contribs` com todas as candidaturas da vaga + top-k em float16
+    (caminho do índice e do fallback do app);
+  - aproximado: o mesmo lote com `approx_contribs` (Saabas), para referência;
+  - shap: `shap.TreeExplainer(model).shap_values` por vaga (se o pacote estiver instalado);
+  - índice: ler a fatia da vaga do índice de ranking e montar o resumo (sem recalcular).
+Confere também que valor base + contribuições = logit do score, o erro do float16 e a
+fração da contribuição absoluta coberta pelo top-k.
+
+Uso:
+    python benchmarks/bench_explicacoes.py --linhas 20000 --vagas 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from xgboost import XGBClassifier
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.encoder import CodificadorFeatures
+from src.explanations import TOP_K_PADRAO, contribuicoes, explicar_ranking, resumo_explicacoes, top_contribuicoes
+from src.ranking import IndiceRanking, construir_indice_ranking
+from dados_sinteticos import gerar_df_mestre
+
+def taxa(n, segundos):
+    return n / segundos if segundos > 0 else float('inf')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=20000)
+    parser.add_argument('--vagas', type=int, default=200)
+    parser.add_argument('--arvores', type=int, default=100)
+    parser.add_argument('--profundidade', type=int, default=6)
+    parser.add_argument('--top-k', type=int, default=TOP_K_PADRAO)
+    parser.add_argument('--por-linha', type=int, default=200, help="Candidaturas explicadas uma a uma.")
+    args = parser.parse_args()
+
+    df = gerar_df_mestre(args.linhas, args.vagas)
+    codificador = CodificadorFeatures().fit(df)
+    model = XGBClassifier(n_estimators=args.arvores, max_depth=args.profundidade,
+                          tree_method='hist').fit(codificador.to_dataframe(df), df['contratado'])
+    grupos = [g for _, g in df.groupby('titulo_vaga', sort=False)]
+    print(f"{len(df)} candidaturas em {len(grupos)} vagas, {len(codificador.colunas)} features, "
+          f"{args.arvores} árvores de profundidade {args.profundidade}")
+
+    resultados = {}
+    X = codificador.transform(df.iloc[:args.por_linha])
+    inicio = time.perf_counter()
+    for i in range(len(X)):
+        top_contribuicoes(contribuicoes(model, X[i:i + 1]), args.top_k)
+    resultados['por linha'] = taxa(len(X), time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    for grupo in grupos:
+        explicar_ranking(grupo, model, codificador, args.top_k)
+    resultados['lote por vaga'] = taxa(len(df), time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    for grupo in grupos:
+        top_contribuicoes(contribuicoes(model, codificador.transform(grupo), aproximadas=True), args.top_k)
+    resultados['aproximado'] = taxa(len(df), time.perf_counter() - inicio)
+
+    try:
+        import shap
+        explainer = shap.TreeExplainer(model)
+        inicio = time.perf_counter()
+        for grupo in grupos:
+            explainer.shap_values(codificador.transform(grupo))
+        resultados['shap'] = taxa(len(df), time.perf_counter() - inicio)
+    except ImportError:
+        print("AVISO: pacote shap não instalado; caminho shap.TreeExplainer não medido.")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'ranking_index.arrow')
+        inicio = time.perf_counter()
+        construir_indice_ranking(df, model, codificador, caminho, top_k_explicacoes=args.top_k)
+        t_indice = time.perf_counter() - inicio
+        indice = IndiceRanking(caminho)
+        inicio = time.perf_counter()
+        for vaga in indice.vagas():
+            resumo_explicacoes(indice.ranking(vaga), indice.explicacoes['features'])
+        resultados['índice'] = taxa(len(indice), time.perf_counter() - inicio)
+        print(f"Construção do índice com explicações: {t_indice:.1f}s ({os.path.getsize(caminho) / 2**20:.1f} MB)")
+
+    print(f"\n{'caminho':<14} | {'explicações/s':>14}")
+    print("-" * 31)
+    for nome, valor in resultados.items():
+        print(f"{nome:<14} | {valor:>14,.0f}")
+
+    # Fidelidade: aditividade do TreeSHAP, erro do float16 e cobertura do top-k
+    X = codificador.transform(df.iloc[:2000])
+    contribs = contribuicoes(model, X)
+    logit = np.log(model.predict_proba(X)[:, 1]) - np.log(model.predict_proba(X)[:, 0])
+    posicoes, valores = top_contribuicoes(contribs, args.top_k)
+    exatos = np.take_along_axis(contribs[:, :-1], posicoes.astype(np.int64), axis=1)
+    cobertura = np.abs(exatos).sum(axis=1) / np.maximum(np.abs(contribs[:, :-1]).sum(axis=1), 1e-12)
+    print(f"\nAditividade (máx |base + Σ contribuições - logit|): {np.abs(contribs.sum(axis=1) - logit).max():.2e}")
+    print(f"Erro máximo do float16: {np.abs(valores.astype(np.float32) - exatos).max():.2e}")
+    print(f"Contribuição absoluta coberta pelo top-{args.top_k}: mediana {np.median(cobertura):.0%}, mínimo {cobertura.min():.0%}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+# benchmarks/bench_memoria_app.py
+"""Memória residente do processo do app com cada formato do dataset, e o custo de um rerun.
+
+Gera um df_mestre sintético com CVs (pt/en) repetidos por candidatura, textos da vaga
+repetidos em cada linha e colunas de texto achatadas, e mede, cada uma num processo novo:
+  - completo: `pd.read_parquet` do df_mestre inteiro (app original);
+  - projetado: só as colunas do app, sem CVs (`ler_parquet_projetado`);
+  - compacto: `DatasetApp` (categorias, numéricas reduzidas, vagas à parte, CVs no disco).
+Reporta o RSS acrescentado pela carga, o tamanho do frame e o tempo de um rerun
+(montar a lista de vagas + obter as candidaturas de uma vaga).
+
+Uso:
+    python benchmarks/bench_memoria_app.py --linhas 200000 --vagas 2000
+"""
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.app_dataset import DatasetApp, colunas_dataset_app, salvar_dataset_app
+from src.artifacts import ler_parquet_projetado
+from src.encoder import CodificadorFeatures
+from dados_sinteticos import gerar_df_mestre
+
+PALAVRAS = "experiência desenvolvimento sistemas projetos java python sap sql cliente equipe análise dados gestão".split()
+COLUNAS_ACHATADAS = ['telefone', 'sexo', 'data_nascimento', 'titulo_profissional', 'area_atuacao', 'modalidade',
+                     'cliente', 'situacao_candidado', 'nome_prospect', 'basicas_objetivo_profissional']
+
+def rss_mb():
+    with open('/proc/self/status') as f:
+        for linha in f:
+            if linha.startswith('VmRSS:'):
+                return int(linha.split()[1]) / 1024
+    return float('nan')
+
+def montar_dataset(caminho, diretorio_app, n_linhas, n_vagas, tamanho_cv):
+    df = gerar_df_mestre(n_linhas, n_vagas)
+    rng = np.random.default_rng(1)
+    codigos = df['codigo_profissional'].unique()
+    textos = {codigo: ' '.join(rng.choice(PALAVRAS, tamanho_cv // 10)) for codigo in codigos}
+    df['cv_pt'] = df['codigo_profissional'].map(textos)
+    df['cv_en'] = df['cv_pt']
+    df['principais_atividades'] = df['principais_atividades'] + ' ' + ' '.join(PALAVRAS * 20)
+    for i, coluna in enumerate(COLUNAS_ACHATADAS):
+        df[coluna] = rng.choice([f"{coluna} {j}" for j in range(10 ** (1 + i % 3))], n_linhas)
+    df['remuneracao'] = rng.integers(2000, 20000, n_linhas).astype(str)
+    df.to_parquet(caminho)
+    codificador = CodificadorFeatures().fit(df)
+    salvar_dataset_app(df, codificador, diretorio_app)
+    return codificador
+
+def medir(formato, caminho, diretorio_app, caminho_codificador):
+    """Roda num processo novo e imprime as medidas em JSON."""
+    codificador = CodificadorFeatures.carregar(caminho_codificador)
+    gc.collect()
+    base = rss_mb()
+    inicio = time.perf_counter()
+    if formato == 'completo':
+        dados = pd.read_parquet(caminho)
+    elif formato == 'projetado':
+        dados = ler_parquet_projetado(caminho, colunas_dataset_app(codificador))
+    else:
+        dados = DatasetApp.carregar(diretorio_app)
+    t_carga = time.perf_counter() - inicio
+    gc.collect()
+    rss = rss_mb() - base
+
+    tempos = []
+    for i in range(20):
+        inicio = time.perf_counter()
+        if formato == 'compacto':
+            vaga = dados.lista_vagas[i * 7 % len(dados.lista_vagas)]
+            df_vaga = dados.candidaturas_da_vaga(vaga)
+        else:
+            lista_vagas = sorted(dados['titulo_vaga'].astype(str).unique())
+            vaga = lista_vagas[i * 7 % len(lista_vagas)]
+            df_vaga = dados[dados['titulo_vaga'].astype(str) == vaga]
+        tempos.append(time.perf_counter() - inicio)
+    memoria = dados.memoria() if formato == 'compacto' else int(dados.memory_usage(deep=True).sum())
+    print(json.dumps({'rss_mb': rss, 'frame_mb': memoria / 2**20, 'carga_s': t_carga,
+                      'rerun_ms': float(np.median(tempos) * 1000), 'linhas_vaga': len(df_vaga)}))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=200000)
+    parser.add_argument('--vagas', type=int, default=2000)
+    parser.add_argument('--tamanho-cv', type=int, default=3000, help="Caracteres por CV (cv_pt e cv_en).")
+    parser.add_argument('--medir', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--arquivos', nargs=3, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        medir(args.medir, *args.arquivos)
+        return
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'df_mestre_preprocessado.parquet')
+        diretorio_app = os.path.join(diretorio, 'app_dataset')
+        caminho_codificador = os.path.join(diretorio, 'feature_encoder.joblib')
+        montar_dataset(caminho, diretorio_app, args.linhas, args.vagas, args.tamanho_cv).salvar(caminho_codificador)
+        tamanhos = {nome: os.path.getsize(os.path.join(diretorio_app, nome)) / 2**20 for nome in sorted(os.listdir(diretorio_app))}
+        print(f"df_mestre: {os.path.getsize(caminho) / 2**20:.1f} MB em disco | dataset do app: "
+              + ', '.join(f"{nome} {tamanho:.1f} MB" for nome, tamanho in tamanhos.items()))
+
+        print(f"\n{'formato':<10} | {'RSS da carga (MB)':>17} | {'frame (MB)':>10} | {'carga (s)':>9} | {'rerun (ms)':>10}")
+        print("-" * 70)
+        for formato in ('completo', 'projetado', 'compacto'):
+            saida = subprocess.run([sys.executable, __file__, '--medir', formato, '--arquivos', caminho, diretorio_app, caminho_codificador],
+                                   capture_output=True, text=True, check=True).stdout
+            r = json.loads(saida.strip().splitlines()[-1])
+            print(f"{formato:<10} | {r['rss_mb']:>17.1f} | {r['frame_mb']:>10.1f} | {r['carga_s']:>9.2f} | {r['rerun_ms']:>10.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/bench_ranking.py
+"""Benchmark da aba de Ranking: pontuação online por vaga vs. índice pré-calculado.
+
+Gera um df_mestre sintético, treina um XGBoost pequeno, constrói o índice de ranking e
+mede o tempo de trocar de vaga nos dois caminhos (filtro + get_dummies + predict_proba +
+sort vs. `slice` no arquivo memory-mapped). Também confere que os scores coincidem, mede
+as recomendações da aba "Otimizar Vaga" (calculadas a cada rerun vs. lidas do índice) e a
+atualização incremental do índice quando chegam candidaturas novas.
+
+Uso:
+    python benchmarks/bench_ranking.py --linhas 200000 --vagas 2000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from xgboost import XGBClassifier
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.encoder import CodificadorFeatures
+from src.feature_engineering import ExtratorSkills
+from src.ranking import IndiceRanking, atualizar_indice_ranking, construir_indice_ranking, ranquear_online
+from src.recommendations import recomendacoes_da_vaga
+from dados_sinteticos import gerar_df_mestre
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=200000)
+    parser.add_argument('--vagas', type=int, default=2000)
+    parser.add_argument('--consultas', type=int, default=50)
+    parser.add_argument('--vagas-alteradas', type=int, default=20, help="Vagas que recebem candidaturas novas na atualização incremental.")
+    args = parser.parse_args()
+
+    df = gerar_df_mestre(args.linhas, args.vagas)
+    codificador = CodificadorFeatures().fit(df)
+    model = XGBClassifier(n_estimators=100, max_depth=6, tree_method='hist').fit(codificador.to_dataframe(df), df['contratado'])
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'ranking_index.arrow')
+        inicio = time.perf_counter()
+        # Explicações medidas à parte em bench_explicacoes.py
+        construir_indice_ranking(df, model, codificador, caminho, top_k_explicacoes=0)
+        print(f"Construção do índice: {time.perf_counter() - inicio:.1f}s ({os.path.getsize(caminho) / 2**20:.1f} MB)")
+
+        inicio = time.perf_counter()
+        indice = IndiceRanking(caminho)
+        print(f"Abertura do índice (mmap): {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+        vagas = random.Random(0).sample(indice.vagas(), min(args.consultas, len(indice.vagas())))
+        tempos_online, tempos_indice = [], []
+        extrator = ExtratorSkills.das_colunas(codificador.colunas)
+        tempos_recomendacoes_online, tempos_recomendacoes_indice = [], []
+        for vaga in vagas:
+            inicio = time.perf_counter()
+            online = ranquear_online(df[df['titulo_vaga'] == vaga], model, codificador)
+            tempos_online.append(time.perf_counter() - inicio)
+
+            inicio = time.perf_counter()
+            do_indice = indice.ranking(vaga)
+            tempos_indice.append(time.perf_counter() - inicio)
+
+            assert np.allclose(online['match_score'].to_numpy(), do_indice['match_score'].to_numpy(), atol=1e-4)
+
+            inicio = time.perf_counter()
+            recomendacoes = recomendacoes_da_vaga(do_indice, extrator)
+            tempos_recomendacoes_online.append(time.perf_counter() - inicio)
+            inicio = time.perf_counter()
+            assert indice.recomendacoes(vaga)['recomendacoes'] == recomendacoes['recomendacoes']
+            tempos_recomendacoes_indice.append(time.perf_counter() - inicio)
+
+        tamanhos = [indice.contagem(v) for v in vagas]
+        print(f"{len(vagas)} vagas consultadas (candidatos por vaga: mín {min(tamanhos)}, máx {max(tamanhos)})")
+        print(f"{'caminho':<8} | {'mediana (ms)':>12} | {'máximo (ms)':>11}")
+        print("-" * 37)
+        for nome, tempos in (('online', tempos_online), ('índice', tempos_indice)):
+            print(f"{nome:<8} | {np.median(tempos) * 1000:>12.2f} | {max(tempos) * 1000:>11.2f}")
+        print("\nRecomendações da aba 'Otimizar Vaga' por rerun:")
+        for nome, tempos in (('online', tempos_recomendacoes_online), ('índice', tempos_recomendacoes_indice)):
+            print(f"{nome:<8} | {np.median(tempos) * 1000:>12.3f} | {max(tempos) * 1000:>11.3f}")
+
+        # Candidaturas novas chegando em poucas vagas (--vagas-alteradas), como numa carga diária
+        vagas_novas = random.Random(1).sample(indice.vagas(), min(args.vagas_alteradas, len(indice.vagas())))
+        novas = (df[df['titulo_vaga'].isin(vagas_novas)].sample(frac=0.25, random_state=1)
+                 .assign(codigo_profissional=lambda d: 'novo' + d.index.astype(str)))
+        df_atualizado = pd.concat([df, novas], ignore_index=True)
+        inicio = time.perf_counter()
+        alteradas = atualizar_indice_ranking(df_atualizado, model, codificador, caminho)
+        t_incremental = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        construir_indice_ranking(df_atualizado, model, codificador, os.path.join(diretorio, 'completo.arrow'), top_k_explicacoes=0)
+        print(f"\n{len(novas)} candidaturas novas em {len(alteradas)} vagas: atualização incremental {t_incremental:.2f}s, "
+              f"reconstrução completa {time.perf_counter() - inicio:.2f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+# benchmarks/bench_retrieval.py
+"""Benchmark da recuperação em dois estágios: índice IVF vs. busca exata sobre os CVs.
+
+Gera embeddings sintéticos agrupados (como CVs de áreas parecidas), constrói o índice
+IVF e, para consultas ruidosas, mede recall@N em relação à busca exaustiva e a latência
+da shortlist e do re-ranking com XGBoost, variando o número de sondas.
+
+Uso:
+    python benchmarks/bench_retrieval.py --candidatos 200000 --shortlist 200 --sondas 1 4 16 64
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from xgboost import XGBClassifier
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.encoder import CodificadorFeatures
+from src.retrieval import BuscadorCandidatos, IndiceIVF, construir_base_candidatos
+from dados_sinteticos import gerar_df_mestre
+
+DIMENSAO = 384  # paraphrase-multilingual-MiniLM-L12-v2
+
+def gerar_embeddings(n, n_grupos=500, ruido=2.0, seed=0):
+    """Mistura de gaussianas em 384 dimensões: vizinhos próximos dentro de cada grupo."""
+    rng = np.random.default_rng(seed)
+    centros = rng.standard_normal((n_grupos, DIMENSAO)).astype(np.float32)
+    grupos = rng.integers(0, n_grupos, n)
+    vetores = centros[grupos] + ruido * rng.standard_normal((n, DIMENSAO)).astype(np.float32)
+    return vetores, centros
+
+def percentis(tempos):
+    return np.median(tempos) * 1000, np.percentile(tempos, 95) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--candidatos', type=int, default=200000)
+    parser.add_argument('--shortlist', type=int, default=200)
+    parser.add_argument('--consultas', type=int, default=100)
+    parser.add_argument('--sondas', type=int, nargs='+', default=[1, 4, 16, 64])
+    args = parser.parse_args()
+
+    vetores, centros = gerar_embeddings(args.candidatos)
+    rng = np.random.default_rng(1)
+    consultas = centros[rng.integers(0, len(centros), args.consultas)] + 2.0 * rng.standard_normal((args.consultas, DIMENSAO)).astype(np.float32)
+
+    inicio = time.perf_counter()
+    indice = IndiceIVF.construir(vetores)
+    print(f"Construção do IVF ({len(indice)} vetores, {len(indice.centroides)} listas): {time.perf_counter() - inicio:.1f}s")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        # Base de candidatos + modelo sintéticos para medir o estágio de re-ranking
+        df = gerar_df_mestre(args.candidatos, 1000)
+        df['codigo_profissional'] = np.arange(len(df)).astype(str)
+        df['cv_pt'] = ''
+        codificador = CodificadorFeatures().fit(df)
+        model = XGBClassifier(n_estimators=100, max_depth=6, tree_method='hist').fit(codificador.to_dataframe(df), df['contratado'])
+        indice.salvar(diretorio)
+        construir_base_candidatos(df).drop(columns=['cv_pt']).to_parquet(os.path.join(diretorio, 'candidatos.parquet'), index=False)
+        buscador = BuscadorCandidatos(diretorio)
+
+        exatos, tempos_exato = [], []
+        for consulta in consultas:
+            t = time.perf_counter()
+            ids, _ = buscador.indice.buscar_exato(consulta, n=args.shortlist)
+            tempos_exato.append(time.perf_counter() - t)
+            exatos.append(set(ids.tolist()))
+        mediana, p95 = percentis(tempos_exato)
+        print(f"\nShortlist de {args.shortlist} candidatos, {args.consultas} consultas")
+        print(f"{'busca':<14} | {'recall@N':>8} | {'mediana (ms)':>12} | {'p95 (ms)':>8} | {'+ re-ranking (ms)':>17}")
+        print("-" * 72)
+        print(f"{'exata':<14} | {1.0:>8.3f} | {mediana:>12.2f} | {p95:>8.2f} | {'-':>17}")
+
+        dados_vaga = {'nivel profissional': 'Sênior', 'vaga_sap': 'Não', 'tipo_contratacao': 'CLT Full'}
+        for n_sondas in args.sondas:
+            recalls, tempos, tempos_total = [], [], []
+            for consulta, exato in zip(consultas, exatos):
+                t = time.perf_counter()
+                ids, _ = buscador.indice.buscar(consulta, n=args.shortlist, n_sondas=n_sondas)
+                tempos.append(time.perf_counter() - t)
+                recalls.append(len(exato & set(ids.tolist())) / len(exato))
+
+                t = time.perf_counter()
+                buscador.recomendar(consulta, dados_vaga, model, codificador, n=args.shortlist, n_sondas=n_sondas)
+                tempos_total.append(time.perf_counter() - t)
+            mediana, p95 = percentis(tempos)
+            print(f"{f'IVF {n_sondas} sondas':<14} | {np.mean(recalls):>8.3f} | {mediana:>12.2f} | {p95:>8.2f} | {percentis(tempos_total)[0]:>17.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+# benchmarks/bench_servico.py
+"""Teste de carga do serviço de pontuação: latência p50/p99 e vazão com 1, 10 e 100 usuários.
+
+Cada usuário simulado é uma thread que repete requisições de pontuação de `--linhas`
+candidatos (uma vaga no fallback do ranking, ou um CV na aba "Otimizar meu CV") durante
+`--duracao` segundos. Compara:
+  - em processo: cada sessão chama `pontuar_candidatos` direto (como o app sem serviço);
+  - serviço sem micro-lote: uma requisição por `predict_proba` (janela 0, lote de 1 requisição);
+  - serviço com micro-lote: requisições concorrentes agrupadas na janela `--janela-ms`.
+
+Uso:
+    python benchmarks/bench_servico.py --usuarios 1 10 100 --linhas 20 --duracao 5
+"""
+import argparse
+import copy
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+from xgboost import XGBClassifier
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.encoder import CodificadorFeatures
+from src.ranking import pontuar_candidatos
+from src.service import ClienteServico, ServicoPontuacao, criar_servidor
+from dados_sinteticos import gerar_df_mestre
+
+def iniciar_servico(model, codificador, janela, max_lote, n_workers):
+    # Cópia: o serviço ajusta as threads do booster, o cenário em processo usa o original
+    servico = ServicoPontuacao(copy.deepcopy(model), codificador, janela=janela, max_lote=max_lote, n_workers=n_workers)
+    servidor = criar_servidor(servico, porta=0)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servico, servidor, f"http://127.0.0.1:{servidor.server_address[1]}"
+
+def carga(funcao, requisicoes, n_usuarios, duracao):
+    """Roda `n_usuarios` threads chamando `funcao(df)`; devolve latências (s) e o tempo total."""
+    latencias = [[] for _ in range(n_usuarios)]
+    erros = []
+    fim = time.perf_counter() + duracao
+
+    def usuario(i):
+        rng = np.random.default_rng(i)
+        while time.perf_counter() < fim:
+            df = requisicoes[rng.integers(len(requisicoes))]
+            inicio = time.perf_counter()
+            try:
+                funcao(df)
+            except Exception as e:
+                erros.append(e)
+                continue
+            latencias[i].append(time.perf_counter() - inicio)
+
+    threads = [threading.Thread(target=usuario, args=(i,)) for i in range(n_usuarios)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.concatenate([np.asarray(l) for l in latencias]), time.perf_counter() - inicio, len(erros)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--usuarios', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--linhas', type=int, default=20, help="Candidatos por requisição.")
+    parser.add_argument('--duracao', type=float, default=5, help="Segundos por cenário.")
+    parser.add_argument('--janela-ms', type=float, default=5)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--arvores', type=int, default=300)
+    args = parser.parse_args()
+
+    df = gerar_df_mestre(20000, 200)
+    codificador = CodificadorFeatures().fit(df)
+    model = XGBClassifier(n_estimators=args.arvores, max_depth=6, tree_method='hist').fit(codificador.to_dataframe(df), df['contratado'])
+    rng = np.random.default_rng(0)
+    requisicoes = [df.iloc[rng.choice(len(df), args.linhas, replace=False)].reset_index(drop=True) for _ in range(200)]
+
+    cenarios = [('em processo', lambda d: pontuar_candidatos(d, model, codificador))]
+    for nome, janela, max_lote in (('serviço sem micro-lote', 0.0, 1), ('serviço com micro-lote', args.janela_ms / 1000, 4096)):
+        servico, _, url = iniciar_servico(model, codificador, janela, max_lote, args.workers)
+        cliente = ClienteServico(url, timeout=30)
+        cenarios.append((nome, lambda d, c=cliente: c.pontuar(d, model, codificador), servico))
+
+    print(f"{args.linhas} candidatos por requisição, {args.arvores} árvores, {os.cpu_count()} CPU(s), {args.duracao:g}s por cenário")
+    print(f"\n{'cenário':<24} | {'usuários':>8} | {'p50 (ms)':>9} | {'p99 (ms)':>9} | {'req/s':>8} | {'linhas/s':>9} | {'req/lote':>8} | {'erros':>5}")
+    print("-" * 102)
+    for cenario in cenarios:
+        nome, funcao = cenario[:2]
+        servico = cenario[2] if len(cenario) > 2 else None
+        for n_usuarios in args.usuarios:
+            lotes_antes = (servico._pontuacao.lotes, servico._pontuacao.requisicoes) if servico else None
+            latencias, tempo, erros = carga(funcao, requisicoes, n_usuarios, args.duracao)
+            por_lote = '-'
+            if servico:
+                lotes = servico._pontuacao.lotes - lotes_antes[0]
+                por_lote = f"{(servico._pontuacao.requisicoes - lotes_antes[1]) / max(lotes, 1):.1f}"
+            print(f"{nome:<24} | {n_usuarios:>8} | {np.percentile(latencias, 50) * 1000:>9.1f} | {np.percentile(latencias, 99) * 1000:>9.1f} | "
+                  f"{len(latencias) / tempo:>8.0f} | {len(latencias) * args.linhas / tempo:>9.0f} | {por_lote:>8} | {erros:>5}")
+
+if __name__ == '__main__':
+    main()
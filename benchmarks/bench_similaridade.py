@@ -0,0 +1,78 @@
+# benchmarks/bench_similaridade.py
+"""Benchmark de memória da similitude CV x vaga (linha a linha, em blocos).
+
+Mostra que o pico de memória cresce de forma linear com o número de candidaturas
+(apenas o vetor de saída), enquanto `cos_sim(...).diag()` cresce de forma quadrática.
+
+Uso:
+    python benchmarks/bench_similaridade.py --tamanhos 10000 100000 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.feature_engineering import calcular_similaridade_pareada
+
+DIMENSAO = 384  # dimensão do paraphrase-multilingual-MiniLM-L12-v2
+
+def gerar_embeddings_em_disco(caminho, n, dimensao=DIMENSAO, seed=0, bloco=65536):
+    """Gera embeddings aleatórios em um memmap, para não contar a entrada no pico."""
+    rng = np.random.default_rng(seed)
+    emb = np.lib.format.open_memmap(caminho, mode='w+', dtype=np.float32, shape=(n, dimensao))
+    for inicio in range(0, n, bloco):
+        fim = min(inicio + bloco, n)
+        emb[inicio:fim] = rng.standard_normal((fim - inicio, dimensao), dtype=np.float32)
+    emb.flush()
+    return np.load(caminho, mmap_mode='r')
+
+def similaridade_ingenua(a, b):
+    """Caminho antigo: matriz N x N completa só para ficar com a diagonal."""
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.diag(a @ b.T).copy()
+
+def medir(funcao, *args, **kwargs):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao(*args, **kwargs)
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, duracao, pico
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--tamanho-bloco', type=int, default=16384)
+    parser.add_argument('--dtype', choices=['float32', 'float16'], default='float32')
+    parser.add_argument('--comparar-ingenuo-ate', type=int, default=20_000,
+                        help="Roda o caminho N x N apenas até este tamanho (memória quadrática).")
+    args = parser.parse_args()
+
+    print(f"{'N':>10} | {'método':<10} | {'tempo (s)':>9} | {'pico extra (MB)':>15} | {'bytes/linha':>11}")
+    print("-" * 68)
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.tamanhos:
+            a = gerar_embeddings_em_disco(os.path.join(tmp, f'a_{n}.npy'), n, seed=1)
+            b = gerar_embeddings_em_disco(os.path.join(tmp, f'b_{n}.npy'), n, seed=2)
+
+            sims, duracao, pico = medir(calcular_similaridade_pareada, a, b,
+                                        tamanho_bloco=args.tamanho_bloco, dtype=np.dtype(args.dtype))
+            print(f"{n:>10} | {'blocos':<10} | {duracao:>9.3f} | {pico / 2**20:>15.1f} | {pico / n:>11.1f}")
+
+            if n <= args.comparar_ingenuo_ate:
+                a_mem, b_mem = np.asarray(a), np.asarray(b)
+                ref, duracao, pico = medir(similaridade_ingenua, a_mem, b_mem)
+                print(f"{n:>10} | {'N x N':<10} | {duracao:>9.3f} | {pico / 2**20:>15.1f} | {pico / n:>11.1f}")
+                erro = np.abs(ref - sims.astype(np.float32)).max()
+                print(f"{'':>10}   diferença máxima vs N x N: {erro:.2e}")
+            del a, b
+
+if __name__ == '__main__':
+    main()
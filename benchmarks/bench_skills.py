@@ -0,0 +1,69 @@
+# benchmarks/bench_skills.py
+"""Benchmark da extração de habilidades: loop `str.count` por skill vs. `ExtratorSkills`.
+
+O caminho antigo faz uma varredura completa dos CVs por habilidade; o extrator faz uma
+única passada com uma regex em trie, então o tempo quase não cresce com o vocabulário.
+
+Uso:
+    python benchmarks/bench_skills.py --documentos 5000 --vocabularios 22 200 2000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.feature_engineering import ExtratorSkills, SKILLS_PADRAO, nome_coluna_skill
+
+def gerar_vocabulario(n, seed=0):
+    """Vocabulário com as skills padrão mais termos sintéticos de uma ou duas palavras."""
+    rng = random.Random(seed)
+    letras = 'abcdefghijklmnopqrstuvwxyz'
+    vocabulario = list(SKILLS_PADRAO)
+    while len(vocabulario) < n:
+        termo = ''.join(rng.choice(letras) for _ in range(rng.randint(3, 9)))
+        if rng.random() < 0.3:
+            termo += ' ' + ''.join(rng.choice(letras) for _ in range(rng.randint(3, 7)))
+        vocabulario.append(termo)
+    return vocabulario[:n]
+
+def gerar_cvs(n, vocabulario, seed=1):
+    rng = random.Random(seed)
+    palavras = "experiência desenvolvimento sistemas projetos equipe cliente análise suporte dados".split()
+    return [' '.join(rng.choice(vocabulario) if rng.random() < 0.05 else rng.choice(palavras) for _ in range(rng.randint(200, 800)))
+            for _ in range(n)]
+
+def contar_antigo(serie, vocabulario):
+    return {nome_coluna_skill(skill): serie.str.count(skill, flags=re.IGNORECASE).fillna(0).astype(int) for skill in vocabulario}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--documentos', type=int, default=5000)
+    parser.add_argument('--vocabularios', type=int, nargs='+', default=[22, 200, 2000])
+    parser.add_argument('--antigo-ate', type=int, default=200, help="Roda o loop antigo só até este tamanho de vocabulário.")
+    args = parser.parse_args()
+
+    print(f"{'vocabulário':>11} | {'método':<8} | {'tempo (s)':>9} | {'CVs/s':>9}")
+    print("-" * 46)
+    for tamanho in args.vocabularios:
+        vocabulario = gerar_vocabulario(tamanho)
+        serie = pd.Series(gerar_cvs(args.documentos, vocabulario))
+
+        inicio = time.perf_counter()
+        extrator = ExtratorSkills(vocabulario)
+        extrator.contar(serie.tolist())
+        duracao = time.perf_counter() - inicio
+        print(f"{tamanho:>11} | {'extrator':<8} | {duracao:>9.2f} | {args.documentos / duracao:>9.0f}")
+
+        if tamanho <= args.antigo_ate:
+            inicio = time.perf_counter()
+            contar_antigo(serie, vocabulario)
+            duracao = time.perf_counter() - inicio
+            print(f"{tamanho:>11} | {'antigo':<8} | {duracao:>9.2f} | {args.documentos / duracao:>9.0f}")
+
+if __name__ == '__main__':
+    main()
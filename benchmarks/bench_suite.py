@@ -0,0 +1,282 @@
+# benchmarks/bench_suite.py
+"""Suíte de benchmarks do pipeline sobre dados sintéticos, com resultado em JSON comparável entre commits.
+
+Gera (ou reaproveita) os três JSON sintéticos de `dados_sinteticos.py` e roda, em sequência
+e no mesmo processo, as etapas do pipeline com a instrumentação ligada:
+  carregar (JSON -> Parquet aplanado), unir, experiencia, skills, embeddings (se o modelo
+  estiver no cache local; sem rede a etapa é registrada como pulada), similaridade (cosseno
+  sobre vetores aleatórios de 384 dimensões), codificar, treinar, indice_ranking e a
+  latência por vaga do ranking online e do índice.
+Grava `<saida>` em JSON: commit, máquina, parâmetros, tempo/CPU/pico de RSS/linhas por
+segundo de cada etapa, percentis de latência e todas as medições aninhadas. Com
+`--comparar base.json` imprime a razão de throughput de cada etapa contra a base e sai
+com código 1 se alguma ficou mais lenta que a `--tolerancia`.
+
+Uso:
+    python benchmarks/bench_suite.py --candidatos 10000
+    python benchmarks/bench_suite.py --candidatos 10000 --comparar data/benchmarks/suite_<commit>.json
+    python benchmarks/bench_suite.py --comparar base.json novo.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import xgboost
+from xgboost import XGBClassifier
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, RAIZ)
+from src.app_dataset import colunas_dataset_app
+from src.encoder import CodificadorFeatures
+from src.explanations import TOP_K_PADRAO
+from src.feature_engineering import (STATUS_SUCESSO, ExtratorSkills, adicionar_features_skills, calcular_experiencia_lote,
+                                     calcular_similaridade_pareada)
+from src.instrumentation import ativar, novo_registro, medir
+from src.preprocessing import converter_dados_brutos, unir_dados
+from src.ranking import IndiceRanking, construir_indice_ranking, ranquear_online
+from src.train import PARAMETROS_XGBOOST_PADRAO
+from dados_sinteticos import gerar_dados
+
+VERSAO_FORMATO = 1
+DIMENSAO_EMBEDDINGS = 384
+
+def _git(*args):
+    try:
+        return subprocess.run(['git', *args], cwd=RAIZ, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _maquina():
+    return {
+        'python': platform.python_version(), 'plataforma': platform.platform(), 'processador': platform.processor(),
+        'cpus': os.cpu_count(), 'numpy': np.__version__, 'pandas': pd.__version__, 'xgboost': xgboost.__version__,
+    }
+
+def preparar_dados(args):
+    """Diretório com data/*.json: o de `--dados` ou um sintético, reaproveitado se já gerado com os mesmos parâmetros."""
+    if args.dados:
+        return args.dados, None
+    parametros = {'candidatos': args.candidatos, 'vagas': args.vagas, 'seed': args.seed}
+    diretorio = os.path.join(args.diretorio_sintetico, f"c{args.candidatos}_v{args.vagas or 'auto'}_s{args.seed}")
+    caminho_parametros = os.path.join(diretorio, 'parametros.json')
+    if os.path.exists(caminho_parametros):
+        with open(caminho_parametros, encoding='utf-8') as f:
+            if json.load(f) == parametros:
+                print(f"-> Reaproveitando dados sintéticos de {diretorio}")
+                return diretorio, None
+    print(f"Gerando dados sintéticos ({args.candidatos} candidatos) em {diretorio}...")
+    inicio = time.perf_counter()
+    gerar_dados(diretorio, args.candidatos, args.vagas, seed=args.seed)
+    with open(caminho_parametros, 'w', encoding='utf-8') as f:
+        json.dump(parametros, f)
+    return diretorio, time.perf_counter() - inicio
+
+def _etapa_embeddings(df, amostra):
+    """Similitude com o modelo de linguagem em uma amostra; motivo (texto) se o modelo não está disponível."""
+    os.environ.setdefault('HF_HUB_OFFLINE', '1')
+    try:
+        from src.embeddings import CodificadorTexto
+        from src.feature_engineering import criar_feature_similaridade
+        modelo_linguagem = CodificadorTexto()
+    except Exception as erro:  # pacotes ausentes ou modelo fora do cache local (sem rede)
+        return f"{type(erro).__name__}: {erro}".splitlines()[0][:200]
+    amostra_df = df.sample(min(amostra, len(df)), random_state=0)
+    with medir('embeddings', len(amostra_df)):
+        criar_feature_similaridade(amostra_df, modelo_linguagem)
+    return None
+
+def rodar_suite(diretorio_dados, args):
+    """Roda as etapas e devolve (registro da instrumentação, latências em ms, etapas puladas)."""
+    ativar()
+    registro = novo_registro()
+    puladas = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        with medir('carregar') as m:
+            caminhos = converter_dados_brutos(diretorio_dados, os.path.join(tmp, 'parquet'), tamanho_lote=args.tamanho_lote)
+            m.definir_linhas(sum(pq.ParquetFile(caminho).metadata.num_rows for caminho in caminhos.values()))
+
+        with medir('unir') as m:
+            df = unir_dados(*(pd.read_parquet(caminhos[nome]) for nome in ('applicants', 'prospects', 'vagas')))
+            df['contratado'] = df['situacao_candidado'].isin(STATUS_SUCESSO).astype(np.int8)
+            m.definir_linhas(len(df))
+        print(f"-> df_mestre: {df.shape}, {df['contratado'].mean():.2%} contratados")
+
+        with medir('experiencia', len(df)):
+            df['anos_experiencia'] = calcular_experiencia_lote(df['cv_pt'].tolist(), n_processos=args.processos)
+
+        with medir('skills', len(df)):
+            df = adicionar_features_skills(df, ExtratorSkills())
+
+        if args.amostra_embeddings:
+            motivo = _etapa_embeddings(df, args.amostra_embeddings)
+            if motivo:
+                print(f"AVISO: etapa 'embeddings' pulada ({motivo})")
+                puladas['embeddings'] = motivo
+        df = df.drop(columns=['cv_pt', 'cv_en'], errors='ignore')
+
+        # Vetores aleatórios no lugar dos embeddings, um por vaga e um por candidato (como os do ArmazemEmbeddings)
+        indices_vaga, vagas_unicas = pd.factorize(df['vaga_id'])
+        indices_cv, cvs_unicos = pd.factorize(df['codigo_profissional'])
+        rng = np.random.default_rng(args.seed)
+        embeddings_vaga = rng.standard_normal((len(vagas_unicas), DIMENSAO_EMBEDDINGS), dtype=np.float32)
+        embeddings_cv = rng.standard_normal((len(cvs_unicos), DIMENSAO_EMBEDDINGS), dtype=np.float32)
+        with medir('similaridade', len(df)):
+            df['similitude_cv_vaga'] = calcular_similaridade_pareada(embeddings_vaga, embeddings_cv,
+                                                                     indices_a=indices_vaga, indices_b=indices_cv)
+        del embeddings_vaga, embeddings_cv
+
+        with medir('codificar', len(df)):
+            codificador = CodificadorFeatures().fit(df)
+            X = codificador.to_dataframe(df)
+
+        with medir('treinar', len(df)):
+            y = df['contratado'].to_numpy()
+            parametros = dict(PARAMETROS_XGBOOST_PADRAO, n_estimators=args.arvores, tree_method='hist',
+                              scale_pos_weight=float((y == 0).sum() / max((y == 1).sum(), 1)))
+            model = XGBClassifier(**parametros).fit(X, y)
+        del X
+
+        caminho_indice = os.path.join(tmp, 'ranking_index.arrow')
+        colunas = [col for col in colunas_dataset_app(codificador) if col in df.columns]
+        with medir('indice_ranking', len(df)):
+            construir_indice_ranking(df[colunas], model, codificador, caminho_indice, top_k_explicacoes=args.top_k_explicacoes)
+
+        indice = IndiceRanking(caminho_indice)
+        vagas = random.Random(args.seed).sample(indice.vagas(), min(args.consultas, len(indice.vagas())))
+        tempos = {'ranking_online': [], 'ranking_indice': []}
+        with medir('ranking_por_vaga', len(vagas)):
+            for vaga in vagas:
+                inicio = time.perf_counter()
+                ranquear_online(df[df['titulo_vaga'] == vaga], model, codificador)
+                tempos['ranking_online'].append(time.perf_counter() - inicio)
+                inicio = time.perf_counter()
+                indice.ranking(vaga)
+                tempos['ranking_indice'].append(time.perf_counter() - inicio)
+        del indice
+    latencias = {nome: {'p50': float(np.percentile(t, 50) * 1000), 'p95': float(np.percentile(t, 95) * 1000),
+                        'max': float(np.max(t) * 1000), 'consultas': len(t)} for nome, t in tempos.items() if t}
+    return registro, latencias, puladas
+
+def montar_resultado(registro, latencias, puladas, args, segundos_geracao):
+    """Resultado em JSON: metadados, etapas de nível 0 com throughput, latências e medições aninhadas."""
+    etapas = {}
+    for linha in registro.resumo():
+        if linha['nivel'] == 0:
+            etapas[linha['caminho']] = {
+                'segundos': round(linha['duracao'], 4), 'cpu': round(linha['cpu'], 4), 'pico_rss_mb': linha['pico_rss_mb'],
+                'linhas': linha['linhas'],
+                'linhas_por_s': round(linha['linhas'] / linha['duracao'], 1) if linha['linhas'] and linha['duracao'] > 0 else None,
+            }
+    return {
+        'versao_formato': VERSAO_FORMATO,
+        'commit': _git('rev-parse', 'HEAD'),
+        'alteracoes_locais': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'maquina': _maquina(),
+        'parametros': {'candidatos': args.candidatos, 'vagas': args.vagas, 'seed': args.seed, 'dados': args.dados,
+                       'processos': args.processos, 'arvores': args.arvores, 'top_k_explicacoes': args.top_k_explicacoes,
+                       'amostra_embeddings': args.amostra_embeddings, 'consultas': args.consultas},
+        'segundos_geracao': segundos_geracao,
+        'etapas': etapas,
+        'latencias_ms': latencias,
+        'puladas': puladas,
+        'medicoes': registro.medicoes,
+    }
+
+def comparar(base, novo, tolerancia, tempo_minimo=0.05):
+    """Imprime novo vs. base por etapa; retorna a lista de etapas que regrediram além da tolerância.
+
+    Etapas com menos de `tempo_minimo` segundos na base são mostradas, mas não acusam
+    regressão: nessa escala o ruído da medição domina.
+    """
+    if base['parametros'] != novo['parametros']:
+        print(f"AVISO: parâmetros diferentes entre as execuções:\n  base: {base['parametros']}\n  novo: {novo['parametros']}")
+    if (base['maquina']['cpus'], base['maquina']['processador']) != (novo['maquina']['cpus'], novo['maquina']['processador']):
+        print("AVISO: execuções em máquinas diferentes; as razões não são comparáveis.")
+    print(f"\nbase {(base['commit'] or '?')[:10]} vs. novo {(novo['commit'] or '?')[:10]}"
+          f"{' (com alterações locais)' if novo.get('alteracoes_locais') else ''}")
+    print(f"{'etapa':<20} | {'base':>12} | {'novo':>12} | {'unidade':<9} | {'razão':>6}")
+    print("-" * 72)
+    regressoes = []
+    linhas = []
+    for nome in base['etapas'].keys() & novo['etapas'].keys():
+        b, n = base['etapas'][nome], novo['etapas'][nome]
+        # Throughput quando há linhas; senão o inverso do tempo. Razão > 1: o novo é mais rápido
+        if b['linhas_por_s'] and n['linhas_por_s']:
+            linhas.append((nome, b['linhas_por_s'], n['linhas_por_s'], 'linhas/s', n['linhas_por_s'] / b['linhas_por_s'],
+                           b['segundos'] >= tempo_minimo))
+        else:
+            linhas.append((nome, b['segundos'], n['segundos'], 's', b['segundos'] / max(n['segundos'], 1e-9),
+                           b['segundos'] >= tempo_minimo))
+    for nome in base.get('latencias_ms', {}).keys() & novo.get('latencias_ms', {}).keys():
+        b, n = base['latencias_ms'][nome]['p50'], novo['latencias_ms'][nome]['p50']
+        linhas.append((f"{nome} p50", b, n, 'ms', b / max(n, 1e-9), True))
+    ordem = list(base['etapas']) + [f"{nome} p50" for nome in base.get('latencias_ms', {})]
+    for nome, valor_base, valor_novo, unidade, razao, comparavel in sorted(linhas, key=lambda linha: ordem.index(linha[0])):
+        marca = ' <-- regressão' if razao < 1 - tolerancia and comparavel else '' if comparavel else ' (curta demais)'
+        print(f"{nome:<20} | {valor_base:>12,.1f} | {valor_novo:>12,.1f} | {unidade:<9} | {razao:>6.2f}{marca}")
+        if marca.startswith(' <--'):
+            regressoes.append(nome)
+    return regressoes
+
+def _ler(caminho):
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--candidatos', type=int, default=10000, help="Escala dos dados sintéticos (1k a 1M).")
+    parser.add_argument('--vagas', type=int, default=None, help="Padrão: um terço do número de candidatos.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--dados', default=None, help="Diretório com data/*.json (ou gs://...) em vez dos dados sintéticos.")
+    parser.add_argument('--diretorio-sintetico', default='data/sintetico', help="Onde os dados sintéticos são gerados e reaproveitados.")
+    parser.add_argument('--tamanho-lote', type=int, default=5000)
+    parser.add_argument('--processos', type=int, default=1, help="Processos da extração de experiência.")
+    parser.add_argument('--arvores', type=int, default=100)
+    parser.add_argument('--top-k-explicacoes', type=int, default=TOP_K_PADRAO)
+    parser.add_argument('--amostra-embeddings', type=int, default=1000, help="Candidaturas codificadas pelo modelo de linguagem (0 desliga).")
+    parser.add_argument('--consultas', type=int, default=50, help="Vagas consultadas na medição de latência do ranking.")
+    parser.add_argument('--saida', default=None, help="Padrão: data/benchmarks/suite_<commit>_c<candidatos>.json")
+    parser.add_argument('--comparar', nargs='+', metavar='JSON',
+                        help="Base para comparar o resultado desta execução; com dois arquivos (base novo), só compara.")
+    parser.add_argument('--tolerancia', type=float, default=0.10, help="Queda de throughput tolerada na comparação.")
+    parser.add_argument('--tempo-minimo', type=float, default=0.05, help="Etapas mais curtas (s) não acusam regressão.")
+    args = parser.parse_args()
+
+    if args.comparar and len(args.comparar) > 2:
+        parser.error("--comparar aceita no máximo dois arquivos (base e novo).")
+    if args.comparar and len(args.comparar) == 2:
+        regressoes = comparar(_ler(args.comparar[0]), _ler(args.comparar[1]), args.tolerancia, args.tempo_minimo)
+        sys.exit(1 if regressoes else 0)
+
+    diretorio_dados, segundos_geracao = preparar_dados(args)
+    registro, latencias, puladas = rodar_suite(diretorio_dados, args)
+    registro.imprimir()
+    resultado = montar_resultado(registro, latencias, puladas, args, segundos_geracao)
+    print(f"\n{'latência por vaga':<18} | {'p50 (ms)':>9} | {'p95 (ms)':>9} | {'máx (ms)':>9}")
+    print("-" * 55)
+    for nome, valores in latencias.items():
+        print(f"{nome:<18} | {valores['p50']:>9.2f} | {valores['p95']:>9.2f} | {valores['max']:>9.2f}")
+
+    saida = args.saida or os.path.join('data', 'benchmarks', f"suite_{(resultado['commit'] or 'sem_git')[:10]}_c{args.candidatos}.json")
+    os.makedirs(os.path.dirname(saida) or '.', exist_ok=True)
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"\n-> Resultado gravado em {saida}")
+
+    if args.comparar:
+        regressoes = comparar(_ler(args.comparar[0]), resultado, args.tolerancia, args.tempo_minimo)
+        sys.exit(1 if regressoes else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,406 @@
+# benchmarks/dados_sinteticos.py
+"""Gerador de dados sintéticos com o layout do bucket (applicants/vagas/prospects.json).
+
+Grava `<saida>/data/{applicants,vagas,prospects}.json` com a mesma estrutura aninhada dos
+arquivos originais, em streaming (memória constante até 1M de candidatos), para rodar o
+pipeline e os benchmarks sem acesso ao GCS:
+  - CVs em português com tamanho log-normal (mediana ~3,5 mil caracteres, cauda até ~40 mil),
+    1 a 7 experiências com períodos nos formatos encontrados nos CVs ('03/2015 – 05/2017',
+    'jan de 2020 – atual', '2018 – presente') e menções às SKILLS_PADRAO;
+  - vagas com atividades/competências que citam um subconjunto das skills;
+  - candidaturas com cauda longa por vaga, datas 'dd-mm-aaaa' e situação sorteada com a
+    distribuição do notebook (~5,8% de sucesso), mais provável quanto maior a
+    sobreposição de skills entre o CV e a vaga (o modelo tem sinal para aprender).
+Mesma semente, mesmos arquivos. `gerar_df_mestre` gera direto um df_mestre já com
+features, para os benchmarks que não passam pelo carregamento.
+
+Uso:
+    python benchmarks/dados_sinteticos.py --candidatos 10000 --saida /tmp/decision_sintetico
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.feature_engineering import SKILLS_PADRAO, STATUS_SUCESSO, nome_coluna_skill
+
+NIVEIS = {
+    'nivel profissional': ['Júnior', 'Pleno', 'Sênior', 'Especialista'],
+    'nivel_academico': ['Ensino Médio Completo', 'Ensino Superior Completo', 'Pós Graduação Completo'],
+    'nivel_ingles': ['Nenhum', 'Básico', 'Intermediário', 'Avançado', 'Fluente'],
+    'nivel_espanhol': ['Nenhum', 'Básico', 'Intermediário', 'Avançado', 'Fluente'],
+    'vaga_sap': ['Sim', 'Não'],
+    'tipo_contratacao': ['CLT Full', 'PJ/Autônomo', 'Cooperado'],
+}
+
+# Distribuição de 'situacao_candidado' no prospects.json original (notebook, célula 6)
+SITUACOES = {
+    'Prospect': .3685, 'Encaminhado ao Requisitante': .3062, 'Inscrito': .0706, 'Não Aprovado pelo Cliente': .0658,
+    'Contratado pela Decision': .0500, 'Desistiu': .0457, 'Não Aprovado pelo RH': .0351,
+    'Não Aprovado pelo Requisitante': .0145, 'Entrevista Técnica': .0108, 'Entrevista com Cliente': .0081,
+    'Sem interesse nesta vaga': .0080, 'Em avaliação pelo RH': .0075, 'Aprovado': .0041,
+    'Contratado como Hunting': .0038, 'Desistiu da Contratação': .0011, 'Encaminhar Proposta': .0010,
+    'Documentação PJ': .0008, 'Proposta Aceita': .0007, 'Documentação CLT': .0005, 'Recusado': .0003,
+    'Documentação Cooperado': .0001,
+}
+
+NOMES = ['Ana', 'Bruno', 'Carla', 'Daniel', 'Eduarda', 'Felipe', 'Gabriela', 'Henrique', 'Isabela', 'João', 'Juliana',
+         'Lucas', 'Mariana', 'Mateus', 'Natália', 'Pedro', 'Rafaela', 'Rodrigo', 'Sofia', 'Thiago', 'Vanessa', 'Vinícius']
+SOBRENOMES = ['Almeida', 'Barbosa', 'Cardoso', 'Costa', 'Dias', 'Ferreira', 'Gomes', 'Lima', 'Martins', 'Melo', 'Moreira',
+              'Nascimento', 'Oliveira', 'Pereira', 'Ribeiro', 'Rocha', 'Santos', 'Silva', 'Souza', 'Teixeira']
+CARGOS = ['Desenvolvedor Java', 'Desenvolvedor Python', 'Desenvolvedor .NET', 'Desenvolvedor Front-end', 'Analista de Sistemas',
+          'Consultor SAP FI', 'Consultor SAP MM', 'Consultor SAP ABAP', 'Gerente de Projetos', 'Scrum Master',
+          'Analista de Dados', 'Engenheiro de Dados', 'DBA Oracle', 'Analista de Infraestrutura', 'Analista de Testes',
+          'Arquiteto de Soluções', 'Analista de Suporte', 'Analista Administrativo', 'Analista Financeiro', 'Product Owner']
+AREAS = ['TI - Desenvolvimento/Programação', 'TI - SAP', 'TI - Projetos', 'TI - Infraestrutura', 'TI - Banco de Dados',
+         'TI - Sistemas/Ferramentas', 'Gestão e Alocação de Recursos de TI', 'Administrativa', 'Financeira/Controladoria']
+NIVEIS_PROFISSIONAIS = ['Analista', 'Júnior', 'Pleno', 'Sênior', 'Especialista', 'Assistente', 'Técnico de Nível Médio',
+                        'Coordenador', 'Gerente', 'Líder', 'Supervisor', 'Trainee']
+NIVEIS_ACADEMICOS = ['Ensino Superior Completo', 'Ensino Superior Incompleto', 'Ensino Superior Cursando', 'Pós Graduação Completo',
+                     'Pós Graduação Incompleto', 'Ensino Médio Completo', 'Ensino Técnico Completo', 'Mestrado Completo', '']
+IDIOMAS = ['Nenhum', 'Básico', 'Intermediário', 'Avançado', 'Fluente', '']
+CIDADES = [('São Paulo', 'São Paulo'), ('Barueri', 'São Paulo'), ('Campinas', 'São Paulo'), ('Rio de Janeiro', 'Rio de Janeiro'),
+           ('Belo Horizonte', 'Minas Gerais'), ('Curitiba', 'Paraná'), ('Porto Alegre', 'Rio Grande do Sul'), ('Recife', 'Pernambuco')]
+CLIENTES = ['Gonzalez and Sons', 'Morris, Moran and Dodson', 'Nelson-Page', 'Mann and Sons', 'Barnes-Woods', 'Jenkins-Walker',
+            'Bishop, Reed and Smith', 'Miller-Curry', 'Porter-Wilson', 'Hill-Woods']
+RECRUTADORES = [f'{nome} {sobrenome}' for nome, sobrenome in zip(NOMES[::2], SOBRENOMES[::2])]
+MESES = ['jan', 'fev', 'mar', 'abr', 'mai', 'jun', 'jul', 'ago', 'set', 'out', 'nov', 'dez']
+
+FRASES_CV = [
+    "Responsável pelo desenvolvimento e manutenção de sistemas corporativos, da análise de requisitos à implantação.",
+    "Atuação junto às áreas de negócio no levantamento de requisitos e na elaboração de especificações funcionais.",
+    "Participação em projetos de migração de sistemas legados, com foco em desempenho e redução de custos.",
+    "Suporte a usuários em segundo e terceiro nível, tratamento de incidentes e problemas conforme ITIL.",
+    "Elaboração de documentação técnica, manuais de usuário e treinamentos para as equipes de operação.",
+    "Coordenação de equipe multidisciplinar com até doze pessoas, acompanhamento de cronograma e orçamento.",
+    "Modelagem de banco de dados, criação de procedures, views e otimização de consultas.",
+    "Implantação de pipelines de integração e entrega contínua e automação de testes.",
+    "Atendimento a clientes dos setores financeiro, varejo e telecomunicações.",
+    "Desenho de arquitetura de soluções e definição de padrões de desenvolvimento.",
+    "Análise de indicadores, construção de relatórios gerenciais e apresentação de resultados à diretoria.",
+    "Condução de cerimônias ágeis, refinamento de backlog e acompanhamento das entregas das sprints.",
+    "Integração entre sistemas via serviços web e mensageria, com monitoramento e tratamento de falhas.",
+    "Configuração e parametrização de módulos do ERP, testes integrados e suporte pós go-live.",
+    "Administração de servidores Linux e Windows, rotinas de backup e gestão de acessos.",
+    "Revisão de código, mentoria de desenvolvedores juniores e definição de boas práticas.",
+    "Levantamento de processos financeiros, conciliações e fechamento contábil mensal.",
+    "Negociação com fornecedores, controle de contratos e acompanhamento de níveis de serviço.",
+]
+FRASES_RESUMO = [
+    "Profissional com sólida experiência em tecnologia da informação, comprometido com qualidade e prazos.",
+    "Busco novos desafios em empresa que valorize o crescimento profissional e o trabalho em equipe.",
+    "Perfil analítico, facilidade de comunicação e experiência com clientes nacionais e internacionais.",
+    "Experiência em ambientes de alta disponibilidade e projetos de transformação digital.",
+]
+FRASES_VAGA = [
+    "Atuar no desenvolvimento de novas funcionalidades e na sustentação dos sistemas do cliente.",
+    "Participar do levantamento de requisitos e da estimativa das demandas junto à área de negócio.",
+    "Garantir a qualidade das entregas, com testes automatizados e revisão de código.",
+    "Apoiar a equipe na definição da arquitetura e na documentação técnica.",
+    "Acompanhar indicadores do projeto e reportar o andamento à gestão.",
+]
+FRASES_COMPETENCIAS = [
+    "Boa comunicação, proatividade e trabalho em equipe.",
+    "Vivência em metodologias ágeis e ambientes de grande porte.",
+    "Desejável experiência no segmento financeiro.",
+    "Capacidade de análise e resolução de problemas.",
+]
+
+def _popularidade_skills(n, seed):
+    """Probabilidade de cada skill aparecer em um CV (poucas muito comuns, várias raras)."""
+    rng = random.Random(seed)
+    return [min(0.6, 0.35 / (1 + i) ** 0.6) for i in rng.sample(range(n), n)]
+
+def _data(rng, ano_inicio, ano_fim):
+    return f"{rng.randint(1, 28):02d}-{rng.randint(1, 12):02d}-{rng.randint(ano_inicio, ano_fim)}"
+
+def _nome(rng):
+    return f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+
+def _periodo(rng, inicio, fim):
+    """Período de uma experiência em um dos formatos dos CVs (`fim=None`: emprego atual), ou '' (sem datas)."""
+    fim = rng.choice(['atual', 'presente']) if fim is None else str(fim)
+    formato = rng.random()
+    if formato < 0.4:
+        return f"{rng.randint(1, 12):02d}/{inicio} – {rng.randint(1, 12):02d}/{fim}" if fim.isdigit() else f"{rng.randint(1, 12):02d}/{inicio} – {fim}"
+    if formato < 0.7:
+        return f"{rng.choice(MESES)} de {inicio} – {fim}"
+    if formato < 0.95:
+        return f"{inicio} – {fim}"
+    return ''
+
+def _carreira(rng, n_experiencias, ano_final=2024):
+    """Períodos (início, fim) em sequência a partir do 1º emprego, alguns sobrepostos; o último pode ser o atual."""
+    ano = rng.randint(1985, ano_final - 1)
+    periodos = []
+    for i in range(n_experiencias):
+        fim = ano + rng.randint(0, 6)
+        if fim >= ano_final or (i == n_experiencias - 1 and rng.random() < 0.6):
+            periodos.append((ano, None))
+            break
+        periodos.append((ano, fim))
+        # ~15% das trocas de emprego se sobrepõem por um ano (freelas, transições)
+        ano = fim - 1 if rng.random() < 0.15 and fim > ano else fim
+    return periodos
+
+def gerar_cv(rng, cargo, skills, tamanho):
+    """CV em português com ~`tamanho` caracteres: resumo, experiências com períodos e skills citadas."""
+    partes = [cargo, "\n\nResumo profissional\n", rng.choice(FRASES_RESUMO)]
+    if skills:
+        partes.append(" Conhecimentos: " + ", ".join(skills) + ".")
+    partes.append("\n\nExperiência profissional\n")
+    periodos = _carreira(rng, rng.randint(1, 7))
+    alvo = tamanho / len(periodos)
+    # Experiência mais recente primeiro, como nos CVs
+    for inicio, fim in reversed(periodos):
+        periodo = _periodo(rng, inicio, fim)
+        partes.append(f"\nEmpresa {rng.randint(1, 5000)} – {rng.choice(CARGOS)}" + (f" ({periodo})" if periodo else "") + "\n")
+        escrito = 0
+        while escrito < alvo:
+            frase = rng.choice(FRASES_CV)
+            if skills and rng.random() < 0.3:
+                frase = frase[:-1] + f", utilizando {rng.choice(skills)}."
+            partes.append(frase + " ")
+            escrito += len(frase) + 1
+    partes.append(f"\n\nFormação acadêmica\n{rng.choice(NIVEIS_ACADEMICOS[:8])} em Sistemas de Informação.\n"
+                  f"\nIdiomas\nInglês {rng.choice(IDIOMAS[:5]).lower()}, espanhol {rng.choice(IDIOMAS[:5]).lower()}.")
+    return ''.join(partes)
+
+def gerar_cvs(n, seed=0, mediana=3000):
+    """Lista de `n` CVs sintéticos (sem o restante do registro do candidato)."""
+    rng = random.Random(seed)
+    popularidade = _popularidade_skills(len(SKILLS_PADRAO), seed)
+    return [gerar_cv(rng, rng.choice(CARGOS), [s for s, p in zip(SKILLS_PADRAO, popularidade) if rng.random() < p],
+                     _tamanho_cv(rng, mediana)) for _ in range(n)]
+
+def _tamanho_cv(rng, mediana):
+    return min(40000, max(200, int(rng.lognormvariate(math.log(mediana), 0.7))))
+
+class _EscritorJson:
+    """Grava um objeto JSON `{chave: registro}` um registro por vez (indentado como os originais)."""
+
+    def __init__(self, caminho, indentar=True):
+        self.arquivo = open(caminho, 'w', encoding='utf-8')
+        self.indentar = indentar
+        self.n = 0
+
+    def escrever(self, chave, registro):
+        self.arquivo.write((',\n' if self.n else '{\n') if self.indentar else (', ' if self.n else '{'))
+        texto = json.dumps(registro, ensure_ascii=False, indent=4 if self.indentar else None)
+        if self.indentar:
+            texto = texto.replace('\n', '\n    ')
+        self.arquivo.write(('    ' if self.indentar else '') + json.dumps(chave) + ': ' + texto)
+        self.n += 1
+
+    def fechar(self):
+        self.arquivo.write(('\n}' if self.indentar else '}') if self.n else '{}')
+        self.arquivo.close()
+
+def _mascara(skills):
+    return sum(1 << SKILLS_PADRAO.index(s) for s in skills)
+
+def _sobreposicao(mascara_cv, mascara_vaga):
+    """Fração das skills da vaga que aparecem no CV."""
+    return bin(mascara_cv & mascara_vaga).count('1') / max(bin(mascara_vaga).count('1'), 1)
+
+def gerar_vagas_json(caminho, n_vagas, seed=0, indentar=True):
+    """Grava vagas.json; retorna (ids, máscara de skills de cada vaga, título, modalidade)."""
+    rng = random.Random(seed)
+    ids, mascaras, titulos = [], [], []
+    escritor = _EscritorJson(caminho, indentar)
+    for i in range(n_vagas):
+        vaga_id = str(1000 + i)
+        cargo, nivel = rng.choice(CARGOS), rng.choice(NIVEIS_PROFISSIONAIS)
+        cidade, estado = rng.choice(CIDADES)
+        # Títulos se repetem entre vagas (o ranking agrupa por título), mas não todos
+        titulo = f"{cargo} {nivel}" + (f" - {cidade}" if rng.random() < 0.5 else "") + (f" ({vaga_id})" if rng.random() < 0.5 else "")
+        skills = rng.sample(SKILLS_PADRAO, rng.randint(1, 5))
+        atividades = ' '.join(rng.sample(FRASES_VAGA, rng.randint(2, 5))) + " Experiência com " + ', '.join(skills) + "."
+        registro = {
+            'informacoes_basicas': {
+                'data_requicisao': _data(rng, 2019, 2024), 'limite_esperado_para_contratacao': '00-00-0000',
+                'titulo_vaga': titulo, 'vaga_sap': rng.choice(['Sim', 'Não']), 'cliente': rng.choice(CLIENTES),
+                'solicitante_cliente': _nome(rng), 'empresa_divisao': 'Decision São Paulo', 'requisitante': _nome(rng),
+                'analista_responsavel': rng.choice(RECRUTADORES),
+                'tipo_contratacao': rng.choice(['CLT Full', 'PJ/Autônomo', 'CLT Full, PJ/Autônomo', 'Cooperado', 'Hunting']),
+                'prazo_contratacao': rng.choice(['Indeterminado', 'Determinado', '']),
+                'objetivo_vaga': rng.choice(['Contratação', 'Prospecção']), 'prioridade_vaga': rng.choice(['Alta: Alta complexidade 3 a 5 dias',
+                                                                                                           'Média: Média complexidade 6 a 10 dias', '']),
+                'origem_vaga': rng.choice(['Nova Posição', 'Substituição']), 'superior_imediato': '',
+            },
+            'perfil_vaga': {
+                'pais': 'Brasil', 'estado': estado, 'cidade': cidade, 'bairro': '', 'regiao': '',
+                'local_trabalho': rng.choice(['2000', '2001']), 'vaga_especifica_para_pcd': 'Não',
+                'faixa_etaria': 'De: Até: ', 'horario_trabalho': '',
+                'nivel profissional': nivel, 'nivel_academico': rng.choice(NIVEIS_ACADEMICOS[:8]),
+                'nivel_ingles': rng.choice(IDIOMAS), 'nivel_espanhol': rng.choice(IDIOMAS), 'outro_idioma': '',
+                'areas_atuacao': rng.choice(AREAS) + '-', 'principais_atividades': atividades,
+                'competencia_tecnicas_e_comportamentais': rng.choice(skills).upper() + ". " + ' '.join(rng.sample(FRASES_COMPETENCIAS, 2)),
+                'demais_observacoes': '', 'viagens_requeridas': '', 'equipamentos_necessarios': 'Nenhum -',
+            },
+            'beneficios': {'valor_venda': f"{rng.randint(60, 250)},00 -", 'valor_compra_1': 'hora', 'valor_compra_2': ''},
+        }
+        escritor.escrever(vaga_id, registro)
+        ids.append(vaga_id)
+        mascaras.append(_mascara(skills))
+        titulos.append(titulo)
+    escritor.fechar()
+    return ids, mascaras, titulos
+
+def gerar_applicants_json(caminho, n, seed=0, mediana_cv=3000, indentar=True):
+    """Grava applicants.json com `n` candidatos; retorna (códigos, nomes, máscara de skills de cada um)."""
+    rng = random.Random(seed)
+    popularidade = _popularidade_skills(len(SKILLS_PADRAO), seed)
+    codigos, nomes, mascaras = [], [], []
+    escritor = _EscritorJson(caminho, indentar)
+    for i in range(n):
+        codigo = str(10000 + i)
+        nome = _nome(rng)
+        email = f"{nome.split()[0].lower()}.{nome.split()[1].lower()}{i}@exemplo.com"
+        cargo = rng.choice(CARGOS)
+        skills = [s for s, p in zip(SKILLS_PADRAO, popularidade) if rng.random() < p]
+        telefone = f"({rng.randint(11, 99)}) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}"
+        criacao = _data(rng, 2010, 2024)
+        registro = {
+            'infos_basicas': {
+                'telefone_recado': '', 'telefone': telefone, 'objetivo_profissional': cargo if rng.random() < 0.6 else '',
+                'data_criacao': f"{criacao} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}",
+                'inserido_por': rng.choice(RECRUTADORES), 'email': email, 'local': rng.choice(CIDADES)[0],
+                'sabendo_de_nos': rng.choice(['', 'Site de Empregos', 'Indicação', 'Outros']),
+                'data_atualizacao': f"{criacao} 00:00:00", 'codigo_profissional': codigo, 'nome': nome,
+            },
+            'informacoes_pessoais': {
+                'data_aceite': 'Cadastro anterior ao registro de aceite', 'nome': nome, 'cpf': '', 'fonte_indicacao': '',
+                'email': email, 'email_secundario': '', 'data_nascimento': _data(rng, 1960, 2003) if rng.random() < 0.7 else '0000-00-00',
+                'telefone_celular': telefone, 'telefone_recado': '', 'sexo': rng.choice(['Feminino', 'Masculino', '']),
+                'estado_civil': rng.choice(['Solteiro', 'Casado', '']), 'pcd': rng.choice(['Não', '']), 'endereco': rng.choice(CIDADES)[1].lower(),
+                'skype': '', 'url_linkedin': '', 'facebook': '',
+            },
+            'informacoes_profissionais': {
+                'titulo_profissional': cargo if rng.random() < 0.7 else '', 'area_atuacao': rng.choice(AREAS) if rng.random() < 0.7 else '',
+                'conhecimentos_tecnicos': ', '.join(skills) if rng.random() < 0.3 else '', 'certificacoes': '', 'outras_certificacoes': '',
+                'remuneracao': rng.choice(['', f"{rng.randint(2, 30) * 1000}", f"R$ {rng.randint(2, 30)}.000,00", 'A combinar']),
+                'nivel_profissional': rng.choice(NIVEIS_PROFISSIONAIS + [''] * 4),
+            },
+            'formacao_e_idiomas': {
+                'nivel_academico': rng.choice(NIVEIS_ACADEMICOS), 'nivel_ingles': rng.choice(IDIOMAS),
+                'nivel_espanhol': rng.choice(IDIOMAS), 'outro_idioma': rng.choice(['', '', 'Italiano - Básico']),
+                'instituicao_ensino_superior': '', 'cursos': '', 'ano_conclusao': str(rng.randint(1985, 2023)) if rng.random() < 0.5 else '0',
+            },
+            'cargo_atual': {} if rng.random() < 0.9 else {
+                'id_ibrati': str(rng.randint(1000, 9999)), 'email_corporativo': '', 'cargo_atual': cargo, 'projeto_atual': '',
+                'cliente': rng.choice(CLIENTES), 'unidade': 'Decision São Paulo', 'data_admissao': _data(rng, 2015, 2024),
+                'data_ultima_promocao': '', 'nome_superior_imediato': '', 'email_superior_imediato': '',
+            },
+            'cv_pt': gerar_cv(rng, cargo, skills, _tamanho_cv(rng, mediana_cv)),
+            # A maioria dos candidatos não tem CV em inglês
+            'cv_en': '' if rng.random() < 0.9 else "Professional summary. " * rng.randint(5, 50),
+        }
+        escritor.escrever(codigo, registro)
+        codigos.append(codigo)
+        nomes.append(nome)
+        mascaras.append(_mascara(skills))
+    escritor.fechar()
+    return codigos, nomes, mascaras
+
+def gerar_prospects_json(caminho, vagas, candidatos, prospects_por_candidato=1.07, seed=0, indentar=True):
+    """Grava prospects.json: candidaturas distribuídas com cauda longa entre as vagas.
+
+    `vagas` e `candidatos` são os retornos de `gerar_vagas_json` e `gerar_applicants_json`.
+    A chance de uma situação de sucesso cresce com a fração das skills da vaga presentes no
+    CV; as demais situações seguem a distribuição original. Retorna o número de candidaturas.
+    """
+    rng = random.Random(seed)
+    ids, mascaras_vaga, titulos = vagas
+    codigos, nomes, mascaras_cv = candidatos
+    n_total = round(len(codigos) * prospects_por_candidato)
+    pesos = [rng.paretovariate(1.2) for _ in ids]
+    contagens = np.random.default_rng(seed).multinomial(n_total, np.array(pesos) / sum(pesos)) if ids else []
+    fracassos = [s for s in SITUACOES if s not in STATUS_SUCESSO]
+    pesos_fracassos = [SITUACOES[s] for s in fracassos]
+    sucessos = [s for s in SITUACOES if s in STATUS_SUCESSO]
+    pesos_sucessos = [SITUACOES[s] for s in sucessos]
+    taxa_sucesso = sum(pesos_sucessos)
+    # Sobreposição média de pares ao acaso: normaliza o bônus para manter a taxa média de sucesso
+    pares = [(rng.randrange(len(ids)), rng.randrange(len(codigos))) for _ in range(2000)] if ids and codigos else []
+    media = max(np.mean([_sobreposicao(mascaras_cv[j], mascaras_vaga[i]) for i, j in pares]) if pares else 0, 1e-6)
+    escritor = _EscritorJson(caminho, indentar)
+    for vaga_id, mascara_vaga, titulo, n in zip(ids, mascaras_vaga, titulos, contagens):
+        prospects = []
+        for _ in range(int(n)):
+            j = rng.randrange(len(codigos))
+            sucesso = rng.random() < taxa_sucesso * (0.3 + 0.7 * _sobreposicao(mascaras_cv[j], mascara_vaga) / media)
+            situacao = rng.choices(sucessos, pesos_sucessos)[0] if sucesso else rng.choices(fracassos, pesos_fracassos)[0]
+            candidatura = _data(rng, 2019, 2024)
+            prospects.append({
+                'nome': nomes[j], 'codigo': codigos[j], 'situacao_candidado': situacao, 'data_candidatura': candidatura,
+                'ultima_atualizacao': candidatura, 'comentario': rng.choice(['', '', 'Encaminhado para entrevista.', 'Sem retorno.']),
+                'recrutador': rng.choice(RECRUTADORES),
+            })
+        escritor.escrever(vaga_id, {'titulo': titulo, 'modalidade': '', 'prospects': prospects})
+    escritor.fechar()
+    return n_total
+
+def gerar_dados(diretorio, n_candidatos, n_vagas=None, prospects_por_candidato=1.07, seed=0, mediana_cv=3000, indentar=True):
+    """Grava os três JSON em `<diretorio>/data/` (o layout do bucket); retorna {nome: linhas}."""
+    os.makedirs(os.path.join(diretorio, 'data'), exist_ok=True)
+    # Proporção dos dados reais: ~14 mil vagas para ~42 mil candidatos
+    n_vagas = n_vagas or max(1, n_candidatos // 3)
+    caminho = lambda nome: os.path.join(diretorio, 'data', f'{nome}.json')
+    vagas = gerar_vagas_json(caminho('vagas'), n_vagas, seed, indentar)
+    candidatos = gerar_applicants_json(caminho('applicants'), n_candidatos, seed + 1, mediana_cv, indentar)
+    n_prospects = gerar_prospects_json(caminho('prospects'), vagas, candidatos, prospects_por_candidato, seed + 2, indentar)
+    return {'applicants': n_candidatos, 'vagas': n_vagas, 'prospects': n_prospects}
+
+def gerar_df_mestre(n_linhas, n_vagas, seed=0):
+    """df_mestre sintético com as colunas usadas pelo modelo e pelo app."""
+    rng = np.random.default_rng(seed)
+    vagas = rng.integers(0, n_vagas, n_linhas)
+    # Tamanho das vagas bem desigual, como nos dados reais
+    vagas = np.minimum(vagas, rng.integers(0, n_vagas, n_linhas))
+    df = pd.DataFrame({
+        'codigo_profissional': rng.integers(0, n_linhas, n_linhas).astype(str),
+        'vaga_id': vagas.astype(str),
+        'titulo_vaga': np.char.add('Vaga ', vagas.astype(str)),
+        'nome': [f"Candidato {i}" for i in range(n_linhas)],
+        'email': [f"candidato{i}@exemplo.com" for i in range(n_linhas)],
+        'principais_atividades': np.char.add('Atividades da vaga ', vagas.astype(str)),
+        'competencia_tecnicas_e_comportamentais': np.char.add('Competências da vaga ', vagas.astype(str)),
+        'similitude_cv_vaga': rng.random(n_linhas).astype(np.float32),
+        'anos_experiencia': rng.integers(0, 30, n_linhas).astype(np.float32),
+    })
+    for coluna, valores in NIVEIS.items():
+        df[coluna] = rng.choice(valores, n_linhas)
+    for skill in SKILLS_PADRAO:
+        df[nome_coluna_skill(skill)] = rng.poisson(0.3, n_linhas)
+    df['contratado'] = (rng.random(n_linhas) < 0.1 + 0.4 * df['similitude_cv_vaga']).astype(int)
+    return df
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--candidatos', type=int, default=10000)
+    parser.add_argument('--vagas', type=int, default=None, help="Padrão: um terço do número de candidatos.")
+    parser.add_argument('--prospects-por-candidato', type=float, default=1.07)
+    parser.add_argument('--mediana-cv', type=int, default=3000, help="Mediana do tamanho dos CVs, em caracteres.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--compacto', action='store_true', help="JSON sem indentação (arquivos ~15%% menores).")
+    parser.add_argument('--saida', default='data/sintetico')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    linhas = gerar_dados(args.saida, args.candidatos, args.vagas, args.prospects_por_candidato, args.seed,
+                         args.mediana_cv, indentar=not args.compacto)
+    for nome, n in linhas.items():
+        caminho = os.path.join(args.saida, 'data', f'{nome}.json')
+        print(f"-> {nome}: {n} {'candidaturas' if nome == 'prospects' else 'registros'} em {caminho} ({os.path.getsize(caminho) / 2**20:.1f} MB)")
+    print(f"Gerado em {time.perf_counter() - inicio:.1f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+# src/app_dataset.py
+"""Dataset compacto do app: candidaturas ordenadas por vaga, textos das vagas à parte e CVs sob demanda.
+
+O df_mestre repete os textos da vaga em cada candidatura e carrega os CVs completos e dezenas
+de colunas de texto. No diretório do dataset do app ficam três tabelas:
+  - candidaturas.parquet: só as colunas que o app usa, ordenadas por `titulo_vaga`, com
+    colunas de texto de baixa cardinalidade como categoria e numéricas reduzidas (float32,
+    inteiros sem sinal); a lista de vagas, o intervalo de linhas e a assinatura das
+    candidaturas de cada uma vão nos metadados;
+  - vagas.parquet: os textos de cada `vaga_id`, uma vez por vaga;
+  - cvs.parquet: CVs por `codigo_profissional`, ordenados e em row groups pequenos, lidos
+    só quando um CV é aberto.
+
+Uso:
+    python -m src.app_dataset --dataset data/df_mestre_preprocessado.parquet --saida data/app_dataset
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.encoder import CAMINHO_CODIFICADOR_PADRAO, CodificadorFeatures
+from src.ranking import CHAVE_PADRAO, COLUNAS_EXIBICAO, COLUNAS_VAGA, assinaturas_vagas, colunas_assinatura
+
+DIRETORIO_DATASET_APP = 'data/app_dataset'
+ARQUIVO_CANDIDATURAS = 'candidaturas.parquet'
+ARQUIVO_VAGAS = 'vagas.parquet'
+ARQUIVO_CVS = 'cvs.parquet'
+COLUNAS_TEXTO_VAGA = ['principais_atividades', 'competencia_tecnicas_e_comportamentais']
+COLUNAS_CV = ['cv_pt', 'cv_en']
+# Colunas de texto com até esta fração de valores distintos viram categoria
+FRACAO_MAXIMA_CATEGORIA = 0.5
+LINHAS_POR_GRUPO_CVS = 1000
+
+def colunas_dataset_app(codificador):
+    """Colunas do df_mestre que o app usa (ranking, fallback online e recomendações); sem os CVs."""
+    colunas = [CHAVE_PADRAO, 'codigo_profissional'] + COLUNAS_VAGA + COLUNAS_EXIBICAO + codificador.colunas_entrada
+    return list(dict.fromkeys(colunas))
+
+def compactar_coluna(serie, numerica=False):
+    """Menor representação da coluna que mantém o que o app (e o codificador) leem dela."""
+    if numerica:
+        # Mesmo resultado no codificador: texto vira número (ou nulo) e tudo vira float32
+        valores = pd.to_numeric(serie, errors='coerce')
+        if pd.api.types.is_integer_dtype(valores) and len(valores):
+            return pd.to_numeric(valores, downcast='unsigned' if valores.min() >= 0 else 'integer')
+        return valores.astype(np.float32)
+    if pd.api.types.is_float_dtype(serie):
+        return serie.astype(np.float32)
+    if serie.dtype == object and serie.nunique(dropna=True) <= FRACAO_MAXIMA_CATEGORIA * len(serie):
+        return serie.astype('category')
+    return serie
+
+def compactar(df, codificador, chave=CHAVE_PADRAO):
+    """Separa o df_mestre em (candidaturas, vagas, cvs); `cvs` é None se o df não tem CVs."""
+    colunas_vaga = [col for col in COLUNAS_TEXTO_VAGA if col in df.columns]
+    vagas = (df[['vaga_id'] + colunas_vaga].astype({'vaga_id': str})
+             .drop_duplicates('vaga_id').sort_values('vaga_id').reset_index(drop=True))
+
+    colunas_cv = [col for col in COLUNAS_CV if col in df.columns]
+    cvs = None
+    if colunas_cv:
+        cvs = (df[['codigo_profissional'] + colunas_cv].astype({'codigo_profissional': str})
+               .drop_duplicates('codigo_profissional').sort_values('codigo_profissional').reset_index(drop=True))
+
+    numericas = {col for col in codificador.colunas_entrada if col not in codificador.categorias}
+    colunas = [col for col in colunas_dataset_app(codificador) if col in df.columns and col not in colunas_vaga]
+    candidaturas = df[colunas].astype({col: str for col in (chave, 'vaga_id') if col in colunas})
+    candidaturas = candidaturas.sort_values(chave, kind='stable').reset_index(drop=True)
+    for col in candidaturas.columns:
+        if col != chave:
+            candidaturas[col] = compactar_coluna(candidaturas[col], numerica=col in numericas)
+    return candidaturas, vagas, cvs
+
+def _indexar_vagas(candidaturas, chave):
+    """Intervalo `[início, n]` de cada vaga nas candidaturas ordenadas; a chave vira categoria depois."""
+    chaves, inicios, contagens = np.unique(candidaturas[chave].to_numpy(), return_index=True, return_counts=True)
+    candidaturas[chave] = candidaturas[chave].astype('category')
+    return {str(k): [int(i), int(n)] for k, i, n in zip(chaves, inicios, contagens)}
+
+def _gravar(tabela, caminho, **kwargs):
+    pq.write_table(tabela, caminho + '.tmp', **kwargs)
+    os.replace(caminho + '.tmp', caminho)
+
+def salvar_dataset_app(df, codificador, diretorio=DIRETORIO_DATASET_APP, chave=CHAVE_PADRAO):
+    """Grava o dataset compacto do app em `diretorio` (candidaturas, vagas e, se houver, CVs)."""
+    candidaturas, vagas, cvs = compactar(df, codificador, chave)
+    intervalos = _indexar_vagas(candidaturas, chave)
+    tabela = pa.Table.from_pandas(candidaturas, preserve_index=False)
+    tabela = tabela.replace_schema_metadata({
+        **(tabela.schema.metadata or {}),
+        b'app_chave': chave.encode('utf-8'),
+        b'app_intervalos': json.dumps(intervalos, ensure_ascii=False).encode('utf-8'),
+        b'app_assinaturas': json.dumps(assinaturas_vagas(df, colunas_assinatura(codificador), chave), ensure_ascii=False).encode('utf-8'),
+    })
+    os.makedirs(diretorio, exist_ok=True)
+    _gravar(tabela, os.path.join(diretorio, ARQUIVO_CANDIDATURAS))
+    _gravar(pa.Table.from_pandas(vagas, preserve_index=False), os.path.join(diretorio, ARQUIVO_VAGAS))
+    if cvs is not None:
+        _gravar(pa.Table.from_pandas(cvs, preserve_index=False), os.path.join(diretorio, ARQUIVO_CVS),
+                row_group_size=LINHAS_POR_GRUPO_CVS)
+    print(f"-> Dataset do app com {len(intervalos)} vagas e {len(candidaturas)} candidaturas gravado em {diretorio}")
+    return diretorio
+
+class DatasetApp:
+    """Dataset do app em memória: candidaturas compactas + textos das vagas; CVs ficam no disco.
+
+    `lista_vagas` e os intervalos de linhas vêm prontos, então trocar de vaga é um `iloc`
+    sobre a fatia contígua da vaga, sem filtrar nem converter o dataset a cada rerun.
+    """
+
+    def __init__(self, candidaturas, vagas, intervalos, chave=CHAVE_PADRAO, caminho_cvs=None, assinaturas=None):
+        self.candidaturas = candidaturas
+        self.vagas = vagas.set_index('vaga_id') if 'vaga_id' in vagas.columns else vagas
+        self.chave = chave
+        self.caminho_cvs = caminho_cvs
+        self._intervalos = intervalos
+        # None em datasets gravados antes das assinaturas: o índice de ranking é usado como está
+        self._assinaturas = assinaturas
+        self.lista_vagas = list(intervalos)
+
+    @classmethod
+    def carregar(cls, diretorio=DIRETORIO_DATASET_APP):
+        tabela = pq.read_table(os.path.join(diretorio, ARQUIVO_CANDIDATURAS))
+        metadados = tabela.schema.metadata
+        # Sem a cópia Arrow + pandas ao mesmo tempo: os buffers Arrow são liberados na conversão
+        candidaturas = tabela.to_pandas(split_blocks=True, self_destruct=True)
+        del tabela
+        caminho_cvs = os.path.join(diretorio, ARQUIVO_CVS)
+        return cls(candidaturas, pd.read_parquet(os.path.join(diretorio, ARQUIVO_VAGAS)),
+                   json.loads(metadados[b'app_intervalos']), chave=metadados[b'app_chave'].decode('utf-8'),
+                   caminho_cvs=caminho_cvs if os.path.exists(caminho_cvs) else None,
+                   assinaturas=json.loads(metadados[b'app_assinaturas']) if b'app_assinaturas' in metadados else None)
+
+    @classmethod
+    def de_dataframe(cls, df, codificador, chave=CHAVE_PADRAO):
+        """Monta o dataset em memória a partir do df_mestre (buckets sem o dataset do app)."""
+        candidaturas, vagas, _ = compactar(df, codificador, chave)
+        return cls(candidaturas, vagas, _indexar_vagas(candidaturas, chave), chave=chave,
+                   assinaturas=assinaturas_vagas(df, colunas_assinatura(codificador), chave))
+
+    @property
+    def columns(self):
+        """Colunas disponíveis em `candidaturas_da_vaga` (como o `columns` do df_mestre)."""
+        return self.candidaturas.columns.append(self.vagas.columns)
+
+    def __len__(self):
+        return len(self.candidaturas)
+
+    def __contains__(self, vaga):
+        return str(vaga) in self._intervalos
+
+    def contagem(self, vaga):
+        return self._intervalos.get(str(vaga), [0, 0])[1]
+
+    def assinatura(self, vaga):
+        """Assinatura das candidaturas da vaga (compare com `IndiceRanking.assinatura`), ou None."""
+        if self._assinaturas is None:
+            return None
+        return self._assinaturas.get(str(vaga))
+
+    def candidaturas_da_vaga(self, vaga):
+        """Candidaturas da vaga com os textos da vaga, como as linhas do df_mestre (vazio se não existe)."""
+        inicio, n = self._intervalos.get(str(vaga), [0, 0])
+        fatia = self.candidaturas.iloc[inicio:inicio + n]
+        # Categóricas voltam como texto, como no índice de ranking
+        colunas = {col: np.asarray(fatia[col]) if isinstance(tipo, pd.CategoricalDtype) else fatia[col].to_numpy()
+                   for col, tipo in fatia.dtypes.items()}
+        if 'vaga_id' in colunas:
+            posicoes = self.vagas.index.get_indexer(colunas['vaga_id'])
+            for col in self.vagas.columns:
+                colunas[col] = np.where(posicoes >= 0, self.vagas[col].to_numpy()[posicoes], None)
+        return pd.DataFrame(colunas)
+
+    def cvs(self, codigos, coluna='cv_pt'):
+        """{codigo_profissional: texto} lido do disco na hora; só os row groups com os códigos são lidos."""
+        if self.caminho_cvs is None or coluna not in pq.read_schema(self.caminho_cvs).names:
+            return {}
+        codigos = sorted({str(codigo) for codigo in codigos})
+        tabela = pq.read_table(self.caminho_cvs, columns=['codigo_profissional', coluna],
+                               filters=[('codigo_profissional', 'in', codigos)])
+        return dict(zip(tabela.column('codigo_profissional').to_pylist(), tabela.column(coluna).to_pylist()))
+
+    def memoria(self):
+        """Bytes em memória (candidaturas + vagas)."""
+        return int(self.candidaturas.memory_usage(deep=True).sum() + self.vagas.memory_usage(deep=True).sum())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dataset', default='data/df_mestre_preprocessado.parquet')
+    parser.add_argument('--codificador', default=CAMINHO_CODIFICADOR_PADRAO)
+    parser.add_argument('--saida', default=DIRETORIO_DATASET_APP)
+    args = parser.parse_args()
+
+    codificador = CodificadorFeatures.carregar(args.codificador)
+    salvar_dataset_app(pd.read_parquet(args.dataset), codificador, args.saida)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+# src/artifacts.py
+import json
+import os
+import re
+import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import pandas as pd
+import pyarrow.parquet as pq
+
+from src.app_dataset import DIRETORIO_DATASET_APP, DatasetApp, colunas_dataset_app
+from src.encoder import CodificadorFeatures
+from src.ranking import abrir_indice_ranking
+
+DIRETORIO_CACHE_ARTEFATOS_PADRAO = os.environ.get('DECISION_CACHE_ARTEFATOS', 'data/cache_artefatos')
+
+ARTEFATOS_APP = {
+    'modelo': 'models/recruitment_model.joblib',
+    'colunas': 'models/model_columns.joblib',
+    'codificador': 'models/feature_encoder.joblib',
+    'dataset': 'data/df_mestre_preprocessado.parquet',
+    'indice_ranking': 'models/ranking_index.arrow',
+}
+DIRETORIO_INDICE_CANDIDATOS = 'models/indice_candidatos'
+# Campos de `info()` que identificam a versão de um objeto, do mais ao menos confiável
+_CAMPOS_VERSAO = ('generation', 'etag', 'ETag', 'md5Hash', 'md5')
+
+_executor_segundo_plano = ThreadPoolExecutor(max_workers=2, thread_name_prefix='segundo-plano')
+
+def carregar_em_segundo_plano(funcao, *args, **kwargs):
+    """Dispara `funcao` em uma thread e devolve o `Future` (ex.: modelo de linguagem)."""
+    return _executor_segundo_plano.submit(funcao, *args, **kwargs)
+
+def versao_objeto(info):
+    """Versão de um objeto remoto a partir do `info()` do fsspec (generation/ETag, ou tamanho+data)."""
+    for campo in _CAMPOS_VERSAO:
+        if info.get(campo):
+            return f"{campo}:{info[campo]}"
+    data = info.get('updated') or info.get('LastModified') or info.get('mtime') or info.get('created')
+    return f"size:{info.get('size')}|data:{data}"
+
+class CacheArtefatos:
+    """Cópia local dos artefatos remotos, revalidada pela versão (generation/ETag) do objeto.
+
+    Um artefato só é baixado de novo se a versão remota mudou; sem acesso ao bucket, a
+    cópia local existente é usada. Downloads vão para um arquivo temporário e são
+    renomeados no fim, então uma cópia interrompida nunca é usada.
+    """
+
+    def __init__(self, filesystem, diretorio=DIRETORIO_CACHE_ARTEFATOS_PADRAO, max_downloads=8):
+        self.filesystem = filesystem
+        self.diretorio = diretorio
+        self.max_downloads = max_downloads
+        os.makedirs(diretorio, exist_ok=True)
+
+    def _caminho_local(self, caminho_remoto):
+        relativo = re.sub(r'^[a-z0-9]+://', '', caminho_remoto).lstrip('/')
+        return os.path.join(self.diretorio, *relativo.split('/'))
+
+    def obter(self, caminho_remoto):
+        """Caminho local atualizado do artefato; None se ele não existe no bucket nem no cache."""
+        caminho_local = self._caminho_local(caminho_remoto)
+        caminho_versao = caminho_local + '.versao.json'
+        try:
+            versao = versao_objeto(self.filesystem.info(caminho_remoto))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            if os.path.exists(caminho_local):
+                print(f"AVISO: não foi possível revalidar {caminho_remoto} ({e}); usando a cópia local.")
+                return caminho_local
+            raise
+
+        if os.path.exists(caminho_local) and os.path.exists(caminho_versao):
+            with open(caminho_versao, encoding='utf-8') as f:
+                if json.load(f).get('versao') == versao:
+                    return caminho_local
+
+        os.makedirs(os.path.dirname(caminho_local), exist_ok=True)
+        temporario = f"{caminho_local}.{uuid.uuid4().hex[:8]}.tmp"
+        with self.filesystem.open(caminho_remoto, 'rb') as origem, open(temporario, 'wb') as destino:
+            shutil.copyfileobj(origem, destino, length=1 << 22)
+        os.replace(temporario, caminho_local)
+        with open(caminho_versao, 'w', encoding='utf-8') as f:
+            json.dump({'versao': versao, 'origem': caminho_remoto}, f)
+        return caminho_local
+
+    def obter_varios(self, caminhos_remotos):
+        """Como `obter`, para vários artefatos independentes, baixados em paralelo."""
+        with ThreadPoolExecutor(max_workers=self.max_downloads) as executor:
+            return dict(zip(caminhos_remotos, executor.map(self.obter, caminhos_remotos)))
+
+    def obter_diretorio(self, caminho_remoto):
+        """Sincroniza um diretório remoto (ex.: índice IVF); None se ele não existe."""
+        try:
+            arquivos = list(self.filesystem.find(caminho_remoto))
+        except FileNotFoundError:
+            arquivos = []
+        if not arquivos:
+            return None
+        self.obter_varios(arquivos)
+        return self._caminho_local(caminho_remoto)
+
+def ler_parquet_projetado(caminho, colunas):
+    """Lê só as `colunas` (existentes) do Parquet."""
+    existentes = set(pq.read_schema(caminho).names)
+    return pd.read_parquet(caminho, columns=[col for col in colunas if col in existentes])
+
+def carregar_artefatos_app(filesystem, raiz, cache=None, carregar_buscador=True):
+    """Baixa (ou revalida) em paralelo os artefatos do app e os carrega.
+
+    `raiz` é o prefixo do bucket (ex.: 'gs://<bucket>') ou um diretório local com o mesmo
+    layout. Retorna um dict com 'modelo', 'codificador', 'dataset_app' (`DatasetApp`),
+    'indice_ranking' e 'buscador_candidatos' (os dois últimos podem ser None). Sem o dataset
+    compacto do app no bucket, ele é montado a partir do df_mestre_preprocessado.parquet.
+    """
+    cache = cache or CacheArtefatos(filesystem)
+    remotos = {nome: f"{raiz}/{caminho}" for nome, caminho in ARTEFATOS_APP.items() if nome != 'dataset'}
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        arquivos = executor.submit(cache.obter_varios, list(remotos.values()))
+        diretorio_dataset = executor.submit(cache.obter_diretorio, f"{raiz}/{DIRETORIO_DATASET_APP}")
+        diretorio_candidatos = executor.submit(cache.obter_diretorio, f"{raiz}/{DIRETORIO_INDICE_CANDIDATOS}") if carregar_buscador else None
+        locais = {nome: arquivos.result()[remoto] for nome, remoto in remotos.items()}
+        diretorio_dataset = diretorio_dataset.result()
+        if diretorio_dataset is None:
+            locais['dataset'] = cache.obter(f"{raiz}/{ARTEFATOS_APP['dataset']}")
+        diretorio_candidatos = diretorio_candidatos.result() if diretorio_candidatos else None
+
+    modelo = joblib.load(locais['modelo'])
+    # Codificador ajustado no treino; modelos antigos (sem ele) usam as colunas salvas
+    if locais['codificador']:
+        codificador = CodificadorFeatures.carregar(locais['codificador'])
+    else:
+        codificador = CodificadorFeatures.de_colunas_modelo(list(joblib.load(locais['colunas'])))
+
+    if diretorio_dataset is not None:
+        dataset_app = DatasetApp.carregar(diretorio_dataset)
+    else:
+        dataset_app = DatasetApp.de_dataframe(ler_parquet_projetado(locais['dataset'], colunas_dataset_app(codificador)), codificador)
+    indice_ranking = abrir_indice_ranking(locais['indice_ranking'], modelo, codificador) if locais['indice_ranking'] else None
+    buscador_candidatos = None
+    if diretorio_candidatos:
+        # Import tardio: o scikit-learn só é carregado quando há índice de candidatos
+        from src.retrieval import BuscadorCandidatos
+        buscador_candidatos = BuscadorCandidatos(diretorio_candidatos)
+    return {'modelo': modelo, 'codificador': codificador, 'dataset_app': dataset_app,
+            'indice_ranking': indice_ranking, 'buscador_candidatos': buscador_candidatos}
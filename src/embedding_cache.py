@@ -0,0 +1,174 @@
+# src/embedding_cache.py
+import glob
+import hashlib
+import os
+import re
+import threading
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import instrumentar
+
+DIRETORIO_CACHE_PADRAO = os.environ.get('DECISION_EMBEDDINGS_CACHE', 'data/embeddings_cache')
+
+def normalizar_texto(texto):
+    """Normaliza um texto para a chave do cache (nulos viram '' e espaços são colapsados)."""
+    if texto is None or (isinstance(texto, float) and np.isnan(texto)):
+        return ''
+    return ' '.join(str(texto).split())
+
+def chave_texto(texto_normalizado, nome_modelo):
+    """Chave de conteúdo: hash do nome do modelo + texto normalizado."""
+    conteudo = f"{nome_modelo}\x00{texto_normalizado}".encode('utf-8')
+    return hashlib.blake2b(conteudo, digest_size=16).hexdigest()
+
+class ArmazemEmbeddings:
+    """Cache de embeddings endereçado por conteúdo, persistido em lotes `.npy` memory-mapped.
+
+    Cada texto único é codificado uma única vez por modelo; execuções seguintes (retreino,
+    app Streamlit, aba "Otimizar meu CV") só codificam textos novos ou alterados.
+    Com `diretorio=None` o armazém fica apenas em memória (deduplica, mas não persiste).
+
+    Layout em disco: `<diretorio>/<modelo>/lote-<ts>-<id>.npy` (vetores float32) e
+    `lote-<ts>-<id>.chaves.npy` (chaves). O arquivo de chaves é gravado por último e
+    marca o lote como completo.
+    """
+
+    def __init__(self, nome_modelo, diretorio=DIRETORIO_CACHE_PADRAO):
+        self.nome_modelo = nome_modelo
+        self.diretorio = None
+        if diretorio is not None:
+            self.diretorio = os.path.join(diretorio, re.sub(r'[^A-Za-z0-9._-]+', '_', nome_modelo))
+            os.makedirs(self.diretorio, exist_ok=True)
+        self._lock = threading.Lock()
+        self._lotes_carregados = set()
+        self._vetores = []          # um array (memmap) por lote
+        self._chaves = pd.Index([], dtype=object)
+        self._lote_de = np.empty(0, dtype=np.int32)
+        self._linha_de = np.empty(0, dtype=np.int64)
+        self._carregar_novos_lotes()
+
+    def __len__(self):
+        return len(self._chaves)
+
+    def _carregar_novos_lotes(self):
+        """Abre (mmap) os lotes gravados no disco que ainda não estão no índice."""
+        if self.diretorio is None:
+            return
+        novas_chaves, novos_lotes, novas_linhas = [], [], []
+        for caminho_chaves in sorted(glob.glob(os.path.join(self.diretorio, 'lote-*.chaves.npy'))):
+            nome = os.path.basename(caminho_chaves)[:-len('.chaves.npy')]
+            if nome in self._lotes_carregados:
+                continue
+            chaves = np.load(caminho_chaves, allow_pickle=False).astype(str)
+            vetores = np.load(os.path.join(self.diretorio, f"{nome}.npy"), mmap_mode='r')
+            self._lotes_carregados.add(nome)
+            novas_chaves.append(chaves)
+            novos_lotes.append(np.full(len(chaves), len(self._vetores), dtype=np.int32))
+            novas_linhas.append(np.arange(len(chaves), dtype=np.int64))
+            self._vetores.append(vetores)
+        if novas_chaves:
+            self._indexar(novas_chaves, novos_lotes, novas_linhas)
+
+    def _indexar(self, novas_chaves, novos_lotes, novas_linhas):
+        chaves = self._chaves.append(pd.Index(np.concatenate(novas_chaves), dtype=object))
+        lote_de = np.concatenate([self._lote_de] + novos_lotes)
+        linha_de = np.concatenate([self._linha_de] + novas_linhas)
+        # Dois processos podem ter gravado o mesmo texto: fica a primeira ocorrência
+        unicas = ~chaves.duplicated(keep='first')
+        self._chaves, self._lote_de, self._linha_de = chaves[unicas], lote_de[unicas], linha_de[unicas]
+
+    def _adicionar(self, chaves, vetores):
+        vetores = np.ascontiguousarray(vetores, dtype=np.float32)
+        if self.diretorio is not None:
+            nome = f"lote-{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+            caminho_vetores = os.path.join(self.diretorio, f"{nome}.npy")
+            caminho_chaves = os.path.join(self.diretorio, f"{nome}.chaves.npy")
+            # Grava em arquivos temporários e renomeia: leitores nunca veem lotes incompletos
+            for caminho, dados in ((caminho_vetores, vetores), (caminho_chaves, np.asarray(chaves, dtype='U32'))):
+                with open(caminho + '.tmp', 'wb') as f:
+                    np.save(f, dados)
+                os.replace(caminho + '.tmp', caminho)
+            self._lotes_carregados.add(nome)
+            vetores = np.load(caminho_vetores, mmap_mode='r')
+        self._vetores.append(vetores)
+        self._indexar([np.asarray(chaves, dtype=object)],
+                      [np.full(len(chaves), len(self._vetores) - 1, dtype=np.int32)],
+                      [np.arange(len(chaves), dtype=np.int64)])
+
+    def _reunir(self, posicoes):
+        """Copia para um array denso os vetores nas posições do índice."""
+        dimensao = self._vetores[0].shape[1] if self._vetores else 0
+        saida = np.empty((len(posicoes), dimensao), dtype=np.float32)
+        lotes = self._lote_de[posicoes]
+        linhas = self._linha_de[posicoes]
+        for lote in np.unique(lotes):
+            mascara = lotes == lote
+            saida[mascara] = self._vetores[lote][linhas[mascara]]
+        return saida
+
+    @instrumentar('embeddings', linhas=lambda resultado: len(resultado[1]))
+    def codificar_unicos(self, textos, modelo, batch_size=64, show_progress_bar=False, persistir=True):
+        """Codifica apenas os textos únicos que ainda não estão no cache.
+
+        Retorna `(vetores_unicos, indices)`, onde `vetores_unicos[indices[i]]` é o
+        embedding de `textos[i]`. Assim a memória cresce com o número de textos
+        distintos, não com o número de linhas do DataFrame.
+        """
+        normalizados = pd.Series([normalizar_texto(t) for t in textos], dtype=object)
+        indices, textos_unicos = pd.factorize(normalizados)
+        chaves = np.array([chave_texto(t, self.nome_modelo) for t in textos_unicos], dtype=object)
+
+        with self._lock:
+            posicoes = self._chaves.get_indexer(chaves)
+            if (posicoes < 0).any():
+                # Outro processo (ex.: o retreino) pode ter gravado lotes novos
+                self._carregar_novos_lotes()
+                posicoes = self._chaves.get_indexer(chaves)
+
+            faltantes = np.flatnonzero(posicoes < 0)
+            if len(faltantes):
+                print(f"Codificando {len(faltantes)} de {len(textos_unicos)} textos únicos (restante veio do cache)...")
+                novos = modelo.encode(list(textos_unicos[faltantes]), batch_size=batch_size,
+                                      show_progress_bar=show_progress_bar, convert_to_numpy=True)
+                if persistir:
+                    self._adicionar(chaves[faltantes], novos)
+                    posicoes = self._chaves.get_indexer(chaves)
+                else:
+                    vetores = np.empty((len(chaves), novos.shape[1]), dtype=np.float32)
+                    vetores[faltantes] = novos
+                    encontrados = np.flatnonzero(posicoes >= 0)
+                    if len(encontrados):
+                        vetores[encontrados] = self._reunir(posicoes[encontrados])
+                    return vetores, indices
+
+            return self._reunir(posicoes), indices
+
+    def codificar(self, textos, modelo, **kwargs):
+        """Como `codificar_unicos`, mas devolve um vetor por texto de entrada."""
+        vetores, indices = self.codificar_unicos(textos, modelo, **kwargs)
+        return vetores[indices]
+
+    def compactar(self):
+        """Une todos os lotes em um só (útil após muitas execuções incrementais)."""
+        if self.diretorio is None or len(self._vetores) <= 1:
+            return
+        with self._lock:
+            self._carregar_novos_lotes()
+            chaves = np.asarray(self._chaves, dtype=object)
+            vetores = self._reunir(np.arange(len(chaves)))
+            antigos = set(self._lotes_carregados)
+            self._vetores, self._lotes_carregados = [], set()
+            self._chaves = pd.Index([], dtype=object)
+            self._lote_de = np.empty(0, dtype=np.int32)
+            self._linha_de = np.empty(0, dtype=np.int64)
+            self._adicionar(chaves, vetores)
+            for nome in antigos:
+                for sufixo in ('.chaves.npy', '.npy'):
+                    try:
+                        os.remove(os.path.join(self.diretorio, nome + sufixo))
+                    except OSError:
+                        pass
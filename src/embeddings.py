@@ -0,0 +1,107 @@
+# src/embeddings.py
+import os
+
+import numpy as np
+
+NOME_MODELO_LINGUAGEM = 'paraphrase-multilingual-MiniLM-L12-v2'
+MODOS_EMBEDDINGS = ('fp32', 'int8')
+# Padrão igual ao treino (fp32, CVs truncados); o app e o retreino devem usar o mesmo modo
+MODO_EMBEDDINGS_PADRAO = os.environ.get('DECISION_EMBEDDINGS_MODO', 'fp32')
+JANELAS_PADRAO = os.environ.get('DECISION_EMBEDDINGS_JANELAS', '0') == '1'
+
+def identificador_modelo(modelo):
+    """Nome do modelo nas chaves do cache de embeddings (muda com o modo do backend)."""
+    return getattr(modelo, 'identificador', NOME_MODELO_LINGUAGEM)
+
+def janelas_tokens(ids, tamanho, passo):
+    """Divide uma sequência de tokens em janelas de `tamanho`, a cada `passo` (a última encosta no fim)."""
+    if len(ids) <= tamanho:
+        return [ids]
+    inicios = list(range(0, len(ids) - tamanho + 1, passo))
+    if inicios[-1] + tamanho < len(ids):
+        inicios.append(len(ids) - tamanho)
+    return [ids[inicio:inicio + tamanho] for inicio in inicios]
+
+class CodificadorTexto:
+    """Backend de embeddings em CPU com a mesma interface `encode` do SentenceTransformer.
+
+    Os textos são tokenizados uma vez e ordenados por número de tokens antes do batch, então
+    cada lote só carrega o padding do seu próprio bucket de comprimento. Com `modo='int8'`
+    as camadas lineares passam por quantização dinâmica (torch). Com `janelas=True`, textos
+    maiores que o `max_seq_length` do modelo são divididos em janelas sobrepostas e os
+    vetores das janelas são combinados pela média (ponderada pelos tokens), em vez de truncados.
+    """
+
+    def __init__(self, nome_modelo=NOME_MODELO_LINGUAGEM, modo=MODO_EMBEDDINGS_PADRAO, janelas=JANELAS_PADRAO,
+                 sobreposicao=32, max_janelas=16, n_threads=None, modelo=None):
+        import torch
+        if modo not in MODOS_EMBEDDINGS:
+            raise ValueError(f"Modo de embeddings inválido: {modo!r} (use um de {MODOS_EMBEDDINGS})")
+        if n_threads:
+            torch.set_num_threads(n_threads)
+        if modelo is None:
+            from sentence_transformers import SentenceTransformer
+            modelo = SentenceTransformer(nome_modelo, device='cpu')
+        modelo.eval()
+        if modo == 'int8':
+            # Cópia quantizada: o `modelo` recebido continua em fp32
+            modelo = torch.quantization.quantize_dynamic(modelo, {torch.nn.Linear}, dtype=torch.qint8)
+
+        self._torch = torch
+        self.nome_modelo = nome_modelo
+        self.modo = modo
+        self.janelas = janelas
+        self.max_janelas = max_janelas
+        self.modelo = modelo
+        self.tokenizer = modelo.tokenizer
+        self.max_tokens = modelo.max_seq_length - self.tokenizer.num_special_tokens_to_add()
+        self.passo = max(1, self.max_tokens - sobreposicao)
+        self.dimensao = modelo.get_sentence_embedding_dimension()
+
+    @property
+    def identificador(self):
+        """fp32 sem janelas gera os mesmos vetores do SentenceTransformer e reaproveita o cache."""
+        sufixos = ([self.modo] if self.modo != 'fp32' else []) + ([f"janelas{self.max_tokens}"] if self.janelas else [])
+        return f"{self.nome_modelo}@{'+'.join(sufixos)}" if sufixos else self.nome_modelo
+
+    def _trechos(self, textos):
+        """Sequências de tokens a codificar e o índice do texto de origem de cada uma."""
+        ids = self.tokenizer(textos, add_special_tokens=False, truncation=False, verbose=False)['input_ids'] if textos else []
+        trechos, donos = [], []
+        for i, sequencia in enumerate(ids):
+            if self.janelas:
+                janelas = janelas_tokens(sequencia, self.max_tokens, self.passo)[:self.max_janelas]
+            else:
+                janelas = [sequencia[:self.max_tokens]]
+            trechos.extend(janelas)
+            donos.extend([i] * len(janelas))
+        return trechos, np.array(donos, dtype=np.int64)
+
+    def encode(self, textos, batch_size=64, show_progress_bar=False, convert_to_numpy=True, **kwargs):
+        """Embeddings float32 `(n, dimensão)` na ordem de `textos` (um vetor se `textos` for str)."""
+        unico = isinstance(textos, str)
+        textos = [textos] if unico else [str(texto) for texto in textos]
+        trechos, donos = self._trechos(textos)
+
+        # Buckets de comprimento: lotes de trechos com número de tokens parecido
+        ordem = np.argsort([-len(trecho) for trecho in trechos], kind='stable')
+        vetores = np.empty((len(trechos), self.dimensao), dtype=np.float32)
+        lotes = range(0, len(ordem), batch_size)
+        if show_progress_bar:
+            from tqdm.auto import tqdm
+            lotes = tqdm(lotes, desc="Batches")
+        with self._torch.inference_mode():
+            for inicio in lotes:
+                posicoes = ordem[inicio:inicio + batch_size]
+                entrada = self.tokenizer.pad(
+                    {'input_ids': [self.tokenizer.build_inputs_with_special_tokens(trechos[p]) for p in posicoes]},
+                    return_tensors='pt')
+                saida = self.modelo({'input_ids': entrada['input_ids'], 'attention_mask': entrada['attention_mask']})
+                vetores[posicoes] = saida['sentence_embedding'].float().numpy()
+
+        if len(trechos) > len(textos):
+            # Média das janelas de cada texto (os trechos de um texto são consecutivos)
+            pesos = np.array([max(len(trecho), 1) for trecho in trechos], dtype=np.float32)
+            inicios = np.flatnonzero(np.r_[True, donos[1:] != donos[:-1]])
+            vetores = np.add.reduceat(vetores * pesos[:, None], inicios) / np.add.reduceat(pesos, inicios)[:, None]
+        return vetores[0] if unico else vetores
@@ -0,0 +1,190 @@
+# src/encoder.py
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from src.instrumentation import instrumentar
+
+COLUNAS_CATEGORICAS = ['nivel profissional', 'nivel_academico', 'nivel_ingles', 'nivel_espanhol', 'vaga_sap', 'tipo_contratacao']
+# Categóricas que vêm da vaga (vagas.json); as demais descrevem o candidato
+COLUNAS_ORIGEM_VAGA = ['nivel profissional', 'vaga_sap', 'tipo_contratacao']
+VALOR_AUSENTE = 'Nao Informado'
+CAMINHO_CODIFICADOR_PADRAO = 'models/feature_encoder.joblib'
+
+def _colunas_numericas_padrao(df):
+    """Features numéricas do notebook (célula 9): similaridade, experiência, skills e remuneração."""
+    colunas = ['similitude_cv_vaga', 'anos_experiencia'] + [col for col in df.columns if col.startswith('skill_')] + ['remuneracao']
+    return [col for col in dict.fromkeys(colunas) if col in df.columns]
+
+class CodificadorFeatures:
+    """Codificador ajustado que substitui `get_dummies` + `reindex(columns=model_columns)`.
+
+    Cada categoria vira um código inteiro fixo e a matriz de features (float32, densa ou
+    CSR) é montada em uma passada vetorizada, na ordem de `self.colunas`. Nulos viram
+    'Nao Informado', como no treino; categorias desconhecidas ficam zeradas e são
+    avisadas uma vez e contadas em `self.categorias_desconhecidas`.
+    """
+
+    def __init__(self, colunas_categoricas=COLUNAS_CATEGORICAS, valor_ausente=VALOR_AUSENTE):
+        self.colunas_categoricas = list(colunas_categoricas)
+        self.valor_ausente = valor_ausente
+        self.colunas = []
+        self.categorias = {}
+        self.categorias_desconhecidas = {}
+
+    def _indexar(self):
+        """Pré-calcula as posições de cada feature na matriz de saída."""
+        posicao = {col: i for i, col in enumerate(self.colunas)}
+        categoricas = set(self.categorias)
+        self._colunas_numericas = [col for col in self.colunas if col not in self._nomes_one_hot()]
+        self._posicoes_numericas = np.array([posicao[col] for col in self._colunas_numericas], dtype=np.int64)
+        self._posicoes_categorias = {
+            col: np.array([posicao[f"{col}_{categoria}"] for categoria in self.categorias[col]], dtype=np.int64)
+            for col in self.colunas_categoricas if col in categoricas
+        }
+        self._codigo_de = {col: {categoria: i for i, categoria in enumerate(self.categorias[col])} for col in self._posicoes_categorias}
+        self._indice_de = {col: pd.Index(self.categorias[col]) for col in self._posicoes_categorias}
+        return self
+
+    def _nomes_one_hot(self):
+        return {f"{col}_{categoria}" for col, categorias in self.categorias.items() for categoria in categorias}
+
+    def fit(self, df, colunas_numericas=None):
+        """Aprende as categorias de cada coluna e fixa a ordem das features (numéricas, depois one-hot)."""
+        return self.fit_blocos([df], colunas_numericas)
+
+    def fit_blocos(self, blocos, colunas_numericas=None):
+        """Como `fit`, sobre um iterável de DataFrames (ex.: lotes de um Parquet maior que a memória)."""
+        vistas = {}
+        for df in blocos:
+            if colunas_numericas is None:
+                colunas_numericas = _colunas_numericas_padrao(df)
+            for col in self.colunas_categoricas:
+                if col in df.columns:
+                    vistas.setdefault(col, set()).update(df[col].fillna(self.valor_ausente).astype(str).unique())
+        self.categorias = {col: sorted(vistas[col]) for col in self.colunas_categoricas if col in vistas}
+        self.colunas = list(colunas_numericas or []) + [f"{col}_{categoria}" for col, categorias in self.categorias.items() for categoria in categorias]
+        return self._indexar()
+
+    @classmethod
+    def de_colunas_modelo(cls, model_columns, colunas_categoricas=COLUNAS_CATEGORICAS, valor_ausente=VALOR_AUSENTE):
+        """Reconstrói o codificador a partir de um `model_columns.joblib` já existente (mesma ordem)."""
+        codificador = cls(colunas_categoricas, valor_ausente)
+        # Prefixos mais longos primeiro, para não confundir colunas com nomes parecidos
+        prefixos = sorted(codificador.colunas_categoricas, key=len, reverse=True)
+        for coluna in model_columns:
+            origem = next((col for col in prefixos if coluna.startswith(f"{col}_")), None)
+            if origem is not None:
+                codificador.categorias.setdefault(origem, []).append(coluna[len(origem) + 1:])
+        codificador.colunas = list(model_columns)
+        return codificador._indexar()
+
+    def __len__(self):
+        return len(self.colunas)
+
+    @property
+    def colunas_entrada(self):
+        """Colunas brutas lidas pelo `transform` (para projetar a leitura do Parquet)."""
+        return self._colunas_numericas + list(self._posicoes_categorias)
+
+    def posicoes_de(self, colunas_origem):
+        """Posições, na matriz de saída, das features geradas a partir de `colunas_origem`."""
+        posicoes = [self.colunas.index(col) for col in colunas_origem if col in self._colunas_numericas]
+        for col in colunas_origem:
+            if col in self._posicoes_categorias:
+                posicoes.extend(self._posicoes_categorias[col].tolist())
+        return np.array(sorted(posicoes), dtype=np.int64)
+
+    def _codigos(self, df, col):
+        """Códigos inteiros da coluna (-1 para categorias desconhecidas).
+
+        Fatoriza a coluna (uma passada de hash) e só traduz os valores distintos, então o
+        custo por linha é o mesmo para uma requisição ou para o dataset inteiro.
+        """
+        codigo_de = self._codigo_de[col]
+        if col not in df.columns:
+            return np.full(len(df), codigo_de.get(self.valor_ausente, -1), dtype=np.int64)
+        codigos_locais, unicos = pd.factorize(df[col], use_na_sentinel=True)
+        unicos = [str(valor) for valor in unicos] + [self.valor_ausente]
+        traducao = np.array([codigo_de.get(valor, -1) for valor in unicos], dtype=np.int64)
+        codigos = traducao[codigos_locais]  # -1 (nulo) cai na última posição: 'Nao Informado'
+
+        if (traducao < 0).any():
+            contagem = np.bincount(np.where(codigos_locais < 0, len(unicos) - 1, codigos_locais), minlength=len(unicos))
+            desconhecidas = {unicos[i]: int(contagem[i]) for i in np.flatnonzero((traducao < 0) & (contagem > 0))}
+            novas = [valor for valor in desconhecidas if (col, valor) not in self.categorias_desconhecidas]
+            if novas:
+                print(f"AVISO: categorias não vistas no treino em '{col}' (codificadas como zero): {novas[:10]}")
+            for valor, n in desconhecidas.items():
+                self.categorias_desconhecidas[(col, valor)] = self.categorias_desconhecidas.get((col, valor), 0) + n
+        return codigos
+
+    def _valores_numericos(self, df):
+        """Bloco numérico em uma conversão só; texto vira número (ou 0) e nulos viram 0."""
+        presentes = [j for j, col in enumerate(self._colunas_numericas) if col in df.columns]
+        if len(presentes) == len(self._colunas_numericas):
+            bloco = df[self._colunas_numericas]
+        else:
+            bloco = df[[self._colunas_numericas[j] for j in presentes]]
+        texto = [col for col, tipo in bloco.dtypes.items() if tipo == object]
+        if texto:
+            bloco = bloco.assign(**{col: pd.to_numeric(bloco[col], errors='coerce') for col in texto})
+        valores = bloco.to_numpy(dtype=np.float32, na_value=np.nan)
+        np.nan_to_num(valores, copy=False, nan=0.0)
+        if len(presentes) == len(self._colunas_numericas):
+            return valores
+        completos = np.zeros((len(df), len(self._colunas_numericas)), dtype=np.float32)
+        completos[:, presentes] = valores
+        return completos
+
+    @instrumentar('codificar', linhas=lambda matriz: matriz.shape[0])
+    def transform(self, df, esparso=False):
+        """Matriz de features float32 (CSR com `esparso=True`) alinhada a `self.colunas`.
+
+        Atenção: no XGBoost, zeros ausentes de uma matriz esparsa contam como valor
+        faltante; use CSR na predição só se o modelo também foi treinado com CSR.
+        """
+        n = len(df)
+        linhas_one_hot, posicoes_one_hot = [], []
+        for col, posicoes in self._posicoes_categorias.items():
+            codigos = self._codigos(df, col)
+            validas = np.flatnonzero(codigos >= 0)
+            linhas_one_hot.append(validas)
+            posicoes_one_hot.append(posicoes[codigos[validas]])
+        linhas_one_hot = np.concatenate(linhas_one_hot) if linhas_one_hot else np.empty(0, dtype=np.int64)
+        posicoes_one_hot = np.concatenate(posicoes_one_hot) if posicoes_one_hot else np.empty(0, dtype=np.int64)
+        numericos = self._valores_numericos(df)
+
+        if not esparso:
+            matriz = np.zeros((n, len(self.colunas)), dtype=np.float32)
+            matriz[:, self._posicoes_numericas] = numericos
+            matriz[linhas_one_hot, posicoes_one_hot] = 1.0
+            return matriz
+
+        linhas_num, cols_num = np.nonzero(numericos)
+        linhas = np.concatenate([linhas_num, linhas_one_hot])
+        colunas = np.concatenate([self._posicoes_numericas[cols_num], posicoes_one_hot])
+        dados = np.concatenate([numericos[linhas_num, cols_num], np.ones(len(linhas_one_hot), dtype=np.float32)])
+        return sp.csr_matrix((dados, (linhas, colunas)), shape=(n, len(self.colunas)), dtype=np.float32)
+
+    def fit_transform(self, df, colunas_numericas=None, esparso=False):
+        return self.fit(df, colunas_numericas).transform(df, esparso=esparso)
+
+    def to_dataframe(self, df):
+        """Como `transform`, mas como DataFrame com os nomes das features (para treino/inspeção)."""
+        return pd.DataFrame(self.transform(df), columns=self.colunas, index=df.index)
+
+    def salvar(self, caminho=CAMINHO_CODIFICADOR_PADRAO):
+        joblib.dump(self, caminho)
+
+    @staticmethod
+    def carregar(caminho=CAMINHO_CODIFICADOR_PADRAO):
+        return joblib.load(caminho)
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._indexar()
+
+    def __getstate__(self):
+        return {chave: valor for chave, valor in self.__dict__.items() if not chave.startswith('_')}
@@ -0,0 +1,92 @@
+# src/explanations.py
+"""Explicações do match score com as contribuições TreeSHAP nativas do XGBoost (`pred_contribs`).
+
+As contribuições são calculadas em lotes (as candidaturas de um bloco ou de uma vaga de uma
+vez), junto com o score. De cada candidatura ficam só as `top_k` features de maior contribuição
+absoluta: a posição da feature (int16, em `codificador.colunas`) e a contribuição (float16, na
+escala do logit). Valor base + soma de todas as contribuições = logit do score.
+"""
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from src.instrumentation import instrumentar, medir
+
+TOP_K_PADRAO = 5
+PREFIXO_FEATURE = 'explicacao_feature_'
+PREFIXO_VALOR = 'explicacao_valor_'
+
+def colunas_explicacao(top_k):
+    """Colunas das explicações no ranking: as posições das features e depois as contribuições."""
+    return ([f'{PREFIXO_FEATURE}{i}' for i in range(1, top_k + 1)]
+            + [f'{PREFIXO_VALOR}{i}' for i in range(1, top_k + 1)])
+
+def top_k_do_ranking(df):
+    """Quantas contribuições por candidatura o ranking traz (0 se não tem explicações)."""
+    return sum(str(col).startswith(PREFIXO_FEATURE) for col in df.columns)
+
+@instrumentar('pred_contribs', linhas=len)
+def contribuicoes(model, X, aproximadas=False):
+    """Contribuições SHAP (n, features + 1) na escala do logit; a última coluna é o valor base.
+
+    `aproximadas=True` usa o método de Saabas (só o caminho de decisão de cada árvore):
+    ordens de grandeza mais rápido que o TreeSHAP exato, mas sem as garantias do SHAP.
+    """
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    return booster.predict(xgb.DMatrix(X), pred_contribs=True, approx_contribs=aproximadas, validate_features=False)
+
+def top_contribuicoes(contribs, top_k=TOP_K_PADRAO):
+    """(posições int16, contribuições float16) das `top_k` maiores em valor absoluto, em ordem decrescente."""
+    valores = contribs[:, :-1]
+    k = min(top_k, valores.shape[1])
+    absolutos = np.abs(valores)
+    candidatas = np.argpartition(-absolutos, k - 1, axis=1)[:, :k]
+    ordem = np.argsort(-np.take_along_axis(absolutos, candidatas, axis=1), axis=1, kind='stable')
+    posicoes = np.take_along_axis(candidatas, ordem, axis=1)
+    return posicoes.astype(np.int16), np.take_along_axis(valores, posicoes, axis=1).astype(np.float16)
+
+def pontuar_e_explicar(df, model, codificador, top_k=TOP_K_PADRAO, tamanho_bloco=20000):
+    """Match score (como `pontuar_candidatos`) e top_k contribuições de cada linha, em blocos.
+
+    A matriz de features de cada bloco é montada uma vez e serve ao score e às contribuições.
+    Retorna `(scores, posicoes, valores, valor_base)`.
+    """
+    scores = np.empty(len(df), dtype=np.float32)
+    posicoes = np.zeros((len(df), top_k), dtype=np.int16)
+    valores = np.zeros((len(df), top_k), dtype=np.float16)
+    valor_base = 0.0
+    for inicio in range(0, len(df), tamanho_bloco):
+        X = codificador.transform(df.iloc[inicio:inicio + tamanho_bloco])
+        fim = inicio + len(X)
+        with medir('predict_proba', len(X)):
+            scores[inicio:fim] = model.predict_proba(X)[:, 1] * 100
+        contribs = contribuicoes(model, X)
+        posicoes[inicio:fim], valores[inicio:fim] = top_contribuicoes(contribs, top_k)
+        valor_base = float(contribs[0, -1])
+    return scores, posicoes, valores, valor_base
+
+def explicar_ranking(df_ranking, model, codificador, top_k=TOP_K_PADRAO):
+    """Colunas de explicação para um ranking calculado na hora (fallback fora do índice)."""
+    X = codificador.transform(df_ranking)
+    posicoes, valores = top_contribuicoes(contribuicoes(model, X), top_k) if len(X) else (
+        np.zeros((0, top_k), dtype=np.int16), np.zeros((0, top_k), dtype=np.float16))
+    colunas = colunas_explicacao(top_k)
+    dados = {col: posicoes[:, i] for i, col in enumerate(colunas[:top_k])}
+    dados.update({col: valores[:, i] for i, col in enumerate(colunas[top_k:])})
+    return pd.DataFrame(dados, index=df_ranking.index)
+
+def _matrizes(df):
+    top_k = top_k_do_ranking(df)
+    colunas = colunas_explicacao(top_k)
+    return df[colunas[:top_k]].to_numpy(dtype=np.int64), df[colunas[top_k:]].to_numpy(dtype=np.float32)
+
+def explicacao_candidato(df_ranking, posicao, nomes_features):
+    """DataFrame (feature, contribuição) de uma candidatura do ranking, maior contribuição primeiro."""
+    posicoes, valores = _matrizes(df_ranking.iloc[[posicao]])
+    return pd.DataFrame({'feature': [nomes_features[p] for p in posicoes[0]], 'contribuicao': valores[0]})
+
+def resumo_explicacoes(df_ranking, nomes_features, n=3):
+    """Texto curto por candidatura com as `n` principais contribuições (↑ aumenta, ↓ reduz o score)."""
+    posicoes, valores = _matrizes(df_ranking)
+    return pd.Series([', '.join(f"{'↑' if v >= 0 else '↓'} {nomes_features[p]}" for p, v in zip(ps[:n], vs[:n]) if v != 0)
+                      for ps, vs in zip(posicoes, valores)], index=df_ranking.index)
@@ -1,26 +1,311 @@
 # src/feature_engineering.py
 import pandas as pd
+import numpy as np
+import os
 import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import repeat
+from scipy import sparse
 # (adicione outros imports se necessário, como sentence-transformers)
 
-def criar_features(df):
+from src.embedding_cache import ArmazemEmbeddings, DIRETORIO_CACHE_PADRAO
+from src.embeddings import CodificadorTexto, identificador_modelo
+from src.instrumentation import instrumentar
+
+# Status de candidatura considerados como 'sucesso' (contratação)
+STATUS_SUCESSO = [
+    'Contratado pela Decision',
+    'Proposta Aceita',
+    'Aprovado',
+    'Documentação PJ',
+    'Documentação CLT',
+    'Documentação Cooperado',
+    'Contratado como Hunting'
+]
+
+# Lista de habilidades importantes para o setor de TI. Pode ser expandida.
+SKILLS_PADRAO = [
+    'java', 'python', 'sap', 'scrum', 'agile', 'oracle', 'sql', 'api',
+    'react', 'angular', 'azure', 'aws', 'power bi', 'excel', 'gestão de projetos',
+    'javascript', 'typescript', 'c#', '.net', 'api rest', 'docker', 'kubernetes'
+]
+
+def nome_coluna_skill(skill):
+    """Nome da coluna de uma habilidade (ex.: 'power bi' -> 'skill_power_bi'), como no notebook."""
+    return f'skill_{re.sub(r"[^a-zA-Z0-9]+", "_", skill.lower())}'
+
+def _padrao_trie(termos):
+    """Monta uma regex em forma de trie para termos literais.
+
+    Prefixos comuns são compartilhados (ex.: 'api' e 'api rest' viram `api(?: rest)?`),
+    então o custo por caractere não cresce com o tamanho do vocabulário como numa
+    alternação simples `a|b|c|...`. O termo mais longo é tentado primeiro.
+    """
+    trie = {}
+    for termo in termos:
+        no = trie
+        for caractere in termo:
+            no = no.setdefault(caractere, {})
+        no[''] = {}
+
+    def montar(no):
+        ramos = [re.escape(caractere) + montar(filho) for caractere, filho in sorted(no.items()) if caractere]
+        if not ramos:
+            return ''
+        padrao = ramos[0] if len(ramos) == 1 else '(?:' + '|'.join(ramos) + ')'
+        return f'(?:{padrao})?' if '' in no else padrao
+
+    return montar(trie)
+
+def _ocorrencias_palavra_inteira(termo, texto):
+    """Quantas vezes `termo` aparece em `texto` como palavra inteira (mesma regra do extrator)."""
+    def e_palavra(caractere):
+        return caractere.isalnum() or caractere == '_'
+    total, inicio = 0, texto.find(termo)
+    while inicio >= 0:
+        fim = inicio + len(termo)
+        if (inicio == 0 or not e_palavra(texto[inicio - 1])) and (fim == len(texto) or not e_palavra(texto[fim])):
+            total += 1
+        inicio = texto.find(termo, inicio + 1)
+    return total
+
+class ExtratorSkills:
+    """Conta todas as habilidades de um vocabulário em uma única passada por documento.
+
+    As habilidades são casadas como palavras inteiras e sem diferenciar maiúsculas
+    ('java' não conta dentro de 'javascript'). Quando um termo contém outro
+    ('api rest' contém 'api'), a ocorrência do termo longo também conta para o curto.
+    Compartilhado pelo treino, pelo `gerar_recomendacoes_vaga` e pela aba de CV.
+    """
+
+    def __init__(self, skills=SKILLS_PADRAO, colunas=None):
+        self.skills = list(dict.fromkeys(skill.lower() for skill in skills))
+        self.colunas = list(colunas) if colunas is not None else [nome_coluna_skill(skill) for skill in self.skills]
+        self._indice = {skill: i for i, skill in enumerate(self.skills)}
+        self._regex = re.compile(r'(?<!\w)(?:' + _padrao_trie(self.skills) + r')(?!\w)', re.IGNORECASE)
+        # Para cada termo, os índices das habilidades contidas nele (incluindo ele mesmo)
+        self._creditos = {}
+        for skill in self.skills:
+            contidas = Counter({self._indice[skill]: 1})
+            for outra in self.skills:
+                if outra != skill and outra in skill:
+                    ocorrencias = _ocorrencias_palavra_inteira(outra, skill)
+                    if ocorrencias:
+                        contidas[self._indice[outra]] += ocorrencias
+            self._creditos[skill] = list(contidas.items())
+
+    @classmethod
+    def das_colunas(cls, colunas, vocabulario=SKILLS_PADRAO):
+        """Reconstrói o extrator a partir das colunas 'skill_*' de um modelo treinado."""
+        por_coluna = {nome_coluna_skill(skill): skill for skill in vocabulario}
+        colunas = [col for col in colunas if col.startswith('skill_')]
+        skills = [por_coluna.get(col, col.replace('skill_', '').replace('_', ' ')) for col in colunas]
+        return cls(skills, colunas=colunas)
+
+    def skill_da_coluna(self, coluna):
+        return self.skills[self.colunas.index(coluna)]
+
+    def _contar_documento(self, texto):
+        contagem = Counter()
+        if isinstance(texto, str):
+            for ocorrencia in self._regex.finditer(texto):
+                for indice, creditos in self._creditos.get(ocorrencia.group(0).lower(), ()):
+                    contagem[indice] += creditos
+        return contagem
+
+    def contar(self, textos):
+        """Retorna uma matriz esparsa CSR (documentos x habilidades) de contagens int32."""
+        indptr, indices, dados = [0], [], []
+        for texto in textos:
+            contagem = self._contar_documento(texto)
+            indices.extend(contagem.keys())
+            dados.extend(contagem.values())
+            indptr.append(len(indices))
+        return sparse.csr_matrix((np.asarray(dados, dtype=np.int32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+                                 shape=(len(indptr) - 1, len(self.skills)))
+
+    def skills_presentes(self, texto):
+        """Conjunto das habilidades encontradas em um texto."""
+        return {self.skills[indice] for indice in self._contar_documento(texto)}
+
+@instrumentar('skills', linhas=len)
+def adicionar_features_skills(df, extrator=None, coluna_texto='cv_pt', esparso=False):
+    """Adiciona as colunas 'skill_*' com as contagens de cada habilidade no CV."""
+    extrator = extrator or ExtratorSkills()
+    matriz = extrator.contar(df[coluna_texto].tolist())
+    if esparso:
+        skills = pd.DataFrame.sparse.from_spmatrix(matriz, index=df.index, columns=extrator.colunas)
+    else:
+        skills = pd.DataFrame(matriz.toarray(), index=df.index, columns=extrator.colunas)
+    return pd.concat([df.drop(columns=extrator.colunas, errors='ignore'), skills], axis=1)
+
+# Períodos de tempo no CV. Ex: (jan/2020 – dez/2021), (2018 – presente), (03/2015 – 05/2017)
+_PADRAO_PERIODO = re.compile(
+    r'(\d{1,2}[/-]\d{4}|\w+\s*[/de]*\s*\d{4}|\d{4})\s*–\s*(\d{1,2}[/-]\d{4}|\w+\s*[/de]*\s*\d{4}|\d{4}|presente|atual|actual|present)',
+    re.IGNORECASE
+)
+# Um período só contém letras/dígitos, espaços, '/', '-' e o travessão '–'. Trechos
+# maximais com esses caracteres delimitam todos os casamentos possíveis, então basta
+# rodar a regex de período (cara, por causa do `\w+` com retrocesso) nos trechos com '–'.
+_PADRAO_TRECHO = re.compile(r'[\w\s/\-–]+')
+_PADRAO_ANO = re.compile(r'\d{4}')
+_PALAVRAS_PERIODO_ATUAL = ('presente', 'atual', 'actual', 'present')
+
+def _encontrar_periodos(cv_texto):
+    """Mesmo resultado de `_PADRAO_PERIODO.findall(cv_texto)`, olhando só os trechos com '–'."""
+    if '–' not in cv_texto:
+        return []
+    encontrados = []
+    for trecho in _PADRAO_TRECHO.finditer(cv_texto):
+        if '–' in trecho.group(0):
+            encontrados.extend(_PADRAO_PERIODO.findall(cv_texto, trecho.start(), trecho.end()))
+    return encontrados
+
+def _periodos_experiencia(cv_texto, ano_atual):
+    """Lista de períodos (ano_inicio, ano_fim) válidos encontrados no CV."""
+    periodos = []
+    for inicio_str, fim_str in _encontrar_periodos(cv_texto):
+        # Extrai apenas o ano para simplificar o cálculo
+        ano_inicio = _PADRAO_ANO.search(inicio_str)
+        if ano_inicio is None:
+            continue
+        if any(palavra in fim_str.lower() for palavra in _PALAVRAS_PERIODO_ATUAL):
+            ano_fim = ano_atual
+        else:
+            ano_fim = _PADRAO_ANO.search(fim_str)
+            if ano_fim is None:
+                continue
+            ano_fim = int(ano_fim.group(0))
+        ano_inicio = int(ano_inicio.group(0))
+        # Apenas considera intervalos de anos lógicos
+        if ano_fim >= ano_inicio:
+            periodos.append((ano_inicio, ano_fim))
+    return periodos
+
+def _somar_periodos(periodos, mesclar_sobreposicoes):
+    """Soma a duração dos períodos; mesclando, empregos simultâneos não contam em dobro."""
+    if not mesclar_sobreposicoes:
+        return sum(fim - inicio for inicio, fim in periodos)
+    total, atual_inicio, atual_fim = 0, None, None
+    for inicio, fim in sorted(periodos):
+        if atual_fim is None or inicio > atual_fim:
+            if atual_fim is not None:
+                total += atual_fim - atual_inicio
+            atual_inicio, atual_fim = inicio, fim
+        else:
+            atual_fim = max(atual_fim, fim)
+    if atual_fim is not None:
+        total += atual_fim - atual_inicio
+    return total
+
+def calcular_experiencia(cv_texto, mesclar_sobreposicoes=False, ano_atual=None):
+    """
+    Extrai e soma os anos de experiência a partir de um texto de CV.
+    Busca por padrões de data como 'mm/aaaa – mm/aaaa' ou 'aaaa – presente'.
+    Com `mesclar_sobreposicoes=False` reproduz exatamente a feature do notebook.
+    """
+    if not isinstance(cv_texto, str):
+        return 0
+    ano_atual = ano_atual or datetime.now().year
+    total_anos = _somar_periodos(_periodos_experiencia(cv_texto, ano_atual), mesclar_sobreposicoes)
+    # Retorna os anos totais (com uma casa decimal)
+    return round(float(total_anos), 1)
+
+def _experiencia_bloco(textos, ano_atual, mesclar_sobreposicoes):
+    return np.array([calcular_experiencia(texto, mesclar_sobreposicoes, ano_atual) for texto in textos], dtype=np.float32)
+
+@instrumentar('experiencia', linhas=len)
+def calcular_experiencia_lote(textos, n_processos=None, tamanho_bloco=2000, mesclar_sobreposicoes=True):
+    """Calcula os anos de experiência de um array de CVs em blocos, em um pool de processos.
+
+    Usa padrões pré-compilados e retorna um array float32 alinhado com `textos`.
+    Por padrão períodos sobrepostos são mesclados; `mesclar_sobreposicoes=False`
+    dá o mesmo resultado do `progress_apply(calcular_experiencia)` do notebook.
+    """
+    textos = list(textos)
+    n_processos = n_processos or os.cpu_count() or 1
+    # O ano de referência é fixado aqui para todos os processos usarem o mesmo
+    ano_atual = datetime.now().year
+    blocos = [textos[inicio:inicio + tamanho_bloco] for inicio in range(0, len(textos), tamanho_bloco)]
+    if not blocos:
+        return np.empty(0, dtype=np.float32)
+    if n_processos == 1 or len(blocos) == 1:
+        resultados = [_experiencia_bloco(bloco, ano_atual, mesclar_sobreposicoes) for bloco in blocos]
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_processos, len(blocos))) as executor:
+            resultados = list(executor.map(_experiencia_bloco, blocos, repeat(ano_atual), repeat(mesclar_sobreposicoes)))
+    return np.concatenate(resultados)
+
+@instrumentar('cosseno', linhas=len)
+def calcular_similaridade_pareada(embeddings_a, embeddings_b, tamanho_bloco=16384, dtype=np.float32,
+                                  indices_a=None, indices_b=None):
+    """Calcula a similitude do cosseno linha a linha (a[i] vs b[i]) em blocos.
+
+    Equivale a `util.cos_sim(a, b).diag()`, mas nunca monta a matriz N x N: a memória
+    extra fica limitada a um bloco de `tamanho_bloco` linhas mais o vetor de saída.
+    Aceita arrays numpy (inclusive `np.memmap`) ou tensores na CPU. Com `indices_a`/
+    `indices_b` a linha i compara `a[indices_a[i]]` com `b[indices_b[i]]`, o que permite
+    usar diretamente os vetores únicos do `ArmazemEmbeddings`.
+    """
+    n_a = len(indices_a) if indices_a is not None else len(embeddings_a)
+    n = len(indices_b) if indices_b is not None else len(embeddings_b)
+    if n_a != n:
+        raise ValueError(f"Embeddings desalinhados: {n_a} vs {n} linhas.")
+
+    similaridades = np.empty(n, dtype=dtype)
+    for inicio in range(0, n, tamanho_bloco):
+        fim = min(inicio + tamanho_bloco, n)
+        linhas_a = slice(inicio, fim) if indices_a is None else indices_a[inicio:fim]
+        linhas_b = slice(inicio, fim) if indices_b is None else indices_b[inicio:fim]
+        bloco_a = np.asarray(embeddings_a[linhas_a], dtype=np.float32)
+        bloco_b = np.asarray(embeddings_b[linhas_b], dtype=np.float32)
+        produto = np.einsum('ij,ij->i', bloco_a, bloco_b)
+        # Mesmo eps do F.normalize usado pelo cos_sim: vetores nulos resultam em 0
+        normas = np.maximum(np.linalg.norm(bloco_a, axis=1), 1e-12) * np.maximum(np.linalg.norm(bloco_b, axis=1), 1e-12)
+        similaridades[inicio:fim] = produto / normas
+    return similaridades
+
+def textos_vaga(df):
+    """Texto da vaga usado na similitude: principais atividades + competências."""
+    return df['principais_atividades'].fillna('') + " " + df['competencia_tecnicas_e_comportamentais'].fillna('')
+
+@instrumentar('similaridade', linhas=len)
+def criar_feature_similaridade(df, modelo_linguagem, batch_size=64, tamanho_bloco=16384, dtype=np.float32,
+                               armazem=None):
+    """Codifica vagas e CVs e devolve a similitude semântica de cada candidatura.
+
+    Cada vaga e cada CV distintos são codificados uma única vez (via `armazem`);
+    a similitude é calculada sobre os vetores únicos, indexados por linha.
+    """
+    if armazem is None:
+        armazem = ArmazemEmbeddings(identificador_modelo(modelo_linguagem), diretorio=None)
+    textos_cv = df['cv_pt'].fillna('')
+
+    embeddings_vaga, indices_vaga = armazem.codificar_unicos(textos_vaga(df).tolist(), modelo_linguagem, batch_size=batch_size, show_progress_bar=True)
+    embeddings_cv, indices_cv = armazem.codificar_unicos(textos_cv.tolist(), modelo_linguagem, batch_size=batch_size, show_progress_bar=True)
+
+    return calcular_similaridade_pareada(embeddings_vaga, embeddings_cv, tamanho_bloco=tamanho_bloco, dtype=dtype,
+                                         indices_a=indices_vaga, indices_b=indices_cv)
+
+@instrumentar('features', linhas=len)
+def criar_features(df, modelo_linguagem=None, dtype_similaridade=np.float32, diretorio_cache=DIRETORIO_CACHE_PADRAO):
     """Cria novas features a partir do DataFrame mestre."""
     print("Criando variável alvo 'contratado'...")
-    # (código para criar a coluna 'contratado')
-    # ...
+    df['contratado'] = df['situacao_candidado'].isin(STATUS_SUCESSO).astype(int)
 
     print("Criando feature de similitude semântica...")
-    # (código para criar a feature 'similitude_cv_vaga')
-    # ...
+    if modelo_linguagem is None:
+        modelo_linguagem = CodificadorTexto()
+    armazem = ArmazemEmbeddings(identificador_modelo(modelo_linguagem), diretorio=diretorio_cache)
+    df['similitude_cv_vaga'] = criar_feature_similaridade(df, modelo_linguagem, dtype=dtype_similaridade, armazem=armazem)
 
     print("Criando feature de anos de experiência...")
-    # (função e aplicação para 'anos_experiencia')
-    # ...
+    df['anos_experiencia'] = calcular_experiencia_lote(df['cv_pt'].tolist())
 
     print("Criando features de skills...")
-    # (código para criar as colunas 'skill_...')
-    # ...
+    df = adicionar_features_skills(df)
 
     print("Engenharia de features concluída!")
-    return df
\ No newline at end of file
+    return df
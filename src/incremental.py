@@ -0,0 +1,196 @@
+# src/incremental.py
+import hashlib
+import json
+import os
+import shutil
+import time
+import urllib.parse
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import fsspec
+import pyarrow.parquet as pq
+
+from src.artifacts import versao_objeto
+from src.preprocessing import converter_dados_brutos, unir_dados, TAMANHO_LOTE_PADRAO
+
+CAMINHO_SAIDA_PADRAO = 'data/df_mestre_preprocessado'
+DIRETORIO_ESTADO_PADRAO = 'data/estado_incremental'
+
+def _hash_texto(texto):
+    return hashlib.blake2b(texto.encode('utf-8'), digest_size=16).hexdigest()
+
+def _carregar_estado(diretorio_estado):
+    """Lê as tabelas (chave, hash) da última execução; None quando não existem."""
+    estado = {}
+    for nome in ('applicants', 'vagas', 'prospects'):
+        caminho = os.path.join(diretorio_estado, f"estado_{nome}.parquet")
+        estado[nome] = pd.read_parquet(caminho) if os.path.exists(caminho) else None
+    return estado
+
+def _salvar_estado(diretorio_estado, estado):
+    for nome, tabela in estado.items():
+        caminho = os.path.join(diretorio_estado, f"estado_{nome}.parquet")
+        tabela.to_parquet(caminho + '.tmp', index=False)
+        os.replace(caminho + '.tmp', caminho)
+
+def _versoes_fontes(gcs_bucket_path, filesystem=None):
+    """Versão (generation/ETag, ou tamanho + data) de cada JSON bruto, lida sem abrir o arquivo."""
+    versoes = {}
+    for nome in ('applicants', 'vagas', 'prospects'):
+        caminho = f"{gcs_bucket_path}/data/{nome}.json"
+        fs, caminho_fs = (filesystem, caminho) if filesystem is not None else fsspec.core.url_to_fs(caminho)
+        versoes[nome] = versao_objeto(fs.info(caminho_fs))
+    return versoes
+
+def _carregar_versoes(diretorio_estado):
+    caminho = os.path.join(diretorio_estado, 'versoes_fontes.json')
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+def _salvar_versoes(diretorio_estado, versoes):
+    caminho = os.path.join(diretorio_estado, 'versoes_fontes.json')
+    with open(caminho + '.tmp', 'w', encoding='utf-8') as arquivo:
+        json.dump(versoes, arquivo)
+    os.replace(caminho + '.tmp', caminho)
+
+def _chaves_alteradas(atual, anterior, chave):
+    """Chaves novas, alteradas ou removidas entre duas tabelas (chave, hash_registro)."""
+    if anterior is None:
+        return set(atual[chave])
+    comparacao = atual.merge(anterior, on=chave, how='outer', suffixes=('', '_anterior'))
+    mudou = comparacao['hash_registro'] != comparacao['hash_registro_anterior']
+    return set(comparacao.loc[mudou, chave])
+
+def _ler_filtrado(caminho, coluna, valores):
+    """Lê do Parquet apenas as linhas cuja `coluna` está em `valores`."""
+    tabela = pq.read_table(caminho, filters=[(coluna, 'in', sorted(valores))]) if valores else pq.read_table(caminho).slice(0, 0)
+    return tabela.drop_columns(['hash_registro']).to_pandas()
+
+def _schema_gravado(caminho_saida):
+    """União dos schemas das partições já gravadas (`_common_metadata`); None sem partições.
+
+    O Arrow infere o schema de um dataset pela primeira partição: uma coluna que só existe
+    nas partições regravadas (campo novo de um candidato) sumiria na leitura. Por isso o
+    `_common_metadata` guarda a união dos schemas e é o schema usado por `abrir_df_mestre`.
+    """
+    caminho_schema = os.path.join(caminho_saida, '_common_metadata')
+    if os.path.exists(caminho_schema):
+        return pq.read_schema(caminho_schema)
+    if not os.path.isdir(caminho_saida):
+        return None
+    # Diretórios gravados antes do `_common_metadata`: lê o schema de cada partição uma vez
+    schemas = [fragmento.physical_schema for fragmento in ds.dataset(caminho_saida, format='parquet').get_fragments()]
+    return pa.unify_schemas(schemas, promote_options='permissive') if schemas else None
+
+def _gravar_particoes(df, caminho_saida, vagas_afetadas):
+    """Substitui as partições `vaga_id=<id>` das vagas afetadas pelas linhas recalculadas."""
+    schema_anterior = _schema_gravado(caminho_saida)
+    for vaga_id in vagas_afetadas:
+        shutil.rmtree(os.path.join(caminho_saida, f"vaga_id={urllib.parse.quote(str(vaga_id), safe='')}"), ignore_errors=True)
+    if len(df):
+        tabela = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_to_dataset(
+            tabela,
+            caminho_saida,
+            partition_cols=['vaga_id'],
+            existing_data_behavior='overwrite_or_ignore',
+            max_partitions=max(1024, len(vagas_afetadas)),
+            basename_template=f"parte-{time.time_ns()}-{{i}}.parquet",
+        )
+        schema = tabela.schema.remove(tabela.schema.get_field_index('vaga_id')).remove_metadata()
+        if schema_anterior is not None:
+            schema = pa.unify_schemas([schema_anterior, schema], promote_options='permissive')
+        caminho_schema = os.path.join(caminho_saida, '_common_metadata')
+        pq.write_metadata(schema, caminho_schema + '.tmp')
+        os.replace(caminho_schema + '.tmp', caminho_schema)
+
+def abrir_df_mestre(caminho=CAMINHO_SAIDA_PADRAO, filesystem=None):
+    """Dataset Arrow do df_mestre (arquivo único ou particionado), com 'vaga_id' como texto.
+
+    No particionado, o schema é o do `_common_metadata` (todas as colunas de todas as partições).
+    """
+    particionamento = ds.partitioning(pa.schema([('vaga_id', pa.string())]), flavor='hive')
+    fs, caminho_fs = (filesystem, caminho) if filesystem is not None else fsspec.core.url_to_fs(caminho)
+    caminho_schema = f"{caminho_fs.rstrip('/')}/_common_metadata"
+    schema = None
+    if fs.isdir(caminho_fs) and fs.exists(caminho_schema):
+        with fs.open(caminho_schema, 'rb') as arquivo:
+            schema = pq.read_schema(arquivo).append(pa.field('vaga_id', pa.string()))
+    return ds.dataset(caminho, format='parquet', partitioning=particionamento, filesystem=filesystem, schema=schema)
+
+def ler_df_mestre(caminho=CAMINHO_SAIDA_PADRAO, columns=None, filesystem=None):
+    """Lê o df_mestre particionado, mantendo 'vaga_id' como texto (e não inteiro inferido)."""
+    return abrir_df_mestre(caminho, filesystem).to_table(columns=columns).to_pandas()
+
+def construir_df_mestre_incremental(gcs_bucket_path, caminho_saida=CAMINHO_SAIDA_PADRAO, diretorio_estado=DIRETORIO_ESTADO_PADRAO,
+                                    funcao_features=None, filesystem=None, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    """Atualiza o df_mestre particionado por vaga_id, recalculando só as vagas afetadas.
+
+    Guarda, por ID, o hash de conteúdo de cada candidato, vaga e conjunto de candidaturas
+    da vaga. Uma vaga é reprocessada (merge + features) quando ela, alguma de suas
+    candidaturas ou algum de seus candidatos mudou; as demais partições ficam intactas.
+    Na primeira execução (ou se a saída foi apagada) tudo é construído.
+
+    Antes de qualquer leitura, a versão de cada JSON bruto (generation/ETag no bucket,
+    tamanho + data no disco) é comparada com a da última execução: arquivos inalterados
+    não são baixados nem aplanados de novo (reaproveita-se o Parquet já convertido), e
+    se nenhum mudou a função retorna sem trabalho.
+    Retorna o conjunto de `vaga_id` reprocessados.
+    """
+    if funcao_features is None:
+        from src.feature_engineering import criar_features
+        funcao_features = criar_features
+    os.makedirs(diretorio_estado, exist_ok=True)
+    diretorio_bruto = os.path.join(diretorio_estado, 'bruto')
+
+    versoes = _versoes_fontes(gcs_bucket_path, filesystem)
+    versoes_anteriores = _carregar_versoes(diretorio_estado) if os.path.isdir(caminho_saida) else {}
+    fontes_alteradas = {nome for nome, versao in versoes.items()
+                        if versoes_anteriores.get(nome) != versao
+                        or not os.path.exists(os.path.join(diretorio_bruto, f"{nome}.parquet"))}
+    if not fontes_alteradas:
+        print("-> Dados brutos inalterados desde a última execução; nada a reprocessar.")
+        return set()
+
+    print(f"Convertendo dados brutos alterados ({', '.join(sorted(fontes_alteradas))}) e calculando hashes de conteúdo...")
+    caminhos = converter_dados_brutos(gcs_bucket_path, diretorio_bruto, tamanho_lote=tamanho_lote,
+                                      filesystem=filesystem, incluir_hash=True, fontes=fontes_alteradas)
+    applicants = pd.read_parquet(caminhos['applicants'], columns=['codigo_profissional', 'hash_registro']).drop_duplicates('codigo_profissional', keep='last')
+    vagas = pd.read_parquet(caminhos['vagas'], columns=['vaga_id', 'hash_registro']).drop_duplicates('vaga_id', keep='last')
+    prospects = pd.read_parquet(caminhos['prospects'], columns=['vaga_id', 'codigo_profissional', 'hash_registro'])
+    # Uma vaga muda se o conjunto das suas candidaturas mudou (inclusive remoções)
+    prospects_por_vaga = (prospects.sort_values('hash_registro')
+                          .groupby('vaga_id')['hash_registro'].agg(''.join).map(_hash_texto).reset_index())
+
+    anterior = _carregar_estado(diretorio_estado)
+    if not os.path.isdir(caminho_saida):
+        anterior = {nome: None for nome in anterior}
+
+    print("Detectando alterações desde a última execução...")
+    applicants_alterados = _chaves_alteradas(applicants, anterior['applicants'], 'codigo_profissional')
+    vagas_afetadas = (_chaves_alteradas(vagas, anterior['vagas'], 'vaga_id')
+                      | _chaves_alteradas(prospects_por_vaga, anterior['prospects'], 'vaga_id'))
+    vagas_afetadas |= set(prospects.loc[prospects['codigo_profissional'].isin(applicants_alterados), 'vaga_id'])
+    print(f"-> {len(applicants_alterados)} candidatos alterados; {len(vagas_afetadas)} vagas a reprocessar.")
+
+    if vagas_afetadas:
+        df_prospects = _ler_filtrado(caminhos['prospects'], 'vaga_id', vagas_afetadas)
+        df_applicants = _ler_filtrado(caminhos['applicants'], 'codigo_profissional', set(df_prospects['codigo_profissional']))
+        df_vagas = _ler_filtrado(caminhos['vagas'], 'vaga_id', vagas_afetadas)
+
+        print("Unindo e criando features das vagas afetadas...")
+        df_mestre = unir_dados(df_applicants, df_prospects, df_vagas)
+        if len(df_mestre):
+            df_mestre = funcao_features(df_mestre)
+        _gravar_particoes(df_mestre, caminho_saida, vagas_afetadas)
+        print(f"-> {len(df_mestre)} linhas regravadas em {caminho_saida}")
+
+    # O estado só avança depois que as partições foram gravadas
+    _salvar_estado(diretorio_estado, {'applicants': applicants, 'vagas': vagas, 'prospects': prospects_por_vaga})
+    _salvar_versoes(diretorio_estado, versoes)
+    print("Atualização incremental concluída!")
+    return vagas_afetadas
@@ -0,0 +1,286 @@
+# src/instrumentation.py
+"""Instrumentação leve do pipeline e do app: tempo, CPU, pico de memória e linhas por etapa.
+
+Desligada por padrão. Liga para o processo todo com a variável de ambiente
+`DECISION_INSTRUMENTACAO=1` ou com `ativar()` (que também a define, então processos filhos
+herdam), ou só para um registro com `novo_registro(ativo=True)` (ex.: a sessão do app que
+abriu `?debug=1`, sem afetar as demais). Desligada, `medir` devolve um contexto nulo já
+criado e as funções com `@instrumentar` são chamadas direto: o custo é um teste de flag por chamada.
+
+Cada medição guarda tempo de parede, CPU (do processo e dos filhos já encerrados), pico de
+RSS durante a etapa e o número de linhas processadas. Medições aninhadas formam um caminho ("pipeline;features;skills").
+O pico por etapa usa o reset do VmHWM do Linux (`/proc/self/clear_refs`); sem ele, vale o
+pico do processo até o fim da etapa (`ru_maxrss`). As medições ficam no registro da thread
+atual (uma por rerun no app; `novo_registro()`) e exportam para JSON, CSV e pilhas
+agregadas no formato "collapsed" (o `--format raw` do py-spy; abre no speedscope ou no
+flamegraph.pl). `perfil()` grava um dump do cProfile (`.prof`, para snakeviz/pstats).
+"""
+import contextlib
+import cProfile
+import csv
+import functools
+import io
+import json
+import os
+import resource
+import threading
+import time
+
+VARIAVEL_AMBIENTE = 'DECISION_INSTRUMENTACAO'
+CAMPOS = ['caminho', 'nome', 'nivel', 'inicio', 'duracao', 'cpu', 'pico_rss_mb', 'rss_final_mb', 'linhas']
+
+_ativa = os.environ.get(VARIAVEL_AMBIENTE, '') not in ('', '0')
+_local = threading.local()
+_pico_por_etapa = None  # None: ainda não testado se o VmHWM pode ser zerado
+
+def ativar(ligada=True):
+    """Liga (ou desliga) a instrumentação neste processo e nos processos filhos."""
+    global _ativa
+    _ativa = ligada
+    os.environ[VARIAVEL_AMBIENTE] = '1' if ligada else '0'
+
+def esta_ativa():
+    """Se a instrumentação está ligada para o processo todo (não considera registros ativos)."""
+    return _ativa
+
+def _cpu():
+    """CPU (usuário + sistema) do processo e dos filhos já encerrados (ex.: pools de processos)."""
+    filhos = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + filhos.ru_utime + filhos.ru_stime
+
+def _memoria_mb():
+    """(RSS atual, pico de RSS) em MB, de /proc/self/status; fora do Linux, o ru_maxrss."""
+    try:
+        with open('/proc/self/status') as f:
+            valores = {linha.split(':')[0]: int(linha.split()[1]) for linha in f if linha.startswith(('VmRSS:', 'VmHWM:'))}
+        return valores['VmRSS'] / 1024, valores['VmHWM'] / 1024
+    except (OSError, KeyError):
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        return pico, pico
+
+def _zerar_pico():
+    """Zera o VmHWM (pico passa a ser o RSS atual); False se o sistema não permite."""
+    global _pico_por_etapa
+    if _pico_por_etapa is False:
+        return False
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        _pico_por_etapa = True
+    except OSError:
+        _pico_por_etapa = False
+    return _pico_por_etapa
+
+class Medicao:
+    """Uma etapa medida; use como contexto (`with registro.medir('etapa') as m: ...`)."""
+
+    def __init__(self, registro, nome, linhas=None):
+        self.registro = registro
+        self.nome = nome
+        self.linhas = linhas
+        self.pico_rss_mb = 0.0
+
+    def definir_linhas(self, linhas):
+        self.linhas = int(linhas)
+
+    def __enter__(self):
+        pilha = self.registro._pilha()
+        if pilha:
+            # O pico do pai até aqui não pode se perder quando o VmHWM for zerado
+            pilha[-1].pico_rss_mb = max(pilha[-1].pico_rss_mb, _memoria_mb()[1])
+        self.caminho = ';'.join([m.nome for m in pilha] + [self.nome])
+        self.nivel = len(pilha)
+        pilha.append(self)
+        _zerar_pico()
+        self._inicio_cpu = _cpu()
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excecao):
+        duracao = time.perf_counter() - self._inicio
+        cpu = _cpu() - self._inicio_cpu
+        rss, pico = _memoria_mb()
+        pilha = self.registro._pilha()
+        pilha.pop()
+        self.pico_rss_mb = max(self.pico_rss_mb, pico)
+        if pilha:
+            pilha[-1].pico_rss_mb = max(pilha[-1].pico_rss_mb, self.pico_rss_mb)
+        self.registro._adicionar({
+            'caminho': self.caminho, 'nome': self.nome, 'nivel': self.nivel,
+            'inicio': self._inicio - self.registro.inicio, 'duracao': duracao, 'cpu': cpu,
+            'pico_rss_mb': round(self.pico_rss_mb, 1), 'rss_final_mb': round(rss, 1),
+            'linhas': self.linhas,
+        })
+        return False
+
+class _MedicaoNula:
+    """Contexto devolvido com a instrumentação desligada: não mede nada."""
+
+    def definir_linhas(self, linhas):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        return False
+
+_NULA = _MedicaoNula()
+
+class Registro:
+    """Medições de um processo, de uma execução do pipeline ou de um rerun do app."""
+
+    def __init__(self, ativo=False):
+        # Com `ativo=True`, mede mesmo com a instrumentação do processo desligada
+        self.ativo = ativo
+        self.medicoes = []
+        self.inicio = time.perf_counter()
+        self._trava = threading.Lock()
+        self._pilhas = threading.local()
+
+    def _pilha(self):
+        if not hasattr(self._pilhas, 'abertas'):
+            self._pilhas.abertas = []
+        return self._pilhas.abertas
+
+    def _adicionar(self, medicao):
+        with self._trava:
+            self.medicoes.append(medicao)
+
+    def medir(self, nome, linhas=None):
+        return Medicao(self, nome, linhas) if _ativa or self.ativo else _NULA
+
+    def incorporar(self, medicoes, prefixo=None, deslocamento=0.0):
+        """Acrescenta medições de outro processo (ex.: uma etapa do pipeline), sob `prefixo`.
+
+        `deslocamento` (s) leva os inícios para a escala deste registro.
+        """
+        for medicao in medicoes:
+            medicao = dict(medicao, inicio=medicao['inicio'] + deslocamento)
+            if prefixo:
+                medicao['caminho'] = f"{prefixo};{medicao['caminho']}"
+                medicao['nivel'] += 1
+            self._adicionar(medicao)
+
+    def resumo(self):
+        """Linhas por caminho (várias chamadas somadas), agrupadas sob a etapa de nível 0, na ordem de início."""
+        agregado = {}
+        for m in self.medicoes:
+            linha = agregado.setdefault(m['caminho'], {'caminho': m['caminho'], 'nivel': m['nivel'], 'chamadas': 0,
+                                                       'duracao': 0.0, 'cpu': 0.0, 'pico_rss_mb': 0.0, 'linhas': None,
+                                                       'inicio': m['inicio']})
+            linha['chamadas'] += 1
+            linha['duracao'] += m['duracao']
+            linha['cpu'] += m['cpu']
+            linha['pico_rss_mb'] = max(linha['pico_rss_mb'], m['pico_rss_mb'])
+            linha['inicio'] = min(linha['inicio'], m['inicio'])
+            if m['linhas'] is not None:
+                linha['linhas'] = (linha['linhas'] or 0) + m['linhas']
+        raizes = {caminho.split(';')[0]: agregado.get(caminho.split(';')[0], {}).get('inicio', 0.0) for caminho in agregado}
+        return sorted(agregado.values(), key=lambda linha: (raizes[linha['caminho'].split(';')[0]],
+                                                           linha['caminho'].split(';')[0], linha['inicio'], linha['nivel']))
+
+    def como_json(self):
+        return json.dumps({'pico_por_etapa': bool(_pico_por_etapa), 'medicoes': self.medicoes, 'resumo': self.resumo()},
+                          ensure_ascii=False, indent=2)
+
+    def como_csv(self):
+        saida = io.StringIO()
+        escritor = csv.DictWriter(saida, fieldnames=CAMPOS, extrasaction='ignore', lineterminator='\n')
+        escritor.writeheader()
+        escritor.writerows(self.medicoes)
+        return saida.getvalue()
+
+    def exportar_json(self, caminho):
+        with open(caminho, 'w', encoding='utf-8') as f:
+            f.write(self.como_json())
+        return caminho
+
+    def exportar_csv(self, caminho):
+        with open(caminho, 'w', encoding='utf-8', newline='') as f:
+            f.write(self.como_csv())
+        return caminho
+
+    def exportar_pilhas(self, caminho):
+        """Pilhas "collapsed" (`etapa;subetapa microssegundos`) com o tempo próprio de cada etapa."""
+        proprio = {}
+        for m in self.medicoes:
+            proprio[m['caminho']] = proprio.get(m['caminho'], 0.0) + m['duracao']
+            pai = m['caminho'].rpartition(';')[0]
+            if pai:
+                proprio[pai] = proprio.get(pai, 0.0) - m['duracao']
+        with open(caminho, 'w', encoding='utf-8') as f:
+            for pilha, segundos in proprio.items():
+                if segundos > 0:
+                    f.write(f"{pilha.replace(' ', '_')} {int(segundos * 1e6)}\n")
+        return caminho
+
+    def exportar(self, prefixo):
+        """Grava `<prefixo>.json`, `<prefixo>.csv` e `<prefixo>.collapsed`; retorna os caminhos."""
+        os.makedirs(os.path.dirname(prefixo) or '.', exist_ok=True)
+        return [self.exportar_json(prefixo + '.json'), self.exportar_csv(prefixo + '.csv'),
+                self.exportar_pilhas(prefixo + '.collapsed')]
+
+    def imprimir(self):
+        print(f"\n{'etapa':<40} | {'chamadas':>8} | {'duração (s)':>11} | {'CPU (s)':>8} | {'pico RSS (MB)':>13} | {'linhas':>10}")
+        print("-" * 106)
+        for linha in self.resumo():
+            nome = '  ' * linha['nivel'] + linha['caminho'].rpartition(';')[2]
+            linhas = '-' if linha['linhas'] is None else linha['linhas']
+            print(f"{nome:<40} | {linha['chamadas']:>8} | {linha['duracao']:>11.3f} | {linha['cpu']:>8.3f} | "
+                  f"{linha['pico_rss_mb']:>13.1f} | {linhas:>10}")
+
+_REGISTRO_PROCESSO = Registro()
+
+def registro_atual():
+    """Registro da thread atual (o do processo, se a thread não abriu um com `novo_registro`)."""
+    return getattr(_local, 'registro', _REGISTRO_PROCESSO)
+
+def novo_registro(ativo=False):
+    """Abre um registro novo para a thread atual (ex.: um por rerun do Streamlit) e o devolve.
+
+    `ativo=True` liga a medição só neste registro, sem mudar o processo nem o ambiente.
+    """
+    _local.registro = Registro(ativo)
+    return _local.registro
+
+def medir(nome, linhas=None):
+    """Contexto que mede uma etapa no registro da thread atual (nulo se desligada)."""
+    return registro_atual().medir(nome, linhas)
+
+def instrumentar(nome=None, linhas=None, da_entrada=False):
+    """Decorador: mede cada chamada; `linhas(resultado)` dá as linhas processadas (ex.: `len`).
+
+    Com `da_entrada=True`, `linhas` é aplicado ao primeiro argumento em vez do resultado.
+    """
+    def decorador(funcao):
+        etapa = nome or funcao.__name__
+
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            registro = registro_atual()
+            if not (_ativa or registro.ativo):
+                return funcao(*args, **kwargs)
+            with registro.medir(etapa) as medicao:
+                resultado = funcao(*args, **kwargs)
+                if linhas is not None:
+                    medicao.definir_linhas(linhas(args[0] if da_entrada else resultado))
+                return resultado
+        return envolvida
+    return decorador
+
+@contextlib.contextmanager
+def perfil(caminho):
+    """Grava um dump do cProfile em `caminho` (abre com `python -m pstats` ou snakeviz); None desliga."""
+    if not caminho:
+        yield None
+        return
+    perfilador = cProfile.Profile()
+    perfilador.enable()
+    try:
+        yield perfilador
+    finally:
+        perfilador.disable()
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        perfilador.dump_stats(caminho)
+        print(f"-> Perfil do cProfile gravado em {caminho}")
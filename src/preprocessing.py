@@ -1,28 +1,293 @@
 # src/preprocessing.py
+import hashlib
+import io
+import json
+import os
+import re
+
+import fsspec
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.instrumentation import instrumentar, medir
+
+TAMANHO_LOTE_PADRAO = 5000
+DIRETORIO_TRABALHO_PADRAO = 'data/bruto_parquet'
+
+# Seções de applicants.json e o prefixo usado no aplanamento (notebook, célula 5)
+SECOES_APPLICANTS = [
+    ('infos_basicas', 'basicas_'),
+    ('informacoes_pessoais', 'pessoais_'),
+    ('informacoes_profissionais', 'profissionais_'),
+    ('formacao_e_idiomas', 'formacao_'),
+    ('cargo_atual', 'cargo_atual_'),
+]
+SECOES_VAGAS = ['informacoes_basicas', 'perfil_vaga', 'beneficios']
+
+_ESPACOS = re.compile(r'[ \t\n\r]*')
+
+def iterar_objeto_json(arquivo, tamanho_leitura=1 << 20):
+    """Percorre um objeto JSON de topo (`{id: registro, ...}`) chave a chave.
+
+    Lê o arquivo em pedaços de `tamanho_leitura` caracteres e decodifica um registro
+    por vez com o `JSONDecoder` da biblioteca padrão, então a memória fica limitada
+    ao maior registro, não ao tamanho do arquivo.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, fim_arquivo = '', 0, False
+
+    def ler_mais():
+        nonlocal buffer, pos, fim_arquivo
+        pedaco = arquivo.read(tamanho_leitura)
+        if not pedaco:
+            fim_arquivo = True
+        buffer, pos = buffer[pos:] + pedaco, 0
+
+    def proximo_caractere():
+        nonlocal pos
+        while True:
+            pos = _ESPACOS.match(buffer, pos).end()
+            if pos < len(buffer) or fim_arquivo:
+                return buffer[pos] if pos < len(buffer) else ''
+            ler_mais()
+
+    def decodificar():
+        nonlocal pos
+        while True:
+            try:
+                valor, fim = decoder.raw_decode(buffer, pos)
+                # Um número ou literal no fim do buffer pode estar truncado
+                if fim < len(buffer) or fim_arquivo:
+                    pos = fim
+                    return valor
+            except json.JSONDecodeError:
+                if fim_arquivo:
+                    raise
+            ler_mais()
+
+    if proximo_caractere() != '{':
+        raise ValueError("O arquivo JSON não começa com um objeto ('{').")
+    pos += 1
+    if proximo_caractere() == '}':
+        return
+    while True:
+        if proximo_caractere() != '"':
+            raise ValueError(f"Chave esperada na posição {pos} do buffer.")
+        chave = decodificar()
+        if proximo_caractere() != ':':
+            raise ValueError(f"':' esperado após a chave {chave!r}.")
+        pos += 1
+        proximo_caractere()
+        yield chave, decodificar()
+        separador = proximo_caractere()
+        pos += 1
+        if separador == '}':
+            return
+        if separador != ',':
+            raise ValueError(f"',' ou '}}' esperado após o registro {chave!r}.")
+
+def _achatar(secao, prefixo=''):
+    """Achata dicionários aninhados como o `json_normalize` (subchaves unidas por '.')."""
+    saida = {}
+    for chave, valor in (secao or {}).items():
+        if isinstance(valor, dict):
+            saida.update(_achatar(valor, f"{prefixo}{chave}."))
+        else:
+            saida[f"{prefixo}{chave}"] = valor
+    return saida
+
+def _renomear_campo(registro, destino, origem_preferida, origem_alternativa):
+    """Mantém um único campo `destino` (ex.: 'nome'), preferindo a origem de infos_basicas."""
+    if origem_preferida in registro:
+        registro.pop(origem_alternativa, None)
+        registro[destino] = registro.pop(origem_preferida)
+    elif origem_alternativa in registro:
+        registro[destino] = registro.pop(origem_alternativa)
+
+def achatar_applicant(codigo, applicant):
+    """Aplana um candidato de applicants.json (mesmas regras do notebook, célula 5)."""
+    registro = {}
+    for secao, prefixo in SECOES_APPLICANTS:
+        registro.update(_achatar(applicant.get(secao), prefixo))
+    registro['cv_pt'] = applicant.get('cv_pt')
+    registro['cv_en'] = applicant.get('cv_en')
+
+    codigo_basicas = registro.get('basicas_codigo_profissional')
+    registro['codigo_profissional'] = str(codigo_basicas) if codigo_basicas not in (None, '') else str(codigo)
+
+    _renomear_campo(registro, 'nome', 'basicas_nome', 'pessoais_nome')
+    _renomear_campo(registro, 'email', 'basicas_email', 'pessoais_email')
+    if 'basicas_telefone' in registro:
+        registro['telefone'] = registro.pop('basicas_telefone')
+    elif 'pessoais_telefone_celular' in registro:
+        registro['telefone'] = registro.pop('pessoais_telefone_celular')
 
-def carregar_e_unir_dados(gcs_bucket_path):
+    # Remove prefixos quando não há conflito (ex.: 'formacao_nivel_academico' -> 'nivel_academico')
+    for coluna in list(registro):
+        for prefixo in ('formacao_', 'profissionais_', 'pessoais_'):
+            if coluna.startswith(prefixo) and coluna.replace(prefixo, '') not in registro:
+                registro[coluna.replace(prefixo, '')] = registro.pop(coluna)
+                break
+    return [registro]
+
+def achatar_vaga(vaga_id, vaga):
+    """Aplana uma vaga de vagas.json, com 'vaga_id' explícito como primeira coluna."""
+    registro = {'vaga_id': str(vaga_id)}
+    for secao in SECOES_VAGAS:
+        registro.update(_achatar(vaga.get(secao)))
+    return [registro]
+
+def achatar_prospects(vaga_id, vaga):
+    """Gera um registro por candidatura da vaga em prospects.json (sem 'codigo', a candidatura é ignorada)."""
+    registros = []
+    for prospect in vaga.get('prospects') or []:
+        registro = {'vaga_id': str(vaga_id), 'titulo_vaga': vaga.get('titulo'), 'modalidade': vaga.get('modalidade'), **prospect}
+        codigo = registro.pop('codigo', None)
+        if codigo in (None, ''):
+            continue
+        registro['codigo_profissional'] = str(codigo)
+        registros.append(registro)
+    return registros
+
+def _para_texto(valor):
+    """Todos os campos brutos são textos; estruturas restantes viram JSON."""
+    if valor is None or isinstance(valor, str):
+        return valor
+    if isinstance(valor, (list, dict)):
+        return json.dumps(valor, ensure_ascii=False)
+    return str(valor)
+
+def _abrir_texto(caminho, filesystem=None):
+    if filesystem is not None:
+        return io.TextIOWrapper(filesystem.open(caminho, 'rb'), encoding='utf-8')
+    return fsspec.open(caminho, 'rt', encoding='utf-8').open()
+
+def hash_registro(registro):
+    """Hash estável do conteúdo de um registro aplanado (detecção de mudanças)."""
+    conteudo = json.dumps(registro, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+    return hashlib.blake2b(conteudo, digest_size=16).hexdigest()
+
+def _unir_partes(partes, caminho_saida):
+    """Junta Parquets gravados com schemas crescentes (só colunas de texto) em um só, com o último schema.
+
+    Colunas que uma parte não tem entram como nulas; lê e grava um row group por vez.
+    """
+    schema = pq.read_schema(partes[-1])
+    with pq.ParquetWriter(caminho_saida, schema) as writer:
+        for parte in partes:
+            arquivo = pq.ParquetFile(parte)
+            for i in range(arquivo.num_row_groups):
+                tabela = arquivo.read_row_group(i)
+                colunas = [tabela[nome] if nome in tabela.column_names else pa.nulls(tabela.num_rows, pa.string())
+                           for nome in schema.names]
+                writer.write_table(pa.Table.from_arrays(colunas, schema=schema), row_group_size=tabela.num_rows)
+    for parte in partes:
+        os.remove(parte)
+
+@instrumentar('carregar_e_achatar', linhas=int)
+def converter_json_para_parquet(caminho_json, caminho_parquet, achatar, tamanho_lote=TAMANHO_LOTE_PADRAO, filesystem=None,
+                                incluir_hash=False):
+    """Converte um JSON `{id: registro}` em Parquet, um row group por lote de registros aplanados.
+
+    Todas as colunas são texto. O schema começa com as colunas do primeiro lote; quando uma
+    coluna nova aparece em um lote posterior (campos esparsos dos candidatos), os lotes
+    seguintes vão para uma nova parte com o schema ampliado e, no fim, as partes são unidas
+    com nulos nas colunas que ainda não existiam. Com `incluir_hash=True` cada linha ganha
+    a coluna 'hash_registro'. Retorna o número de linhas gravadas.
+    """
+    os.makedirs(os.path.dirname(caminho_parquet) or '.', exist_ok=True)
+    writer, schema, partes = None, None, []
+    lote, total = [], 0
+
+    def gravar_lote():
+        nonlocal writer, schema
+        colunas = list(dict.fromkeys(coluna for registro in lote for coluna in registro))
+        novas = [coluna for coluna in colunas if schema is None or coluna not in schema.names]
+        if novas:
+            if writer is not None:
+                writer.close()
+            schema = pa.schema(list(schema or []) + [(coluna, pa.string()) for coluna in novas])
+            partes.append(f"{caminho_parquet}.parte{len(partes)}.tmp")
+            writer = pq.ParquetWriter(partes[-1], schema)
+        tabela = pa.table({coluna: [_para_texto(registro.get(coluna)) for registro in lote] for coluna in schema.names}, schema=schema)
+        writer.write_table(tabela, row_group_size=len(lote))
+
+    with _abrir_texto(caminho_json, filesystem) as arquivo:
+        for chave, valor in iterar_objeto_json(arquivo):
+            registros = achatar(chave, valor)
+            if incluir_hash:
+                for registro in registros:
+                    registro['hash_registro'] = hash_registro(registro)
+            lote.extend(registros)
+            if len(lote) >= tamanho_lote:
+                gravar_lote()
+                total += len(lote)
+                lote = []
+    if lote:
+        gravar_lote()
+        total += len(lote)
+    if writer is None:
+        # Arquivo sem registros: grava um Parquet vazio
+        partes.append(caminho_parquet + '.parte0.tmp')
+        writer = pq.ParquetWriter(partes[-1], pa.schema([]))
+    writer.close()
+    if len(partes) == 1:
+        os.replace(partes[0], caminho_parquet)
+    else:
+        _unir_partes(partes, caminho_parquet + '.tmp')
+        os.replace(caminho_parquet + '.tmp', caminho_parquet)
+    return total
+
+def converter_dados_brutos(gcs_bucket_path, diretorio_saida=DIRETORIO_TRABALHO_PADRAO, tamanho_lote=TAMANHO_LOTE_PADRAO, filesystem=None,
+                           incluir_hash=False, fontes=None):
+    """Converte applicants/vagas/prospects.json em Parquet aplanado, em streaming.
+
+    `gcs_bucket_path` pode ser 'gs://<bucket>' ou um diretório local com o mesmo layout
+    (`<caminho>/data/*.json`), útil para rodar sem acesso à nuvem. Com `fontes`, só
+    esses arquivos são convertidos; os caminhos dos três são sempre retornados.
+    """
+    caminhos = {}
+    for nome, achatar in (('applicants', achatar_applicant), ('vagas', achatar_vaga), ('prospects', achatar_prospects)):
+        caminho_parquet = os.path.join(diretorio_saida, f"{nome}.parquet")
+        caminhos[nome] = caminho_parquet
+        if fontes is not None and nome not in fontes:
+            continue
+        with medir(nome):
+            linhas = converter_json_para_parquet(f"{gcs_bucket_path}/data/{nome}.json", caminho_parquet, achatar,
+                                                 tamanho_lote=tamanho_lote, filesystem=filesystem, incluir_hash=incluir_hash)
+        print(f"-> {nome}: {linhas} linhas aplanadas em {caminho_parquet}")
+    return caminhos
+
+@instrumentar('unir', linhas=len)
+def unir_dados(df_applicants_flat, df_prospects_flat, df_vagas_flat):
+    """Une applicants -> prospects (inner) -> vagas (left), como no notebook."""
+    df_candidatos_com_prospects = df_applicants_flat.merge(
+        df_prospects_flat,
+        on='codigo_profissional',
+        how='inner',
+        suffixes=('_candidato', '_prospect')
+    )
+    df_mestre = df_candidatos_com_prospects.merge(
+        df_vagas_flat,
+        on='vaga_id',
+        how='left',
+        suffixes=('', '_vaga')
+    )
+    colunas_chave = ['codigo_profissional', 'vaga_id', 'nome_candidato', 'nome_prospect', 'titulo_vaga', 'cliente']
+    colunas_chave = [col for col in colunas_chave if col in df_mestre.columns]
+    outras_colunas = [col for col in df_mestre.columns if col not in colunas_chave]
+    return df_mestre[colunas_chave + outras_colunas]
+
+def carregar_e_unir_dados(gcs_bucket_path, filesystem=None, diretorio_trabalho=DIRETORIO_TRABALHO_PADRAO, tamanho_lote=TAMANHO_LOTE_PADRAO):
     """Carrega os dados brutos do GCS e os une em um DataFrame mestre."""
-    print("Carregando dados brutos do GCS...")
-    df_applicants = pd.read_json(f"{gcs_bucket_path}/data/applicants.json", orient='index')
-    df_vagas = pd.read_json(f"{gcs_bucket_path}/data/vagas.json", orient='index')
-    df_prospects = pd.read_json(f"{gcs_bucket_path}/data/prospects.json", orient='index')
-
-    print("Aplanando DataFrames...")
-    # Aplanar Applicants
-    # (código de aplanamento de applicants que você criou)
-    # ...
-    # Aplanar Vagas
-    # (código de aplanamento de vagas que você criou)
-    # ...
-    # Aplanar Prospects
-    # (código de aplanamento de prospects que você criou)
-    # ...
+    print("Carregando e aplanando dados brutos em lotes...")
+    caminhos = converter_dados_brutos(gcs_bucket_path, diretorio_trabalho, tamanho_lote=tamanho_lote, filesystem=filesystem)
 
     print("Unindo DataFrames...")
-    # Unir os DataFrames
-    # (código de união para criar df_mestre que você criou)
-    # ...
-    
+    with medir('ler_parquet'):
+        tabelas = [pd.read_parquet(caminhos[nome]) for nome in ('applicants', 'prospects', 'vagas')]
+    df_mestre = unir_dados(*tabelas)
+
     print("Dados processados com sucesso!")
-    return df_mestre
\ No newline at end of file
+    return df_mestre
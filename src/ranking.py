@@ -0,0 +1,294 @@
+# src/ranking.py
+import argparse
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.encoder import COLUNAS_ORIGEM_VAGA, CodificadorFeatures
+from src.explanations import TOP_K_PADRAO, colunas_explicacao, pontuar_e_explicar
+from src.feature_engineering import ExtratorSkills
+from src.instrumentation import medir
+from src.recommendations import PERCENTUAL_TOP_PADRAO, calcular_recomendacoes
+
+COLUNAS_EXIBICAO = ['nome', 'similitude_cv_vaga', 'anos_experiencia', 'email']
+# Textos repetidos por vaga: dicionarizados, ficam gravados uma vez por valor distinto
+COLUNAS_VAGA = ['vaga_id', 'principais_atividades', 'competencia_tecnicas_e_comportamentais'] + COLUNAS_ORIGEM_VAGA
+CHAVE_PADRAO = 'titulo_vaga'
+CAMINHO_INDICE_PADRAO = 'models/ranking_index.arrow'
+
+def pontuar_candidatos(df, model, codificador, tamanho_bloco=50000):
+    """Match score (0-100, float32) de cada linha, processando em blocos para limitar a memória."""
+    scores = np.empty(len(df), dtype=np.float32)
+    for inicio in range(0, len(df), tamanho_bloco):
+        bloco = df.iloc[inicio:inicio + tamanho_bloco]
+        X = codificador.transform(bloco)
+        with medir('predict_proba', len(bloco)):
+            scores[inicio:inicio + len(bloco)] = model.predict_proba(X)[:, 1] * 100
+    return scores
+
+def ranquear_online(df_vaga, model, codificador, pontuador=pontuar_candidatos):
+    """Ranking calculado na hora (fallback para vagas ou candidatos fora do índice).
+
+    `pontuador` tem a assinatura de `pontuar_candidatos` (ex.: `ClienteServico.pontuar`).
+    """
+    df_resultados = df_vaga.copy()
+    df_resultados['match_score'] = pontuador(df_vaga, model, codificador)
+    return df_resultados.sort_values(by='match_score', ascending=False)
+
+def impressao_modelo(model, codificador):
+    """Identifica o par (modelo, features); um índice gerado com outro modelo é ignorado."""
+    return joblib.hash((model, list(codificador.colunas)))
+
+def _pontuar_para_indice(df, model, codificador, chave, top_k_explicacoes=0):
+    """Linhas do índice (chave, exibição, vaga, skills, score e explicações) ordenadas por chave e score decrescente.
+
+    Com `top_k_explicacoes` > 0, as contribuições TreeSHAP são calculadas junto com o score
+    (ver src/explanations.py). Retorna `(df_indice, explicacoes)`, com os metadados das explicações ou None.
+    """
+    print(f"Pontuando {len(df)} pares (vaga, candidato)...")
+    explicacoes = None
+    if top_k_explicacoes:
+        scores, posicoes, valores, valor_base = pontuar_e_explicar(df, model, codificador, top_k_explicacoes)
+        explicacoes = {'top_k': top_k_explicacoes, 'features': list(codificador.colunas), 'valor_base': valor_base}
+    else:
+        scores = pontuar_candidatos(df, model, codificador)
+
+    colunas_skills = [col for col in df.columns if col.startswith('skill_')]
+    colunas = ['codigo_profissional'] + [col for col in COLUNAS_VAGA + COLUNAS_EXIBICAO if col in df.columns]
+    df_indice = df[[chave] + colunas + colunas_skills].copy()
+    df_indice[chave] = df_indice[chave].astype(str)
+    df_indice['match_score'] = scores
+    # Contagens em uint16, saturadas em vez de dar a volta (uint8 transformava 256 em 0)
+    df_indice[colunas_skills] = df_indice[colunas_skills].fillna(0).clip(0, np.iinfo(np.uint16).max).astype(np.uint16)
+    if explicacoes:
+        colunas_exp = colunas_explicacao(top_k_explicacoes)
+        dados = {col: posicoes[:, i] for i, col in enumerate(colunas_exp[:top_k_explicacoes])}
+        dados.update({col: valores[:, i] for i, col in enumerate(colunas_exp[top_k_explicacoes:])})
+        df_indice = pd.concat([df_indice, pd.DataFrame(dados, index=df_indice.index)], axis=1)
+    df_indice = df_indice.sort_values([chave, 'match_score'], ascending=[True, False], kind='stable').reset_index(drop=True)
+    return df_indice, explicacoes
+
+def _gravar_indice(df_indice, caminho_saida, chave, impressao, recomendacoes, percentual_top, assinaturas, explicacoes=None):
+    for col in COLUNAS_VAGA:
+        if col in df_indice.columns:
+            df_indice[col] = df_indice[col].astype('category')
+    chaves, inicios, contagens = np.unique(df_indice[chave].to_numpy(), return_index=True, return_counts=True)
+    intervalos = {str(k): [int(i), int(n)] for k, i, n in zip(chaves, inicios, contagens)}
+    tabela = pa.Table.from_pandas(df_indice, preserve_index=False)
+    tabela = tabela.replace_schema_metadata({
+        **(tabela.schema.metadata or {}),
+        b'ranking_chave': chave.encode('utf-8'),
+        b'ranking_intervalos': json.dumps(intervalos, ensure_ascii=False).encode('utf-8'),
+        b'ranking_assinaturas': json.dumps(assinaturas, ensure_ascii=False).encode('utf-8'),
+        b'ranking_impressao_modelo': impressao.encode('utf-8'),
+        b'ranking_recomendacoes': json.dumps(recomendacoes, ensure_ascii=False).encode('utf-8'),
+        b'ranking_percentual_top': str(percentual_top).encode('utf-8'),
+        **({b'ranking_explicacoes': json.dumps(explicacoes, ensure_ascii=False).encode('utf-8')} if explicacoes else {}),
+    })
+
+    os.makedirs(os.path.dirname(caminho_saida) or '.', exist_ok=True)
+    with pa.OSFile(caminho_saida + '.tmp', 'wb') as sink:
+        with pa.ipc.new_file(sink, tabela.schema) as writer:
+            writer.write_table(tabela)
+    os.replace(caminho_saida + '.tmp', caminho_saida)
+    print(f"-> Índice com {len(intervalos)} vagas e {len(df_indice)} candidaturas gravado em {caminho_saida}")
+    return caminho_saida
+
+def construir_indice_ranking(df, model, codificador, caminho_saida=CAMINHO_INDICE_PADRAO, chave=CHAVE_PADRAO,
+                             percentual_top=PERCENTUAL_TOP_PADRAO, top_k_explicacoes=TOP_K_PADRAO):
+    """Pontua todos os pares (vaga, candidato) uma vez e grava o ranking ordenado por vaga.
+
+    O arquivo é um Arrow IPC sem compressão (abre por memory-map, sem cópia), ordenado por
+    `chave` e score decrescente. O intervalo de linhas de cada vaga e as recomendações de
+    habilidades da aba "Otimizar Vaga" (top `percentual_top`) ficam nos metadados do schema,
+    então consultar uma vaga é um `slice` e não depende do tamanho do dataset. Cada
+    candidatura leva as `top_k_explicacoes` maiores contribuições do seu score (0 desliga).
+    """
+    df_indice, explicacoes = _pontuar_para_indice(df, model, codificador, chave, top_k_explicacoes)
+    recomendacoes = calcular_recomendacoes(df_indice, ExtratorSkills.das_colunas(codificador.colunas), percentual_top, chave)
+    assinaturas = assinaturas_vagas(df, colunas_assinatura(codificador), chave)
+    return _gravar_indice(df_indice, caminho_saida, chave, impressao_modelo(model, codificador), recomendacoes,
+                          percentual_top, assinaturas, explicacoes)
+
+def colunas_assinatura(codificador):
+    """Colunas que entram na assinatura de cada vaga: as gravadas no índice e as entradas do modelo."""
+    return list(dict.fromkeys(['codigo_profissional'] + COLUNAS_VAGA + COLUNAS_EXIBICAO + codificador.colunas_entrada))
+
+def _valores_para_hash(serie):
+    """Mesmo hash para o mesmo valor no df_mestre e no dataset compacto (float32, categorias)."""
+    if pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_bool_dtype(serie):
+        return serie.astype(np.float32)
+    return serie.astype(object).where(serie.notna(), '').astype(str)
+
+def assinaturas_vagas(df, colunas, chave=CHAVE_PADRAO):
+    """Por vaga, 'candidaturas:hash' do conteúdo das candidaturas; não depende da ordem das linhas.
+
+    O hash de cada linha cobre as `colunas` presentes no `df` (ver `colunas_assinatura`), então
+    candidaturas novas ou removidas, um CV com features diferentes ou um texto de vaga
+    alterado mudam a assinatura. Gravada no índice e no dataset do app: se as duas diferem,
+    o índice está desatualizado para a vaga (mesmo que a contagem seja a mesma).
+    """
+    codigos, vagas = pd.factorize(pd.Series(df[chave], dtype=object).astype(str))
+    valores = pd.DataFrame({col: _valores_para_hash(df[col]) for col in colunas if col in df.columns})
+    hashes = pd.util.hash_pandas_object(valores, index=False).to_numpy()
+    somas = np.zeros(len(vagas), dtype=np.uint64)
+    np.add.at(somas, codigos, hashes)  # soma módulo 2**64
+    contagens = np.bincount(codigos, minlength=len(vagas))
+    return {vaga: f"{n}:{soma:016x}" for vaga, n, soma in zip(vagas, contagens.tolist(), somas.tolist())}
+
+def vagas_alteradas(assinaturas, indice):
+    """Vagas novas, removidas ou com candidaturas diferentes (em conteúdo) das gravadas no índice."""
+    return {vaga for vaga in assinaturas.keys() | indice.assinaturas.keys() if assinaturas.get(vaga) != indice.assinaturas.get(vaga)}
+
+def atualizar_indice_ranking(df, model, codificador, caminho=CAMINHO_INDICE_PADRAO, chave=CHAVE_PADRAO, percentual_top=None,
+                             top_k_explicacoes=None):
+    """Atualiza o índice só nas vagas com candidaturas novas, removidas ou alteradas.
+
+    Uma vaga muda quando a sua assinatura (ver `assinaturas_vagas`) difere da gravada: isso
+    inclui CVs/features de candidatos ou textos da vaga alterados no lugar. Só as candidaturas
+    dessas vagas são pontuadas (e explicadas) e só as recomendações delas são recalculadas;
+    as demais mantêm linhas, scores, explicações e recomendações gravados. Sem índice (ou
+    com outro modelo, chave, percentual ou top_k, ou sem assinaturas) o índice é reconstruído.
+    Retorna as vagas recalculadas.
+    """
+    indice = abrir_indice_ranking(caminho, model, codificador)
+    percentual_top = percentual_top or (indice.percentual_top if indice is not None else PERCENTUAL_TOP_PADRAO)
+    if top_k_explicacoes is None:
+        top_k_explicacoes = indice.top_k_explicacoes if indice is not None else TOP_K_PADRAO
+    if (indice is None or indice.chave != chave or indice.percentual_top != percentual_top or not indice.tem_recomendacoes
+            or indice.top_k_explicacoes != top_k_explicacoes or indice.assinaturas is None):
+        construir_indice_ranking(df, model, codificador, caminho, chave, percentual_top, top_k_explicacoes)
+        return set(df[chave].astype(str))
+
+    assinaturas = assinaturas_vagas(df, colunas_assinatura(codificador), chave)
+    alteradas = vagas_alteradas(assinaturas, indice)
+    if not alteradas:
+        print("-> Índice de ranking já atualizado.")
+        return alteradas
+    df_novo, explicacoes = _pontuar_para_indice(df[df[chave].astype(str).isin(alteradas)], model, codificador, chave,
+                                                top_k_explicacoes)
+    mantidas = indice._tabela.filter(pc.invert(pc.is_in(indice._tabela.column(chave), pa.array(sorted(alteradas)))))
+    df_indice = pd.concat([mantidas.to_pandas()] + ([df_novo] if len(df_novo) else []), ignore_index=True)
+    df_indice = df_indice.sort_values([chave, 'match_score'], ascending=[True, False], kind='stable').reset_index(drop=True)
+
+    recomendacoes = {vaga: r for vaga, r in indice._recomendacoes.items() if vaga not in alteradas}
+    recomendacoes.update(calcular_recomendacoes(df_novo, ExtratorSkills.das_colunas(codificador.colunas), percentual_top, chave))
+    # Mesmo modelo (impressão conferida acima): o valor base gravado continua valendo. O de
+    # `df_novo` seria 0.0 se só houve vagas removidas, e invalidaria todas as explicações
+    explicacoes = indice.explicacoes or explicacoes
+    _gravar_indice(df_indice, caminho, chave, indice.impressao_modelo, recomendacoes, percentual_top, assinaturas, explicacoes)
+    print(f"-> {len(alteradas)} vaga(s) recalculada(s) no índice.")
+    return alteradas
+
+class IndiceRanking:
+    """Leitura do índice de ranking por memory-map; `ranking(vaga)` devolve a fatia já ordenada."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._tabela = pa.ipc.open_file(pa.memory_map(caminho, 'r')).read_all()
+        metadados = self._tabela.schema.metadata
+        self.chave = metadados[b'ranking_chave'].decode('utf-8')
+        self.impressao_modelo = metadados[b'ranking_impressao_modelo'].decode('utf-8')
+        self._intervalos = json.loads(metadados[b'ranking_intervalos'])
+        # Assinatura do conteúdo das candidaturas de cada vaga; None em índices antigos (nunca
+        # coincide com a do dataset: o app recalcula online e `--atualizar` reconstrói)
+        self.assinaturas = json.loads(metadados[b'ranking_assinaturas']) if b'ranking_assinaturas' in metadados else None
+        # Índices antigos não têm recomendações: o app as calcula a partir do ranking
+        self._recomendacoes = json.loads(metadados.get(b'ranking_recomendacoes', b'{}'))
+        self.percentual_top = float(metadados.get(b'ranking_percentual_top', PERCENTUAL_TOP_PADRAO))
+        self.tem_recomendacoes = b'ranking_recomendacoes' in metadados
+        # Features e valor base das explicações (colunas explicacao_*); None em índices sem explicações
+        self.explicacoes = json.loads(metadados[b'ranking_explicacoes']) if b'ranking_explicacoes' in metadados else None
+        self.top_k_explicacoes = self.explicacoes['top_k'] if self.explicacoes else 0
+
+    def __len__(self):
+        return self._tabela.num_rows
+
+    def __contains__(self, vaga):
+        return str(vaga) in self._intervalos
+
+    def vagas(self):
+        return list(self._intervalos)
+
+    def contagem(self, vaga):
+        return self._intervalos.get(str(vaga), [0, 0])[1]
+
+    def assinatura(self, vaga):
+        """Assinatura das candidaturas da vaga no índice (ver `assinaturas_vagas`), ou None."""
+        return self.assinaturas.get(str(vaga)) if self.assinaturas is not None else None
+
+    def recomendacoes(self, vaga):
+        """Recomendações pré-calculadas da vaga (ver `calcular_recomendacoes`), ou None."""
+        return self._recomendacoes.get(str(vaga))
+
+    def ranking(self, vaga):
+        """DataFrame da vaga ordenado por match score, ou None se a vaga não está no índice."""
+        intervalo = self._intervalos.get(str(vaga))
+        if intervalo is None:
+            return None
+        fatia = self._tabela.slice(*intervalo)
+        # Categóricas voltam como texto, só com os valores da vaga
+        for i, campo in enumerate(fatia.schema):
+            if pa.types.is_dictionary(campo.type):
+                fatia = fatia.set_column(i, campo.name, pc.cast(fatia.column(i), campo.type.value_type))
+        return fatia.to_pandas()
+
+def abrir_indice_ranking(caminho=CAMINHO_INDICE_PADRAO, model=None, codificador=None):
+    """Abre o índice; None se não existe ou se foi gerado com outro modelo/features."""
+    if not os.path.exists(caminho):
+        return None
+    indice = IndiceRanking(caminho)
+    if model is not None and indice.impressao_modelo != impressao_modelo(model, codificador):
+        print(f"AVISO: índice de ranking {caminho} foi gerado com outro modelo; usando ranking online.")
+        return None
+    return indice
+
+def obter_ranking(vaga, indice, df_vaga_fn, model, codificador, assinatura=None, pontuador=pontuar_candidatos):
+    """Ranking da vaga a partir do índice; recalcula online se a vaga é nova ou mudou.
+
+    `df_vaga_fn` só é chamado no fallback (filtrar o dataset é o passo caro). Com
+    `assinatura` informada (a do dataset, ver `assinaturas_vagas`), uma assinatura
+    diferente da do índice indica candidaturas mais novas que o índice, mesmo com a
+    mesma contagem. Retorna `(df_resultados, veio_do_indice)`.
+    """
+    if indice is not None and vaga in indice and (assinatura is None or indice.assinatura(vaga) == assinatura):
+        return indice.ranking(vaga), True
+    return ranquear_online(df_vaga_fn(), model, codificador, pontuador), False
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera o índice de ranking pré-calculado por vaga.")
+    parser.add_argument('--dataset', default='data/df_mestre_preprocessado.parquet')
+    parser.add_argument('--modelo', default='models/recruitment_model.joblib')
+    parser.add_argument('--colunas', default='models/model_columns.joblib')
+    parser.add_argument('--codificador', default='models/feature_encoder.joblib',
+                        help="Usado se existir; senão o codificador é reconstruído a partir de --colunas.")
+    parser.add_argument('--saida', default=CAMINHO_INDICE_PADRAO)
+    parser.add_argument('--chave', default=CHAVE_PADRAO)
+    parser.add_argument('--percentual-top', type=float, default=PERCENTUAL_TOP_PADRAO,
+                        help="Fração dos melhores candidatos usada nas recomendações de habilidades.")
+    parser.add_argument('--top-k-explicacoes', type=int, default=TOP_K_PADRAO,
+                        help="Contribuições TreeSHAP guardadas por candidatura (0 desliga as explicações).")
+    parser.add_argument('--atualizar', action='store_true',
+                        help="Recalcula só as vagas com candidaturas novas, removidas ou alteradas em relação ao índice existente.")
+    args = parser.parse_args()
+
+    model = joblib.load(args.modelo)
+    if os.path.exists(args.codificador):
+        codificador = CodificadorFeatures.carregar(args.codificador)
+    else:
+        codificador = CodificadorFeatures.de_colunas_modelo(joblib.load(args.colunas))
+    df = pd.read_parquet(args.dataset)
+    if args.atualizar:
+        atualizar_indice_ranking(df, model, codificador, args.saida, chave=args.chave, percentual_top=args.percentual_top,
+                                 top_k_explicacoes=args.top_k_explicacoes)
+    else:
+        construir_indice_ranking(df, model, codificador, args.saida, chave=args.chave, percentual_top=args.percentual_top,
+                                 top_k_explicacoes=args.top_k_explicacoes)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# src/recommendations.py
+import numpy as np
+
+from src.feature_engineering import ExtratorSkills
+from src.instrumentation import instrumentar
+
+# Fração dos candidatos com maior match score usada para as recomendações da vaga
+PERCENTUAL_TOP_PADRAO = 0.20
+
+def _texto_vaga(df, posicao):
+    return (str(df['principais_atividades'].iloc[posicao]) + " "
+            + str(df['competencia_tecnicas_e_comportamentais'].iloc[posicao]))
+
+@instrumentar('recomendacoes', linhas=len, da_entrada=True)
+def calcular_recomendacoes(df, extrator=None, percentual_top=PERCENTUAL_TOP_PADRAO, chave=None):
+    """Recomendações de habilidades de cada vaga, em uma passada sobre o ranking.
+
+    `df` deve estar agrupado por `chave` e, dentro de cada grupo, ordenado por match score
+    decrescente (como o índice de ranking); com `chave=None`, `df` é o ranking de uma vaga.
+    Para cada grupo: soma as colunas 'skill_*' do top `percentual_top`, extrai uma vez as
+    habilidades do texto da vaga (a do 1º colocado) e recomenda as habilidades frequentes
+    no top que não aparecem no texto. Retorna {vaga: {'vaga_id', 'n_top', 'skills',
+    'skills_vaga', 'recomendacoes'}}, com 'skills' = [[habilidade, contagem], ...] decrescente.
+    """
+    if df.empty:
+        return {}
+    extrator = extrator or ExtratorSkills()
+    chaves = df[chave].astype(str).to_numpy() if chave else np.zeros(len(df), dtype=np.int8)
+    inicios = np.flatnonzero(np.r_[True, chaves[1:] != chaves[:-1]])
+    contagens = np.diff(np.r_[inicios, len(df)])
+    n_top = np.maximum(1, (contagens * percentual_top).astype(np.int64))
+
+    # Os top de cada grupo são as primeiras linhas do grupo: soma por fatias contíguas
+    linhas_top = np.concatenate([np.arange(inicio, inicio + n) for inicio, n in zip(inicios, n_top)])
+    colunas = [col for col in extrator.colunas if col in df.columns]
+    matriz = df[colunas].iloc[linhas_top].fillna(0).to_numpy(dtype=np.int64)
+    somas = np.add.reduceat(matriz, np.r_[0, np.cumsum(n_top)[:-1]], axis=0) if colunas else np.zeros((len(inicios), 0), dtype=np.int64)
+
+    tem_texto = {'principais_atividades', 'competencia_tecnicas_e_comportamentais'} <= set(df.columns)
+    skills_por_texto = {}
+    recomendacoes = {}
+    for g, inicio in enumerate(inicios):
+        texto = _texto_vaga(df, inicio) if tem_texto else ''
+        if texto not in skills_por_texto:
+            skills_por_texto[texto] = extrator.skills_presentes(texto)
+        skills_vaga = skills_por_texto[texto]
+        ordem = [j for j in np.argsort(-somas[g], kind='stable') if somas[g, j] > 0]
+        frequentes = [extrator.skill_da_coluna(colunas[j]) for j in ordem]
+        recomendacoes[str(chaves[inicio]) if chave else None] = {
+            'vaga_id': str(df['vaga_id'].iloc[inicio]) if 'vaga_id' in df.columns else None,
+            'n_top': int(n_top[g]),
+            'skills': [[skill, int(somas[g, j])] for skill, j in zip(frequentes, ordem)],
+            'skills_vaga': sorted(skills_vaga),
+            'recomendacoes': [skill.title() for skill in frequentes if skill not in skills_vaga],
+        }
+    return recomendacoes
+
+def recomendacoes_da_vaga(df_ranked, extrator=None, percentual_top=PERCENTUAL_TOP_PADRAO):
+    """`calcular_recomendacoes` para o ranking (já ordenado) de uma única vaga; None se vazio."""
+    return calcular_recomendacoes(df_ranked, extrator, percentual_top).get(None)
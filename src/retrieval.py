@@ -0,0 +1,153 @@
+# src/retrieval.py
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+
+from src.embedding_cache import ArmazemEmbeddings
+from src.embeddings import CodificadorTexto, identificador_modelo
+from src.incremental import abrir_df_mestre
+from src.ranking import pontuar_candidatos
+
+DIRETORIO_INDICE_PADRAO = 'models/indice_candidatos'
+# Colunas que descrevem o candidato (e não a vaga) no df_mestre; 'remuneracao' é a pretensão
+# salarial de applicants.json (informacoes_profissionais) e é feature do modelo
+COLUNAS_CANDIDATO = ['codigo_profissional', 'nome', 'email', 'nivel_academico', 'nivel_ingles', 'nivel_espanhol', 'anos_experiencia',
+                     'remuneracao']
+
+def _normalizar(vetores):
+    vetores = np.asarray(vetores, dtype=np.float32)
+    return vetores / np.maximum(np.linalg.norm(vetores, axis=-1, keepdims=True), 1e-12)
+
+class IndiceIVF:
+    """Índice IVF (inverted file) de busca aproximada por similitude do cosseno, só numpy.
+
+    Os vetores normalizados são agrupados por k-means em `n_listas` listas e gravados
+    contíguos por lista; uma busca compara a consulta com os centróides e só varre as
+    `n_sondas` listas mais próximas. Mais sondas = mais recall e mais latência.
+    """
+
+    def __init__(self, centroides, vetores, ids, inicios):
+        self.centroides = centroides
+        self.vetores = vetores
+        self.ids = ids
+        self.inicios = inicios
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def construir(cls, vetores, n_listas=None, amostra_treino=100000, tamanho_bloco=65536, seed=42):
+        vetores = _normalizar(vetores)
+        n_listas = n_listas or max(1, int(np.sqrt(len(vetores))))
+        rng = np.random.default_rng(seed)
+        amostra = vetores[rng.choice(len(vetores), min(amostra_treino, len(vetores)), replace=False)]
+        kmeans = MiniBatchKMeans(n_clusters=n_listas, batch_size=4096, n_init=1, random_state=seed).fit(amostra)
+        centroides = _normalizar(kmeans.cluster_centers_)
+
+        listas = np.empty(len(vetores), dtype=np.int32)
+        for inicio in range(0, len(vetores), tamanho_bloco):
+            listas[inicio:inicio + tamanho_bloco] = np.argmax(vetores[inicio:inicio + tamanho_bloco] @ centroides.T, axis=1)
+        ordem = np.argsort(listas, kind='stable')
+        inicios = np.concatenate([[0], np.cumsum(np.bincount(listas, minlength=n_listas))]).astype(np.int64)
+        return cls(centroides, vetores[ordem], ordem.astype(np.int64), inicios)
+
+    def buscar(self, consulta, n=100, n_sondas=16):
+        """Top-`n` (ids, similitudes) aproximados para um vetor de consulta, em ordem decrescente."""
+        consulta = _normalizar(consulta)
+        n_sondas = min(n_sondas, len(self.centroides))
+        listas = np.argpartition(-(self.centroides @ consulta), n_sondas - 1)[:n_sondas]
+        # Cada lista é um trecho contíguo: produto direto sobre a fatia (sem cópia no memmap)
+        trechos = [(self.inicios[lista], self.inicios[lista + 1]) for lista in listas]
+        posicoes = np.concatenate([np.arange(inicio, fim) for inicio, fim in trechos])
+        if len(posicoes) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        similitudes = np.concatenate([self.vetores[inicio:fim] @ consulta for inicio, fim in trechos])
+        melhores = np.argpartition(-similitudes, min(n, len(posicoes)) - 1)[:n] if len(posicoes) > n else np.arange(len(posicoes))
+        melhores = melhores[np.argsort(-similitudes[melhores], kind='stable')]
+        return self.ids[posicoes[melhores]], similitudes[melhores]
+
+    def buscar_exato(self, consulta, n=100):
+        """Busca exaustiva (referência para o recall da busca aproximada)."""
+        similitudes = self.vetores @ _normalizar(consulta)
+        melhores = np.argpartition(-similitudes, n - 1)[:n] if len(similitudes) > n else np.arange(len(similitudes))
+        melhores = melhores[np.argsort(-similitudes[melhores], kind='stable')]
+        return self.ids[melhores], similitudes[melhores]
+
+    def salvar(self, diretorio):
+        os.makedirs(diretorio, exist_ok=True)
+        for nome in ('centroides', 'vetores', 'ids', 'inicios'):
+            caminho = os.path.join(diretorio, f"{nome}.npy")
+            with open(caminho + '.tmp', 'wb') as f:
+                np.save(f, getattr(self, nome))
+            os.replace(caminho + '.tmp', caminho)
+
+    @classmethod
+    def carregar(cls, diretorio):
+        """Abre o índice por memory-map: só as listas sondadas são lidas do disco."""
+        return cls(*(np.load(os.path.join(diretorio, f"{nome}.npy"), mmap_mode='r')
+                     for nome in ('centroides', 'vetores', 'ids', 'inicios')))
+
+def construir_base_candidatos(df):
+    """Uma linha por candidato com as features do lado do candidato (e o CV, para o embedding)."""
+    colunas = [col for col in COLUNAS_CANDIDATO if col in df.columns] + [col for col in df.columns if col.startswith('skill_')]
+    return df.drop_duplicates('codigo_profissional', keep='last')[colunas + ['cv_pt']].reset_index(drop=True)
+
+def construir_indice_candidatos(df, modelo_linguagem, diretorio_saida=DIRETORIO_INDICE_PADRAO, armazem=None, n_listas=None):
+    """Codifica os CVs de todos os candidatos e grava o índice IVF + a tabela de candidatos."""
+    armazem = armazem or ArmazemEmbeddings(identificador_modelo(modelo_linguagem))
+    candidatos = construir_base_candidatos(df)
+    print(f"Codificando CVs de {len(candidatos)} candidatos...")
+    vetores = armazem.codificar(candidatos['cv_pt'].fillna('').tolist(), modelo_linguagem, show_progress_bar=True)
+    print("Treinando o índice IVF...")
+    indice = IndiceIVF.construir(vetores, n_listas=n_listas)
+    indice.salvar(diretorio_saida)
+    candidatos.drop(columns=['cv_pt']).to_parquet(os.path.join(diretorio_saida, 'candidatos.parquet'), index=False)
+    print(f"-> Índice com {len(indice)} candidatos e {len(indice.centroides)} listas gravado em {diretorio_saida}")
+    return indice
+
+class BuscadorCandidatos:
+    """Recuperação em dois estágios: shortlist semântica no índice IVF e re-ranking com o XGBoost."""
+
+    def __init__(self, diretorio=DIRETORIO_INDICE_PADRAO):
+        self.indice = IndiceIVF.carregar(diretorio)
+        self.candidatos = pd.read_parquet(os.path.join(diretorio, 'candidatos.parquet'))
+
+    def shortlist(self, embedding_vaga, n=200, n_sondas=16):
+        """Os `n` candidatos com CV semanticamente mais próximo da vaga, com a similitude."""
+        ids, similitudes = self.indice.buscar(embedding_vaga, n=n, n_sondas=n_sondas)
+        shortlist = self.candidatos.iloc[ids].copy()
+        shortlist['similitude_cv_vaga'] = similitudes.astype(np.float32)
+        return shortlist
+
+    def recomendar(self, embedding_vaga, dados_vaga, model, codificador, n=200, n_sondas=16, pontuador=pontuar_candidatos):
+        """Shortlist + `predict_proba` só nos `n` candidatos, ordenada por match score.
+
+        `dados_vaga` traz as features do lado da vaga (ex.: 'nivel profissional', 'vaga_sap').
+        """
+        shortlist = self.shortlist(embedding_vaga, n=n, n_sondas=n_sondas)
+        for coluna, valor in dados_vaga.items():
+            shortlist[coluna] = valor
+        faltando = [col for col in codificador.colunas_entrada if col not in shortlist.columns]
+        if faltando:
+            print(f"AVISO: features ausentes na tabela de candidatos e em dados_vaga (pontuadas como 0): {faltando}. "
+                  "Reconstrua o índice com `python -m src.retrieval`.")
+        shortlist['match_score'] = pontuador(shortlist, model, codificador)
+        return shortlist.sort_values('match_score', ascending=False)
+
+def main():
+    parser = argparse.ArgumentParser(description="Constrói o índice IVF de CVs de todos os candidatos.")
+    parser.add_argument('--dataset', default='data/df_mestre_preprocessado.parquet')
+    parser.add_argument('--saida', default=DIRETORIO_INDICE_PADRAO)
+    parser.add_argument('--listas', type=int, default=None, help="Número de listas IVF (padrão: sqrt(candidatos)).")
+    args = parser.parse_args()
+
+    dataset = abrir_df_mestre(args.dataset)
+    colunas = [col for col in dataset.schema.names if col in COLUNAS_CANDIDATO + ['cv_pt'] or col.startswith('skill_')]
+    df = dataset.to_table(columns=colunas).to_pandas()
+    construir_indice_candidatos(df, CodificadorTexto(), args.saida, n_listas=args.listas)
+
+if __name__ == '__main__':
+    main()
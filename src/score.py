@@ -0,0 +1,271 @@
+# src/score.py
+"""Pontuação em lote, fora do Streamlit: top-K candidatos por vaga em Parquet.
+
+Dois modos:
+  - df_mestre: pontua as candidaturas existentes, lendo o Parquet row group a row group;
+  - produto cruzado (--candidatos + --vagas): pontua cada candidato do banco contra cada
+    vaga aberta, sem materializar os pares.
+
+Cada bloco (row group ou grupo de vagas) grava um arquivo parcial com o seu top-K; uma
+execução interrompida retoma do primeiro bloco sem arquivo. No fim os parciais são
+unidos no top-K final.
+
+Uso:
+    python -m src.score --dataset data/df_mestre_preprocessado.parquet --saida data/top_k.parquet
+    python -m src.score --candidatos data/candidatos.parquet --vagas data/vagas_abertas.parquet --saida data/top_k.parquet
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+
+import fsspec
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.artifacts import versao_objeto
+from src.embedding_cache import ArmazemEmbeddings
+from src.embeddings import CodificadorTexto, identificador_modelo
+from src.encoder import COLUNAS_ORIGEM_VAGA, CodificadorFeatures
+from src.feature_engineering import ExtratorSkills, adicionar_features_skills, calcular_experiencia_lote, textos_vaga
+from src.incremental import abrir_df_mestre
+from src.ranking import impressao_modelo
+
+TOP_K_PADRAO = 50
+TAMANHO_LOTE_PADRAO = 262144
+COLUNA_SIMILARIDADE = 'similitude_cv_vaga'
+
+def preparar_booster(model, n_threads=None):
+    """Booster do XGBClassifier configurado para predição in-place multithread."""
+    booster = model.get_booster()
+    booster.set_param({'nthread': n_threads or os.cpu_count() or 1})
+    return booster
+
+def prever_scores(booster, matriz):
+    """Match score (0-100, float32), sem DMatrix intermediária."""
+    return (booster.inplace_predict(matriz) * 100).astype(np.float32)
+
+def top_k_por_vaga(df, k):
+    """Mantém as `k` linhas de maior score de cada vaga_id (ordenadas)."""
+    df = df.sort_values(['vaga_id', 'match_score'], ascending=[True, False], kind='stable')
+    return df.groupby('vaga_id', sort=False).head(k)
+
+def versao_entrada(caminho):
+    """Versão de uma entrada (arquivo, ou diretório particionado: todos os seus arquivos).
+
+    Entra no manifesto: um Parquet regerado no mesmo caminho muda a versão (generation/ETag,
+    ou tamanho + data) e os parciais da execução anterior deixam de ser aceitos.
+    """
+    fs, caminho_fs = fsspec.core.url_to_fs(caminho)
+    if not fs.isdir(caminho_fs):
+        return versao_objeto(fs.info(caminho_fs))
+    versoes = [(os.path.relpath(nome, caminho_fs), versao_objeto(info)) for nome, info in sorted(fs.find(caminho_fs, detail=True).items())]
+    return hashlib.blake2b(json.dumps(versoes).encode('utf-8'), digest_size=16).hexdigest()
+
+class ExecucaoRetomavel:
+    """Diretório de arquivos parciais (um por bloco) + manifesto com os parâmetros da execução."""
+
+    def __init__(self, diretorio, parametros, reiniciar=False):
+        self.diretorio = diretorio
+        os.makedirs(diretorio, exist_ok=True)
+        caminho_manifesto = os.path.join(diretorio, 'manifesto.json')
+        if reiniciar:
+            for caminho in glob.glob(os.path.join(diretorio, 'parte-*.parquet')):
+                os.remove(caminho)
+        elif os.path.exists(caminho_manifesto):
+            with open(caminho_manifesto, encoding='utf-8') as f:
+                anteriores = json.load(f)
+            if anteriores != parametros:
+                raise ValueError(f"{diretorio} tem parciais de uma execução com outros parâmetros ou entradas; use --reiniciar.")
+        with open(caminho_manifesto, 'w', encoding='utf-8') as f:
+            json.dump(parametros, f, ensure_ascii=False, indent=2)
+
+    def _caminho(self, bloco):
+        return os.path.join(self.diretorio, f"parte-{bloco:06d}.parquet")
+
+    def concluido(self, bloco):
+        return os.path.exists(self._caminho(bloco))
+
+    def gravar(self, bloco, df):
+        caminho = self._caminho(bloco)
+        df.to_parquet(caminho + '.tmp', index=False)
+        os.replace(caminho + '.tmp', caminho)
+
+    def unir(self, caminho_saida, k):
+        """Top-K final a partir dos parciais, um arquivo por vez (memória ~ vagas x K)."""
+        acumulado = None
+        for caminho in sorted(glob.glob(os.path.join(self.diretorio, 'parte-*.parquet'))):
+            parte = pd.read_parquet(caminho)
+            acumulado = parte if acumulado is None else top_k_por_vaga(pd.concat([acumulado, parte], ignore_index=True), k)
+        if acumulado is None:
+            raise ValueError(f"Nenhum parcial encontrado em {self.diretorio}.")
+        acumulado = top_k_por_vaga(acumulado, k).reset_index(drop=True)
+        acumulado['posicao'] = acumulado.groupby('vaga_id', sort=False).cumcount().astype(np.int32) + 1
+        os.makedirs(os.path.dirname(caminho_saida) or '.', exist_ok=True)
+        acumulado.to_parquet(caminho_saida + '.tmp', index=False)
+        os.replace(caminho_saida + '.tmp', caminho_saida)
+        return acumulado
+
+class Progresso:
+    """Contagem de pares e taxa (pares/s) ao longo da execução."""
+
+    def __init__(self, total_blocos):
+        self.total_blocos = total_blocos
+        self.pares = 0
+        self.inicio = time.perf_counter()
+
+    def bloco(self, indice, pares):
+        self.pares += pares
+        decorrido = time.perf_counter() - self.inicio
+        print(f"-> bloco {indice + 1}/{self.total_blocos}: {self.pares} pares em {decorrido:.1f}s "
+              f"({self.pares / max(decorrido, 1e-9):,.0f} pares/s)")
+
+    def resumo(self):
+        decorrido = time.perf_counter() - self.inicio
+        print(f"Pontuação concluída: {self.pares} pares em {decorrido:.1f}s ({self.pares / max(decorrido, 1e-9):,.0f} pares/s).")
+
+def pontuar_df_mestre(caminho_dataset, model, codificador, execucao, k=TOP_K_PADRAO, tamanho_lote=TAMANHO_LOTE_PADRAO,
+                      n_threads=None, filesystem=None):
+    """Pontua as candidaturas do df_mestre (arquivo ou particionado), um row group por bloco."""
+    booster = preparar_booster(model, n_threads)
+    dataset = abrir_df_mestre(caminho_dataset, filesystem)
+    colunas_saida = [col for col in ('vaga_id', 'codigo_profissional', 'titulo_vaga') if col in dataset.schema.names]
+    colunas = list(dict.fromkeys(colunas_saida + [col for col in codificador.colunas_entrada if col in dataset.schema.names]))
+    # Ordem determinística dos blocos: a retomada depende dela
+    row_groups = [rg for fragmento in sorted(dataset.get_fragments(), key=lambda f: f.path) for rg in fragmento.split_by_row_group()]
+    progresso = Progresso(len(row_groups))
+
+    for indice, row_group in enumerate(row_groups):
+        if execucao.concluido(indice):
+            continue
+        tabela = row_group.to_table(columns=colunas, schema=dataset.schema)
+        partes, pares = [], 0
+        for lote in tabela.to_batches(max_chunksize=tamanho_lote):
+            df_lote = lote.to_pandas()
+            df_lote['match_score'] = prever_scores(booster, codificador.transform(df_lote))
+            partes.append(top_k_por_vaga(df_lote[colunas_saida + ['match_score']], k))
+            pares += len(df_lote)
+        parte = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(columns=colunas_saida + ['match_score'])
+        execucao.gravar(indice, top_k_por_vaga(parte, k))
+        progresso.bloco(indice, pares)
+    progresso.resumo()
+
+def _features_candidatos(df_candidatos, codificador):
+    """Completa experiência e skills a partir do CV quando o banco de candidatos não as traz."""
+    if 'anos_experiencia' in codificador.colunas and 'anos_experiencia' not in df_candidatos.columns:
+        print("Calculando anos de experiência dos candidatos...")
+        df_candidatos['anos_experiencia'] = calcular_experiencia_lote(df_candidatos['cv_pt'].tolist())
+    colunas_skills = [col for col in codificador.colunas if col.startswith('skill_')]
+    if colunas_skills and not set(colunas_skills) <= set(df_candidatos.columns):
+        print("Extraindo skills dos candidatos...")
+        df_candidatos = adicionar_features_skills(df_candidatos, ExtratorSkills.das_colunas(colunas_skills))
+    return df_candidatos
+
+def _embeddings_normalizados(textos, armazem, modelo_linguagem):
+    vetores, indices = armazem.codificar_unicos(textos, modelo_linguagem, show_progress_bar=True)
+    # Mesmo eps do cos_sim: vetores nulos resultam em similitude 0
+    vetores = vetores / np.maximum(np.linalg.norm(vetores, axis=1, keepdims=True), 1e-12)
+    return vetores.astype(np.float32), indices
+
+def pontuar_produto_cruzado(df_candidatos, df_vagas, model, codificador, execucao, k=TOP_K_PADRAO,
+                            tamanho_lote=TAMANHO_LOTE_PADRAO, vagas_por_bloco=64, n_threads=None, modelo_linguagem=None):
+    """Pontua todos os candidatos contra todas as vagas, sem materializar os pares.
+
+    As features do candidato são codificadas uma vez; para cada vaga só as colunas da vaga
+    e a similitude mudam, sobre fatias de `tamanho_lote` candidatos. A memória fica em
+    ~candidatos x features, independente do número de pares.
+    """
+    booster = preparar_booster(model, n_threads)
+    df_vagas = df_vagas.assign(vaga_id=df_vagas['vaga_id'].astype(str)).sort_values('vaga_id', kind='stable').reset_index(drop=True)
+    df_candidatos = _features_candidatos(df_candidatos.reset_index(drop=True), codificador)
+    codigos = df_candidatos['codigo_profissional'].astype(str).to_numpy()
+
+    # Lado do candidato e lado da vaga, codificados separadamente
+    posicoes_vaga = codificador.posicoes_de(COLUNAS_ORIGEM_VAGA)
+    matriz_candidatos = codificador.transform(df_candidatos.drop(columns=COLUNAS_ORIGEM_VAGA, errors='ignore'))
+    matriz_vagas = codificador.transform(df_vagas[[col for col in COLUNAS_ORIGEM_VAGA if col in df_vagas.columns]])[:, posicoes_vaga]
+
+    posicao_similaridade = codificador.colunas.index(COLUNA_SIMILARIDADE) if COLUNA_SIMILARIDADE in codificador.colunas else None
+    if posicao_similaridade is not None:
+        if modelo_linguagem is None:
+            modelo_linguagem = CodificadorTexto()
+        armazem = ArmazemEmbeddings(identificador_modelo(modelo_linguagem))
+        emb_cv, idx_cv = _embeddings_normalizados(df_candidatos['cv_pt'].fillna('').tolist(), armazem, modelo_linguagem)
+        emb_vaga, idx_vaga = _embeddings_normalizados(textos_vaga(df_vagas).tolist(), armazem, modelo_linguagem)
+
+    blocos = range(0, len(df_vagas), vagas_por_bloco)
+    progresso = Progresso(len(blocos))
+    for indice, inicio_bloco in enumerate(blocos):
+        if execucao.concluido(indice):
+            continue
+        partes = []
+        for i in range(inicio_bloco, min(inicio_bloco + vagas_por_bloco, len(df_vagas))):
+            if posicao_similaridade is not None:
+                # Similitude com cada CV distinto, depois expandida para os candidatos
+                similaridades = (emb_cv @ emb_vaga[idx_vaga[i]])[idx_cv]
+            scores = np.empty(len(df_candidatos), dtype=np.float32)
+            for inicio in range(0, len(df_candidatos), tamanho_lote):
+                fatia = slice(inicio, inicio + tamanho_lote)
+                matriz = matriz_candidatos[fatia].copy()
+                matriz[:, posicoes_vaga] = matriz_vagas[i]
+                if posicao_similaridade is not None:
+                    matriz[:, posicao_similaridade] = similaridades[fatia]
+                scores[fatia] = prever_scores(booster, matriz)
+            melhores = np.argpartition(-scores, k - 1)[:k] if len(scores) > k else np.arange(len(scores))
+            parte = pd.DataFrame({'vaga_id': df_vagas.at[i, 'vaga_id'], 'codigo_profissional': codigos[melhores],
+                                  'match_score': scores[melhores]})
+            if 'titulo_vaga' in df_vagas.columns:
+                parte.insert(2, 'titulo_vaga', df_vagas.at[i, 'titulo_vaga'])
+            partes.append(parte)
+        execucao.gravar(indice, top_k_por_vaga(pd.concat(partes, ignore_index=True), k))
+        progresso.bloco(indice, len(df_candidatos) * len(partes))
+    progresso.resumo()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dataset', help="df_mestre (arquivo Parquet ou diretório particionado).")
+    parser.add_argument('--candidatos', help="Banco de candidatos (Parquet) para o produto cruzado.")
+    parser.add_argument('--vagas', help="Vagas abertas (Parquet) para o produto cruzado.")
+    parser.add_argument('--modelo', default='models/recruitment_model.joblib')
+    parser.add_argument('--colunas', default='models/model_columns.joblib')
+    parser.add_argument('--codificador', default='models/feature_encoder.joblib')
+    parser.add_argument('--saida', default='data/top_k_por_vaga.parquet')
+    parser.add_argument('--parciais', help="Diretório dos arquivos parciais (padrão: <saida>.parciais).")
+    parser.add_argument('--top-k', type=int, default=TOP_K_PADRAO)
+    parser.add_argument('--tamanho-lote', type=int, default=TAMANHO_LOTE_PADRAO, help="Linhas por chamada ao modelo.")
+    parser.add_argument('--vagas-por-bloco', type=int, default=64, help="Vagas por arquivo parcial no produto cruzado.")
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--reiniciar', action='store_true', help="Descarta os parciais de uma execução anterior.")
+    args = parser.parse_args()
+    if bool(args.dataset) == bool(args.candidatos and args.vagas):
+        parser.error("Informe --dataset ou o par --candidatos/--vagas.")
+
+    model = joblib.load(args.modelo)
+    if os.path.exists(args.codificador):
+        codificador = CodificadorFeatures.carregar(args.codificador)
+    else:
+        codificador = CodificadorFeatures.de_colunas_modelo(joblib.load(args.colunas))
+
+    entradas = [args.dataset] if args.dataset else [args.candidatos, args.vagas]
+    parametros = {
+        'entradas': [{'caminho': os.path.abspath(caminho), 'versao': versao_entrada(caminho)} for caminho in entradas],
+        'impressao_modelo': impressao_modelo(model, codificador),
+        'top_k': args.top_k,
+        'vagas_por_bloco': None if args.dataset else args.vagas_por_bloco,
+    }
+    execucao = ExecucaoRetomavel(args.parciais or args.saida + '.parciais', parametros, reiniciar=args.reiniciar)
+
+    if args.dataset:
+        pontuar_df_mestre(args.dataset, model, codificador, execucao, k=args.top_k, tamanho_lote=args.tamanho_lote, n_threads=args.threads)
+    else:
+        pontuar_produto_cruzado(pd.read_parquet(args.candidatos), pd.read_parquet(args.vagas), model, codificador, execucao,
+                                k=args.top_k, tamanho_lote=args.tamanho_lote, vagas_por_bloco=args.vagas_por_bloco,
+                                n_threads=args.threads)
+    resultado = execucao.unir(args.saida, args.top_k)
+    print(f"-> Top-{args.top_k} de {resultado['vaga_id'].nunique()} vagas gravado em {args.saida}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,340 @@
+# src/service.py
+"""Serviço local de pontuação (XGBoost) e embeddings, compartilhado pelas sessões do Streamlit.
+
+Requisições concorrentes são agrupadas em micro-lotes (janela de poucos ms) e processadas
+por um pool limitado de workers: um `predict_proba`/`encode` por lote, em vez de um por
+sessão disputando o GIL dentro do rerun do Streamlit. O app usa `ClienteServico`, que
+pontua no próprio processo quando o serviço não está configurado ou não responde.
+
+Uso:
+    python -m src.service --porta 8765 --janela-ms 5 --workers 2
+    DECISION_SERVICO_URL=http://127.0.0.1:8765 streamlit run app/app.py
+"""
+import argparse
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+import urllib.parse
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.embedding_cache import ArmazemEmbeddings
+from src.embeddings import identificador_modelo
+from src.encoder import CodificadorFeatures
+from src.ranking import impressao_modelo, pontuar_candidatos
+
+URL_SERVICO_PADRAO = os.environ.get('DECISION_SERVICO_URL')
+PORTA_PADRAO = 8765
+
+class ServicoSobrecarregado(Exception):
+    """Fila de requisições cheia (o servidor responde 503)."""
+
+class AgrupadorLotes:
+    """Junta requisições concorrentes em micro-lotes processados por um pool limitado de workers.
+
+    O despachante espera um worker livre e a primeira requisição, coleta o que chegar em até
+    `janela` segundos (ou até somar `max_itens`) e chama `funcao(cargas) -> resultados` uma vez
+    para o lote todo. A janela só é aplicada sob carga (lote anterior com mais de uma
+    requisição): uma requisição isolada não espera. Com os workers ocupados as requisições
+    se acumulam na fila e o lote seguinte sai maior; acima de `max_pendentes` requisições
+    na fila, `enviar` recusa. Se a chamada do lote falha, as requisições são repetidas uma a
+    uma e só as que falham de novo recebem o erro.
+    """
+
+    def __init__(self, funcao, janela=0.005, max_itens=4096, n_workers=2, max_pendentes=1000, nome='lote'):
+        self.funcao = funcao
+        self.janela = janela
+        self.max_itens = max_itens
+        self.lotes = 0
+        self.requisicoes = 0
+        self._sob_carga = False
+        self._lock = threading.Lock()
+        self._fila = queue.Queue(maxsize=max_pendentes)
+        self._workers_livres = threading.Semaphore(n_workers)
+        self._executor = ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix=nome)
+        threading.Thread(target=self._despachar, name=f"{nome}-despachante", daemon=True).start()
+
+    def enviar(self, carga, tamanho=1):
+        """Enfileira uma requisição (`tamanho` = linhas/textos) e devolve o `Future` do resultado."""
+        futuro = Future()
+        try:
+            self._fila.put_nowait((carga, tamanho, futuro))
+        except queue.Full:
+            raise ServicoSobrecarregado(f"{self._fila.maxsize} requisições na fila") from None
+        return futuro
+
+    def _despachar(self):
+        while True:
+            primeiro = self._fila.get()
+            self._workers_livres.acquire()
+            lote, total = [primeiro], primeiro[1]
+            limite = time.monotonic() + (self.janela if self._sob_carga else 0.0)
+            while total < self.max_itens:
+                restante = limite - time.monotonic()
+                try:
+                    item = self._fila.get(timeout=restante) if restante > 0 else self._fila.get_nowait()
+                except queue.Empty:
+                    break
+                lote.append(item)
+                total += item[1]
+            self._sob_carga = len(lote) > 1
+            self._executor.submit(self._processar, lote)
+
+    def _processar(self, lote):
+        try:
+            try:
+                resultados = self.funcao([carga for carga, _, _ in lote])
+            except Exception:
+                if len(lote) == 1:
+                    raise
+                # Uma carga inválida não pode derrubar as outras do lote: repete uma a uma,
+                # e só a requisição com problema recebe o erro
+                for item in lote:
+                    self._processar_individual(item)
+                return
+            for (_, _, futuro), resultado in zip(lote, resultados):
+                futuro.set_result(resultado)
+        except Exception as e:
+            for _, _, futuro in lote:
+                if not futuro.done():
+                    futuro.set_exception(e)
+        finally:
+            with self._lock:
+                self.lotes += 1
+                self.requisicoes += len(lote)
+            self._workers_livres.release()
+
+    def _processar_individual(self, item):
+        carga, _, futuro = item
+        try:
+            futuro.set_result(self.funcao([carga])[0])
+        except Exception as e:
+            futuro.set_exception(e)
+
+def _separar(valores, tamanhos):
+    return np.split(valores, np.cumsum(tamanhos)[:-1])
+
+class ServicoPontuacao:
+    """Modelo, codificador de features e (opcionalmente) modelo de linguagem atrás de micro-lotes."""
+
+    def __init__(self, model, codificador, modelo_linguagem=None, janela=0.005, max_lote=4096, n_workers=2,
+                 n_threads_modelo=None):
+        self.model = model
+        self.codificador = codificador
+        self.modelo_linguagem = modelo_linguagem
+        # Impressão antes de ajustar as threads (o nthread entra na serialização do booster)
+        self.impressao_modelo = impressao_modelo(model, codificador)
+        # Sem sobreinscrição: cada worker usa uma fatia dos núcleos
+        model.get_booster().set_param({'nthread': n_threads_modelo or max(1, (os.cpu_count() or 1) // n_workers)})
+        self._pontuacao = AgrupadorLotes(self._pontuar_lote, janela, max_lote, n_workers, nome='pontuacao')
+        self._codificacao = None
+        if modelo_linguagem is not None:
+            # Sem persistir: o serviço só lê o cache em disco (o CV de um usuário não é gravado)
+            self.armazem = ArmazemEmbeddings(identificador_modelo(modelo_linguagem))
+            self._codificacao = AgrupadorLotes(self._codificar_lote, janela, max_lote, n_workers, nome='codificacao')
+
+    def _pontuar_lote(self, tabelas):
+        scores = pontuar_candidatos(pd.concat(tabelas, ignore_index=True), self.model, self.codificador)
+        return _separar(scores, [len(tabela) for tabela in tabelas])
+
+    def _codificar_lote(self, listas_textos):
+        textos = [texto for lista in listas_textos for texto in lista]
+        vetores = self.armazem.codificar(textos, self.modelo_linguagem, persistir=False)
+        return _separar(vetores, [len(lista) for lista in listas_textos])
+
+    def pontuar(self, df, timeout=None):
+        return self._pontuacao.enviar(df, len(df)).result(timeout)
+
+    def codificar(self, textos, timeout=None):
+        if self._codificacao is None:
+            raise ValueError("Serviço iniciado sem modelo de linguagem.")
+        return self._codificacao.enviar(list(textos), len(textos)).result(timeout)
+
+    def estado(self):
+        estado = {'status': 'ok', 'impressao_modelo': self.impressao_modelo,
+                  'lotes_pontuacao': self._pontuacao.lotes, 'requisicoes_pontuacao': self._pontuacao.requisicoes}
+        if self._codificacao is not None:
+            estado.update(identificador_embeddings=identificador_modelo(self.modelo_linguagem),
+                          lotes_codificacao=self._codificacao.lotes, requisicoes_codificacao=self._codificacao.requisicoes)
+        return estado
+
+class _Manipulador(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Cabeçalhos e corpo saem em dois send(); com Nagle + ACK atrasado cada resposta esperaria ~40 ms
+    disable_nagle_algorithm = True
+
+    def _responder(self, status, dados):
+        corpo = json.dumps(dados).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def do_GET(self):
+        if self.path == '/saude':
+            self._responder(200, self.server.servico.estado())
+        else:
+            self._responder(404, {'erro': f"rota desconhecida: {self.path}"})
+
+    def do_POST(self):
+        servico = self.server.servico
+        try:
+            corpo = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            if self.path == '/pontuar':
+                scores = servico.pontuar(pd.DataFrame(corpo['colunas']))
+                self._responder(200, {'match_score': scores.tolist()})
+            elif self.path == '/codificar':
+                self._responder(200, {'vetores': servico.codificar(corpo['textos']).tolist()})
+            else:
+                self._responder(404, {'erro': f"rota desconhecida: {self.path}"})
+        except ServicoSobrecarregado as e:
+            self._responder(503, {'erro': str(e)})
+        except (KeyError, ValueError) as e:
+            self._responder(400, {'erro': str(e)})
+        except Exception as e:
+            self._responder(500, {'erro': repr(e)})
+
+    def log_message(self, formato, *args):
+        pass
+
+class _Servidor(ThreadingHTTPServer):
+    daemon_threads = True
+    # Fila de conexões do listen(): com o padrão (5), picos de sessões levam "connection reset"
+    request_queue_size = 256
+
+def criar_servidor(servico, host='127.0.0.1', porta=PORTA_PADRAO):
+    """Servidor HTTP (uma thread por conexão) para o `servico`; use `serve_forever()`."""
+    servidor = _Servidor((host, porta), _Manipulador)
+    servidor.servico = servico
+    return servidor
+
+class ClienteServico:
+    """Cliente do serviço com fallback para a pontuação/encoding no próprio processo.
+
+    Cada thread (sessão do Streamlit) mantém uma conexão keep-alive. Depois de uma falha,
+    as chamadas vão direto para o fallback por `espera_retentativa` segundos, sem pagar o
+    timeout a cada rerun. Um serviço com outro modelo (impressão diferente) nunca é usado
+    para pontuar.
+    """
+
+    def __init__(self, url=URL_SERVICO_PADRAO, timeout=5.0, espera_retentativa=30.0):
+        endereco = urllib.parse.urlsplit(url)
+        self.url = url.rstrip('/')
+        self.host, self.porta = endereco.hostname, endereco.port or 80
+        self.timeout = timeout
+        self.espera_retentativa = espera_retentativa
+        self._indisponivel_ate = 0.0
+        self._compatibilidade = {}
+        self._local = threading.local()
+
+    def _conexao(self):
+        if getattr(self._local, 'conexao', None) is None:
+            self._local.conexao = http.client.HTTPConnection(self.host, self.porta, timeout=self.timeout)
+        return self._local.conexao
+
+    def _requisitar(self, rota, dados=None):
+        corpo = None if dados is None else json.dumps(dados).encode('utf-8')
+        metodo = 'GET' if corpo is None else 'POST'
+        for tentativa in range(2):
+            conexao = self._conexao()
+            try:
+                conexao.request(metodo, rota, body=corpo, headers={'Content-Type': 'application/json'})
+                resposta = conexao.getresponse()
+                conteudo = resposta.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # Conexão keep-alive fechada pelo servidor (ex.: reinício): reabre uma vez
+                conexao.close()
+                self._local.conexao = None
+                if tentativa:
+                    raise
+            except OSError:
+                conexao.close()
+                self._local.conexao = None
+                raise
+        if resposta.status != 200:
+            raise ValueError(f"HTTP {resposta.status} em {rota}: {conteudo[:200]!r}")
+        return json.loads(conteudo)
+
+    def _falhou(self, erro):
+        print(f"AVISO: serviço de pontuação indisponível ({erro}); usando o processo local por {self.espera_retentativa:.0f}s.")
+        self._indisponivel_ate = time.monotonic() + self.espera_retentativa
+
+    def disponivel(self):
+        return time.monotonic() >= self._indisponivel_ate
+
+    def _compativel(self, model, codificador):
+        if id(model) not in self._compatibilidade:
+            remota = self._requisitar('/saude').get('impressao_modelo')
+            self._compatibilidade[id(model)] = remota == impressao_modelo(model, codificador)
+            if not self._compatibilidade[id(model)]:
+                print("AVISO: o serviço de pontuação usa outro modelo; pontuando no processo local.")
+        return self._compatibilidade[id(model)]
+
+    def pontuar(self, df, model, codificador):
+        """Mesma assinatura de `pontuar_candidatos` (pode ser passado como `pontuador`)."""
+        if self.disponivel() and len(df):
+            try:
+                if self._compativel(model, codificador):
+                    # Só as colunas que o codificador lê; `tolist` por coluna é ~20x mais rápido que `to_dict`
+                    colunas = {col: df[col].tolist() for col in codificador.colunas_entrada if col in df.columns}
+                    resposta = self._requisitar('/pontuar', {'colunas': colunas})
+                    return np.asarray(resposta['match_score'], dtype=np.float32)
+            except (OSError, http.client.HTTPException, ValueError, KeyError) as e:
+                self._falhou(e)
+        return pontuar_candidatos(df, model, codificador)
+
+    def codificar(self, textos, fallback):
+        """Embeddings dos `textos` pelo serviço; `fallback()` calcula no processo local."""
+        if self.disponivel():
+            try:
+                return np.asarray(self._requisitar('/codificar', {'textos': list(textos)})['vetores'], dtype=np.float32)
+            except (OSError, http.client.HTTPException, ValueError, KeyError) as e:
+                self._falhou(e)
+        return fallback()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modelo', default='models/recruitment_model.joblib')
+    parser.add_argument('--colunas', default='models/model_columns.joblib')
+    parser.add_argument('--codificador', default='models/feature_encoder.joblib',
+                        help="Usado se existir; senão o codificador é reconstruído a partir de --colunas.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument('--janela-ms', type=float, default=5, help="Espera máxima para formar um micro-lote.")
+    parser.add_argument('--max-lote', type=int, default=4096, help="Linhas (ou textos) por micro-lote.")
+    parser.add_argument('--workers', type=int, default=2, help="Lotes processados em paralelo.")
+    parser.add_argument('--threads-modelo', type=int, default=None, help="Threads do XGBoost por lote.")
+    parser.add_argument('--sem-embeddings', action='store_true', help="Não carrega o modelo de linguagem.")
+    args = parser.parse_args()
+
+    model = joblib.load(args.modelo)
+    if os.path.exists(args.codificador):
+        codificador = CodificadorFeatures.carregar(args.codificador)
+    else:
+        codificador = CodificadorFeatures.de_colunas_modelo(joblib.load(args.colunas))
+    modelo_linguagem = None
+    if not args.sem_embeddings:
+        from src.embeddings import CodificadorTexto
+        modelo_linguagem = CodificadorTexto()
+
+    servico = ServicoPontuacao(model, codificador, modelo_linguagem, janela=args.janela_ms / 1000,
+                               max_lote=args.max_lote, n_workers=args.workers, n_threads_modelo=args.threads_modelo)
+    servidor = criar_servidor(servico, args.host, args.porta)
+    print(f"-> Serviço de pontuação em http://{args.host}:{servidor.server_address[1]} "
+          f"(janela {args.janela_ms:g} ms, {args.workers} workers)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        servidor.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -1,229 +1,477 @@
-# CÓDIGO FINAL OTIMIZADO para app.py
-import streamlit as st
-import pandas as pd
+# src/train.py
+"""Pipeline de treino: dados brutos -> df_mestre -> features -> codificação -> XGBoost -> artefatos.
+
+Cada etapa grava suas saídas em `<cache>/<etapa>/<impressão>/`, onde a impressão combina
+os parâmetros da etapa, a versão do código que ela usa e as impressões das etapas de que
+depende (e, para os JSON brutos, a versão do objeto no bucket). Uma etapa cuja impressão
+já está no cache não roda de novo: mudar só os hiperparâmetros do XGBoost retreina em
+segundos, sem refazer embeddings e regex. Etapas independentes rodam em paralelo, em
+processos separados, e o tempo de cada uma é reportado no fim.
+
+Uso:
+    python -m src.train --dados gs://<bucket>
+    python -m src.train --dados gs://<bucket> --param max_depth=8 --param n_estimators=400
+    python -m src.train --dados gs://<bucket> --enviar gs://<bucket>
+    python -m src.train --dados gs://<bucket> --instrumentar --perfil data/perfil
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import fsspec
 import joblib
-from google.oauth2 import service_account
-import gcsfs
-import re
-
-# --- Configuração da Página ---
-st.set_page_config(
-    page_title="Decision AI - Otimizador de Recrutamento",
-    page_icon="🤖",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# --- Funções de Carregamento (Cacheado) ---
-
-@st.cache_resource
-def load_language_model():
-    """Carrega o modelo de SentenceTransformer sob demanda para economizar memória."""
-    from sentence_transformers import SentenceTransformer
-    with st.spinner("Carregando modelo de linguagem para análise de CV... (pode levar um minuto)"):
-        model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
-    return model
-
-@st.cache_resource
-def load_artifacts_from_gcs(bucket_name):
-    """Carrega os artefatos principais (modelo XGBoost, colunas, dataset)."""
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from src.app_dataset import DIRETORIO_DATASET_APP, colunas_dataset_app
+from src.artifacts import ARTEFATOS_APP, ler_parquet_projetado, versao_objeto
+from src.encoder import COLUNAS_CATEGORICAS, CodificadorFeatures
+from src.feature_engineering import STATUS_SUCESSO
+from src.instrumentation import Registro, ativar, esta_ativa, medir, novo_registro, perfil
+
+DIRETORIO_CACHE_PIPELINE_PADRAO = os.environ.get('DECISION_CACHE_PIPELINE', 'data/cache_pipeline')
+RAIZ_REPOSITORIO = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PARAMETROS_XGBOOST_PADRAO = {'objective': 'binary:logistic', 'eval_metric': 'logloss', 'random_state': 42}
+COLUNAS_TEXTO_VAGA = ['principais_atividades', 'competencia_tecnicas_e_comportamentais']
+
+class Etapa:
+    """Uma etapa do pipeline: `funcao(entradas, saida, parametros)` grava arquivos em `saida`.
+
+    `entradas` mapeia o nome de cada dependência para o diretório com as saídas dela.
+    `modulos` são os arquivos de código (relativos à raiz) cuja mudança invalida o cache.
+    Etapas com `cache=False` (ex.: exportação) rodam sempre.
+    """
+
+    def __init__(self, nome, funcao, dependencias=(), parametros=None, modulos=(), cache=True):
+        self.nome = nome
+        self.funcao = funcao
+        self.dependencias = list(dependencias)
+        self.parametros = parametros or {}
+        self.modulos = list(modulos)
+        self.cache = cache
+
+    def versao_codigo(self):
+        conteudo = inspect.getsource(self.funcao)
+        for modulo in self.modulos:
+            with open(os.path.join(RAIZ_REPOSITORIO, modulo), encoding='utf-8') as f:
+                conteudo += f.read()
+        return hashlib.blake2b(conteudo.encode('utf-8'), digest_size=16).hexdigest()
+
+def ordenar_etapas(etapas):
+    """Ordem topológica (dependências antes); erro para ciclos ou dependências ausentes."""
+    por_nome = {etapa.nome: etapa for etapa in etapas}
+    ordem, visitando, visitadas = [], set(), set()
+
+    def visitar(nome):
+        if nome in visitadas:
+            return
+        if nome in visitando:
+            raise ValueError(f"Ciclo no pipeline envolvendo a etapa '{nome}'.")
+        if nome not in por_nome:
+            raise ValueError(f"Dependência desconhecida: '{nome}'.")
+        visitando.add(nome)
+        for dependencia in por_nome[nome].dependencias:
+            visitar(dependencia)
+        visitando.discard(nome)
+        visitadas.add(nome)
+        ordem.append(por_nome[nome])
+
+    for etapa in etapas:
+        visitar(etapa.nome)
+    return ordem
+
+def com_dependentes(etapas, nomes):
+    """`nomes` mais todas as etapas que dependem delas, direta ou indiretamente."""
+    selecionadas = set(nomes)
+    for etapa in ordenar_etapas(etapas):
+        if selecionadas & set(etapa.dependencias):
+            selecionadas.add(etapa.nome)
+    return selecionadas
+
+def calcular_impressoes(etapas):
+    """Impressão de cada etapa: parâmetros + versão do código + impressões das dependências."""
+    impressoes = {}
+    for etapa in ordenar_etapas(etapas):
+        conteudo = json.dumps({
+            'etapa': etapa.nome,
+            'parametros': etapa.parametros,
+            'codigo': etapa.versao_codigo(),
+            'dependencias': {dependencia: impressoes[dependencia] for dependencia in etapa.dependencias},
+        }, sort_keys=True, default=str)
+        impressoes[etapa.nome] = hashlib.blake2b(conteudo.encode('utf-8'), digest_size=16).hexdigest()
+    return impressoes
+
+def _rodar_etapa(nome, funcao, entradas, destino, parametros, caminho_perfil=None):
+    """Roda uma etapa em um diretório temporário e o renomeia no fim (nunca deixa saída parcial).
+
+    Com a instrumentação ligada, as medições da etapa (e das funções instrumentadas que ela
+    chama) vão em `metadados['medicoes']`; com `caminho_perfil`, grava um dump do cProfile.
+    """
+    temporario = f"{destino}.tmp-{uuid.uuid4().hex[:8]}"
+    os.makedirs(temporario)
+    registro = novo_registro()
+    inicio_cpu, inicio = time.process_time(), time.perf_counter()
+    try:
+        with perfil(caminho_perfil), medir(nome):
+            funcao(entradas, temporario, parametros)
+    except BaseException:
+        shutil.rmtree(temporario, ignore_errors=True)
+        raise
+    metadados = {'duracao': time.perf_counter() - inicio, 'cpu': time.process_time() - inicio_cpu}
+    if esta_ativa():
+        metadados['medicoes'] = registro.medicoes
+    with open(os.path.join(temporario, 'etapa.json'), 'w', encoding='utf-8') as f:
+        json.dump(metadados, f)
+    if os.path.exists(destino):
+        shutil.rmtree(destino)
+    os.replace(temporario, destino)
+    return metadados
+
+def executar_pipeline(etapas, diretorio_cache=DIRETORIO_CACHE_PIPELINE_PADRAO, n_paralelo=2, forcar=(), diretorio_perfil=None):
+    """Executa as etapas (do cache quando possível) e devolve `(diretórios de saída, relatório)`.
+
+    As etapas em `forcar` e todas as que dependem delas rodam mesmo com cache. Com a
+    instrumentação ligada, o relatório de cada etapa executada traz as medições dela
+    (ver src/instrumentation.py); com `diretorio_perfil`, cada etapa grava `<etapa>.prof`.
+    """
+    impressoes = calcular_impressoes(etapas)
+    desconhecidas = set(forcar) - set(impressoes)
+    if desconhecidas:
+        raise ValueError(f"Etapas desconhecidas em forcar: {sorted(desconhecidas)}")
+    forcar = com_dependentes(etapas, forcar)
+    os.makedirs(diretorio_cache, exist_ok=True)
+    destinos = {nome: os.path.join(diretorio_cache, nome, impressao) for nome, impressao in impressoes.items()}
+    relatorio = {}
+    concluidas, pendentes, em_execucao = set(), list(ordenar_etapas(etapas)), {}
+    inicio_pipeline = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=n_paralelo) as executor:
+        while pendentes or em_execucao:
+            for etapa in [etapa for etapa in pendentes if set(etapa.dependencias) <= concluidas]:
+                pendentes.remove(etapa)
+                destino = destinos[etapa.nome]
+                if etapa.cache and etapa.nome not in forcar and os.path.exists(os.path.join(destino, 'etapa.json')):
+                    agora = time.perf_counter() - inicio_pipeline
+                    relatorio[etapa.nome] = {'status': 'cache', 'duracao': 0.0, 'inicio': agora, 'fim': agora,
+                                             'impressao': impressoes[etapa.nome]}
+                    concluidas.add(etapa.nome)
+                    continue
+                os.makedirs(os.path.dirname(destino), exist_ok=True)
+                print(f"-> Etapa '{etapa.nome}' iniciada")
+                entradas = {dependencia: destinos[dependencia] for dependencia in etapa.dependencias}
+                caminho_perfil = os.path.join(diretorio_perfil, f"{etapa.nome}.prof") if diretorio_perfil else None
+                futuro = executor.submit(_rodar_etapa, etapa.nome, etapa.funcao, entradas, destino, etapa.parametros, caminho_perfil)
+                em_execucao[futuro] = (etapa.nome, time.perf_counter() - inicio_pipeline)
+            if not em_execucao:
+                # Só etapas do cache nesta rodada: libera as dependentes delas
+                continue
+
+            prontas, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+            for futuro in prontas:
+                nome, inicio = em_execucao.pop(futuro)
+                try:
+                    metadados = futuro.result()
+                except Exception:
+                    print(f"ERRO na etapa '{nome}'; as etapas em andamento serão concluídas e o pipeline interrompido.")
+                    for outro in em_execucao:
+                        outro.cancel()
+                    raise
+                fim = time.perf_counter() - inicio_pipeline
+                relatorio[nome] = {'status': 'executada', 'duracao': metadados['duracao'], 'cpu': metadados['cpu'],
+                                   'inicio': inicio, 'fim': fim, 'impressao': impressoes[nome]}
+                if 'medicoes' in metadados:
+                    relatorio[nome]['medicoes'] = metadados['medicoes']
+                concluidas.add(nome)
+                print(f"-> Etapa '{nome}' concluída em {metadados['duracao']:.1f}s")
+
+    relatorio = {nome: relatorio[nome] for nome in [etapa.nome for etapa in ordenar_etapas(etapas)]}
+    with open(os.path.join(diretorio_cache, 'ultimo_relatorio.json'), 'w', encoding='utf-8') as f:
+        json.dump({'total': time.perf_counter() - inicio_pipeline, 'etapas': relatorio}, f, indent=2)
+    return destinos, relatorio
+
+def imprimir_relatorio(relatorio, total):
+    print(f"\n{'etapa':<20} | {'status':<9} | {'duração (s)':>11} | {'CPU (s)':>8} | {'início (s)':>10} | {'fim (s)':>8}")
+    print("-" * 82)
+    for nome, linha in relatorio.items():
+        cpu = f"{linha['cpu']:.1f}" if 'cpu' in linha else '-'
+        print(f"{nome:<20} | {linha['status']:<9} | {linha['duracao']:>11.1f} | {cpu:>8} | {linha['inicio']:>10.1f} | {linha['fim']:>8.1f}")
+    soma = sum(linha['duracao'] for linha in relatorio.values())
+    print(f"\nTempo total: {total:.1f}s (soma das etapas: {soma:.1f}s; "
+          f"{sum(linha['status'] == 'cache' for linha in relatorio.values())} etapa(s) do cache)")
+
+# --- Etapas -------------------------------------------------------------------------------
+
+def etapa_converter(entradas, saida, parametros):
+    """JSON bruto -> Parquet aplanado, em streaming."""
+    from src.preprocessing import achatar_applicant, achatar_prospects, achatar_vaga, converter_json_para_parquet
+    achatar = {'applicants': achatar_applicant, 'vagas': achatar_vaga, 'prospects': achatar_prospects}[parametros['nome']]
+    linhas = converter_json_para_parquet(parametros['origem'], os.path.join(saida, 'dados.parquet'), achatar,
+                                         tamanho_lote=parametros['tamanho_lote'])
+    print(f"-> {parametros['nome']}: {linhas} linhas aplanadas")
+
+def etapa_unir(entradas, saida, parametros):
+    """applicants + prospects + vagas -> df_mestre, com a variável alvo 'contratado'."""
+    from src.preprocessing import unir_dados
+    df_mestre = unir_dados(*(pd.read_parquet(os.path.join(entradas[nome], 'dados.parquet'))
+                             for nome in ('converter_applicants', 'converter_prospects', 'converter_vagas')))
+    df_mestre['contratado'] = df_mestre['situacao_candidado'].isin(STATUS_SUCESSO).astype(np.int8)
+    df_mestre.to_parquet(os.path.join(saida, 'df_mestre.parquet'), index=False)
+    print(f"-> df_mestre: {df_mestre.shape}, {df_mestre['contratado'].mean():.2%} contratados")
+
+def _ler_df_mestre(entradas, colunas):
+    return ler_parquet_projetado(os.path.join(entradas['unir'], 'df_mestre.parquet'), colunas)
+
+def etapa_similaridade(entradas, saida, parametros):
+    """Similitude semântica CV x vaga (a etapa mais cara: embeddings)."""
+    from src.embedding_cache import ArmazemEmbeddings
+    from src.embeddings import CodificadorTexto
+    from src.feature_engineering import criar_feature_similaridade
+    df = _ler_df_mestre(entradas, ['cv_pt'] + COLUNAS_TEXTO_VAGA)
+    modelo_linguagem = CodificadorTexto(parametros['modelo'], modo=parametros['modo'], janelas=parametros['janelas'])
+    armazem = ArmazemEmbeddings(modelo_linguagem.identificador, diretorio=parametros['diretorio_embeddings'])
+    similaridade = criar_feature_similaridade(df, modelo_linguagem, armazem=armazem)
+    pd.DataFrame({'similitude_cv_vaga': similaridade}).to_parquet(os.path.join(saida, 'features.parquet'), index=False)
+
+def etapa_experiencia(entradas, saida, parametros):
+    """Anos de experiência extraídos do CV (regex, em um pool de processos)."""
+    from src.feature_engineering import calcular_experiencia_lote
+    cvs = _ler_df_mestre(entradas, ['cv_pt'])['cv_pt'].tolist()
+    anos = calcular_experiencia_lote(cvs, n_processos=parametros['processos'])
+    pd.DataFrame({'anos_experiencia': anos}).to_parquet(os.path.join(saida, 'features.parquet'), index=False)
+
+def etapa_skills(entradas, saida, parametros):
+    """Contagem de cada skill no CV."""
+    from src.feature_engineering import ExtratorSkills, adicionar_features_skills
+    extrator = ExtratorSkills(parametros['skills'])
+    df = adicionar_features_skills(_ler_df_mestre(entradas, ['cv_pt']), extrator)
+    df[extrator.colunas].to_parquet(os.path.join(saida, 'features.parquet'), index=False)
+
+def etapa_dataset(entradas, saida, parametros):
+    """df_mestre + features: o df_mestre_preprocessado.parquet usado pelo app e pelo ranking."""
+    tabela = pq.read_table(os.path.join(entradas['unir'], 'df_mestre.parquet'))
+    for nome in ('similaridade', 'experiencia', 'skills'):
+        if nome in entradas:
+            features = pq.read_table(os.path.join(entradas[nome], 'features.parquet'))
+            for coluna in features.column_names:
+                if coluna in tabela.column_names:
+                    tabela = tabela.drop([coluna])
+                tabela = tabela.append_column(coluna, features[coluna])
+    pq.write_table(tabela, os.path.join(saida, 'df_mestre_preprocessado.parquet'))
+    print(f"-> Dataset com features: {tabela.num_rows} linhas x {tabela.num_columns} colunas")
+
+def etapa_dividir(entradas, saida, parametros):
+    """Divisão treino/teste estratificada pela variável alvo (notebook, célula 10)."""
+    from sklearn.model_selection import train_test_split
+    y = _ler_df_mestre(entradas, ['contratado'])['contratado'].to_numpy()
+    treino, teste = train_test_split(np.arange(len(y)), test_size=parametros['test_size'],
+                                     random_state=parametros['seed'], stratify=y)
+    np.savez(os.path.join(saida, 'divisao.npz'), treino=np.sort(treino), teste=np.sort(teste))
+
+def etapa_codificar(entradas, saida, parametros):
+    """Ajusta o codificador de features e grava a matriz X (float32) e o alvo y."""
+    caminho = os.path.join(entradas['dataset'], 'df_mestre_preprocessado.parquet')
+    nomes = pq.read_schema(caminho).names
+    numericas = ['similitude_cv_vaga', 'anos_experiencia'] + [col for col in nomes if col.startswith('skill_')] + ['remuneracao']
+    df = ler_parquet_projetado(caminho, numericas + COLUNAS_CATEGORICAS + ['contratado'])
+    codificador = CodificadorFeatures().fit(df)
+    np.save(os.path.join(saida, 'X.npy'), codificador.transform(df))
+    np.save(os.path.join(saida, 'y.npy'), df['contratado'].to_numpy(dtype=np.int8))
+    codificador.salvar(os.path.join(saida, 'feature_encoder.joblib'))
+    print(f"-> {len(codificador)} features")
+
+def _carregar_treino(entradas):
+    X = np.load(os.path.join(entradas['codificar'], 'X.npy'), mmap_mode='r')
+    y = np.load(os.path.join(entradas['codificar'], 'y.npy'))
+    divisao = np.load(os.path.join(entradas['dividir'], 'divisao.npz'))
+    codificador = CodificadorFeatures.carregar(os.path.join(entradas['codificar'], 'feature_encoder.joblib'))
+    return X, y, divisao['treino'], divisao['teste'], codificador
+
+def etapa_treinar(entradas, saida, parametros):
+    """XGBoost com scale_pos_weight = negativos / positivos do treino (notebook, célula 11)."""
+    from xgboost import XGBClassifier
+    X, y, treino, _, codificador = _carregar_treino(entradas)
+    y_treino = y[treino]
+    parametros_xgb = dict(parametros['xgboost'])
+    parametros_xgb.setdefault('scale_pos_weight', float((y_treino == 0).sum() / max((y_treino == 1).sum(), 1)))
+    print(f"-> Treinando XGBoost com {len(treino)} linhas: {parametros_xgb}")
+    model = XGBClassifier(**parametros_xgb)
+    model.fit(pd.DataFrame(X[treino], columns=codificador.colunas), y_treino)
+    joblib.dump(model, os.path.join(saida, 'recruitment_model.joblib'))
+
+def etapa_avaliar(entradas, saida, parametros):
+    """Relatório de classificação e matriz de confusão no conjunto de teste."""
+    from sklearn.metrics import classification_report, confusion_matrix
+    X, y, _, teste, _ = _carregar_treino(entradas)
+    model = joblib.load(os.path.join(entradas['treinar'], 'recruitment_model.joblib'))
+    y_pred = model.predict(np.asarray(X[teste]))
+    nomes = ['Não Contratado (0)', 'Contratado (1)']
+    print(classification_report(y[teste], y_pred, target_names=nomes, zero_division=0))
+    metricas = classification_report(y[teste], y_pred, target_names=nomes, output_dict=True, zero_division=0)
+    metricas['matriz_confusao'] = confusion_matrix(y[teste], y_pred).tolist()
+    with open(os.path.join(saida, 'metricas.json'), 'w', encoding='utf-8') as f:
+        json.dump(metricas, f, ensure_ascii=False, indent=2)
+
+def etapa_indice_ranking(entradas, saida, parametros):
+    """Índice de ranking pré-calculado para o app (ver src/ranking.py)."""
+    from src.ranking import construir_indice_ranking
+    model = joblib.load(os.path.join(entradas['treinar'], 'recruitment_model.joblib'))
+    codificador = CodificadorFeatures.carregar(os.path.join(entradas['codificar'], 'feature_encoder.joblib'))
+    caminho = os.path.join(entradas['dataset'], 'df_mestre_preprocessado.parquet')
+    df = ler_parquet_projetado(caminho, colunas_dataset_app(codificador))
+    construir_indice_ranking(df, model, codificador, os.path.join(saida, 'ranking_index.arrow'), percentual_top=parametros['percentual_top'],
+                             top_k_explicacoes=parametros['top_k_explicacoes'])
+
+def etapa_dataset_app(entradas, saida, parametros):
+    """Dataset compacto do app: candidaturas, textos das vagas e CVs (ver src/app_dataset.py)."""
+    from src.app_dataset import COLUNAS_CV, salvar_dataset_app
+    codificador = CodificadorFeatures.carregar(os.path.join(entradas['codificar'], 'feature_encoder.joblib'))
+    caminho = os.path.join(entradas['dataset'], 'df_mestre_preprocessado.parquet')
+    df = ler_parquet_projetado(caminho, colunas_dataset_app(codificador) + COLUNAS_CV)
+    salvar_dataset_app(df, codificador, os.path.join(saida, 'app_dataset'))
+
+def etapa_exportar(entradas, saida, parametros):
+    """Copia os artefatos para `models/` e `data/` (e, com `enviar`, para o bucket)."""
+    codificador = CodificadorFeatures.carregar(os.path.join(entradas['codificar'], 'feature_encoder.joblib'))
+    artefatos = {
+        'modelo': os.path.join(entradas['treinar'], 'recruitment_model.joblib'),
+        'codificador': os.path.join(entradas['codificar'], 'feature_encoder.joblib'),
+        'dataset': os.path.join(entradas['dataset'], 'df_mestre_preprocessado.parquet'),
+    }
+    if 'indice_ranking' in entradas:
+        artefatos['indice_ranking'] = os.path.join(entradas['indice_ranking'], 'ranking_index.arrow')
+    # model_columns.joblib continua sendo gravado para versões antigas do app
+    colunas = os.path.join(saida, 'model_columns.joblib')
+    joblib.dump(pd.Index(codificador.colunas), colunas)
+    artefatos['colunas'] = colunas
+    arquivos = {ARTEFATOS_APP[nome]: origem for nome, origem in artefatos.items()}
+    if 'dataset_app' in entradas:
+        diretorio = os.path.join(entradas['dataset_app'], 'app_dataset')
+        for arquivo in sorted(os.listdir(diretorio)):
+            arquivos[f"{DIRETORIO_DATASET_APP}/{arquivo}"] = os.path.join(diretorio, arquivo)
+
+    for relativo, origem in arquivos.items():
+        destino = os.path.join(parametros['raiz_saida'], relativo)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        shutil.copyfile(origem, destino + '.tmp')
+        os.replace(destino + '.tmp', destino)
+        print(f"-> {destino}")
+        if parametros.get('enviar'):
+            remoto = f"{parametros['enviar'].rstrip('/')}/{relativo}"
+            fs, caminho_remoto = fsspec.core.url_to_fs(remoto)
+            fs.put_file(origem, caminho_remoto)
+            print(f"-> enviado para {remoto}")
+
+# --- Montagem -----------------------------------------------------------------------------
+
+def _versao_origem(caminho):
+    """Versão do JSON bruto (generation/ETag no bucket, tamanho + data no disco)."""
+    fs, caminho_fs = fsspec.core.url_to_fs(caminho)
+    return versao_objeto(fs.info(caminho_fs))
+
+def montar_etapas(dados, parametros_xgboost=None, test_size=0.2, seed=42, com_similaridade=True, com_indice=True,
+                  modo_embeddings=None, janelas_embeddings=None, processos_experiencia=None, tamanho_lote=5000,
+                  raiz_saida='.', enviar=None, diretorio_embeddings=None, percentual_top=None):
+    """Monta o DAG do pipeline de treino; `dados` é 'gs://<bucket>' ou um diretório com `data/*.json`."""
+    from src.embedding_cache import DIRETORIO_CACHE_PADRAO
+    from src.embeddings import JANELAS_PADRAO, MODO_EMBEDDINGS_PADRAO, NOME_MODELO_LINGUAGEM
+    from src.explanations import TOP_K_PADRAO
+    from src.feature_engineering import SKILLS_PADRAO
+    from src.recommendations import PERCENTUAL_TOP_PADRAO
+
+    etapas = []
+    for nome in ('applicants', 'vagas', 'prospects'):
+        origem = f"{dados.rstrip('/')}/data/{nome}.json"
+        etapas.append(Etapa(f"converter_{nome}", etapa_converter,
+                            parametros={'nome': nome, 'origem': origem, 'versao_origem': _versao_origem(origem), 'tamanho_lote': tamanho_lote},
+                            modulos=['src/preprocessing.py']))
+    etapas.append(Etapa('unir', etapa_unir, ['converter_applicants', 'converter_prospects', 'converter_vagas'],
+                        parametros={'status_sucesso': STATUS_SUCESSO}, modulos=['src/preprocessing.py']))
+
+    features = ['experiencia', 'skills']
+    if com_similaridade:
+        features.insert(0, 'similaridade')
+        etapas.append(Etapa('similaridade', etapa_similaridade, ['unir'], modulos=['src/feature_engineering.py', 'src/embeddings.py',
+                                                                                  'src/embedding_cache.py'],
+                            parametros={'modelo': NOME_MODELO_LINGUAGEM,
+                                        'modo': modo_embeddings or MODO_EMBEDDINGS_PADRAO,
+                                        'janelas': JANELAS_PADRAO if janelas_embeddings is None else janelas_embeddings,
+                                        'diretorio_embeddings': diretorio_embeddings or DIRETORIO_CACHE_PADRAO}))
+    etapas.append(Etapa('experiencia', etapa_experiencia, ['unir'], parametros={'processos': processos_experiencia},
+                        modulos=['src/feature_engineering.py']))
+    etapas.append(Etapa('skills', etapa_skills, ['unir'], parametros={'skills': SKILLS_PADRAO},
+                        modulos=['src/feature_engineering.py']))
+    etapas.append(Etapa('dataset', etapa_dataset, ['unir'] + features))
+    etapas.append(Etapa('dividir', etapa_dividir, ['unir'], parametros={'test_size': test_size, 'seed': seed}))
+    etapas.append(Etapa('codificar', etapa_codificar, ['dataset'], modulos=['src/encoder.py']))
+    etapas.append(Etapa('treinar', etapa_treinar, ['codificar', 'dividir'],
+                        parametros={'xgboost': {**PARAMETROS_XGBOOST_PADRAO, **(parametros_xgboost or {})}}))
+    etapas.append(Etapa('avaliar', etapa_avaliar, ['codificar', 'dividir', 'treinar']))
+    etapas.append(Etapa('dataset_app', etapa_dataset_app, ['codificar', 'dataset'], modulos=['src/app_dataset.py']))
+    exportar = ['codificar', 'treinar', 'dataset', 'avaliar', 'dataset_app']
+    if com_indice:
+        etapas.append(Etapa('indice_ranking', etapa_indice_ranking, ['codificar', 'treinar', 'dataset'],
+                            parametros={'percentual_top': percentual_top or PERCENTUAL_TOP_PADRAO, 'top_k_explicacoes': TOP_K_PADRAO},
+                            modulos=['src/ranking.py', 'src/recommendations.py', 'src/explanations.py']))
+        exportar.append('indice_ranking')
+    etapas.append(Etapa('exportar', etapa_exportar, exportar, parametros={'raiz_saida': raiz_saida, 'enviar': enviar}, cache=False))
+    return etapas
+
+def _valor_parametro(texto):
     try:
-        with st.spinner("🔐 Autenticando com Google Cloud..."):
-            creds_info = st.secrets["gcs_credentials"]
-            scopes = [
-                'https://www.googleapis.com/auth/cloud-platform',
-                'https://www.googleapis.com/auth/devstorage.read_only',
-            ]
-            creds = service_account.Credentials.from_service_account_info(creds_info, scopes=scopes)
-            gcs = gcsfs.GCSFileSystem(project=creds_info['project_id'], token=creds)
-        
-        caminho_modelo_gcs = f"gs://{bucket_name}/models/recruitment_model.joblib"
-        caminho_colunas_gcs = f"gs://{bucket_name}/models/model_columns.joblib"
-        caminho_dataset_gcs = f"gs://{bucket_name}/data/df_mestre_preprocessado.parquet"
-
-        with st.spinner("📦 Carregando modelo de ranking e dataset do GCS..."):
-            with gcs.open(caminho_modelo_gcs, 'rb') as f:
-                model = joblib.load(f)
-            with gcs.open(caminho_colunas_gcs, 'rb') as f:
-                model_columns = joblib.load(f)
-            df_app = pd.read_parquet(caminho_dataset_gcs, filesystem=gcs)
-        
-        return model, model_columns, df_app
-    except Exception as e:
-        st.error(f"❌ Erro fatal ao carregar artefatos do GCS: {e}")
-        return None, None, None
-
-def gerar_recomendacoes_vaga(df_ranked, top_n_percent=0.20):
-    """Analisa os melhores candidatos e sugere palavras-chave para a vaga."""
-    if df_ranked.empty:
-        return [], []
-    top_candidates = df_ranked.head(max(1, int(len(df_ranked) * top_n_percent)))
-    skill_columns = [col for col in top_candidates.columns if col.startswith('skill_')]
-    skill_counts = top_candidates[skill_columns].sum()
-    frequent_skills = skill_counts[skill_counts > 0].sort_values(ascending=False)
-    if frequent_skills.empty:
-        return [], []
-    vaga_text = (str(df_ranked['principais_atividades'].iloc[0]) + " " + str(df_ranked['competencia_tecnicas_e_comportamentais'].iloc[0])).lower()
-    recomendacoes = []
-    common_skills_list = frequent_skills.index.str.replace('skill_', '').str.replace('_', ' ').tolist()
-    for skill_name in common_skills_list:
-        if not re.search(r'\b' + re.escape(skill_name) + r'\b', vaga_text, re.IGNORECASE):
-            recomendacoes.append(skill_name.title())
-    return common_skills_list, recomendacoes
-
-# --- Interface Principal ---
-st.image("https://pos.fiap.com.br/wp-content/uploads/2022/07/pos-tech-fiap.svg", width=250)
-st.title("🤖 Decision AI: Otimizador de Recrutamento")
-
-BUCKET = "datathon-decision-ai-bolanos" 
-model, model_columns, df_app = load_artifacts_from_gcs(BUCKET)
-
-with st.expander("ℹ️ Sobre o Projeto e Modelo", expanded=True):
-    st.header("Datathon")
-    st.write("**Integrantes:**")
-    st.info("""
-    - Rosicléia Cavalcante Mota
-    - Guillermo J. Camahuali Privat
-    - Kelly Priscilla Matos Campos
-    """)
-    st.markdown("---")
-    st.header("Sobre o Modelo")
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Algoritmo", "XGBoost")
-    with col2:
-        st.metric("Exatidão (Accuracy)", "82%")
-    with col3:
-        st.metric("Recall (Contratados)", "51%")
-    st.caption("Apoiado por Streamlit e Google Cloud.")
-
-if model is None or df_app is None:
-    st.error("A aplicação não pôde ser iniciada. Verifique os erros de carregamento acima.")
-    st.stop()
-
-# Filtro movido para a página principal
-if 'titulo_vaga' in df_app.columns:
-    st.markdown("---")
-    lista_vagas = sorted(df_app['titulo_vaga'].astype(str).unique())
-    vaga_selecionada = st.selectbox("**Selecione uma Vaga para Análise:**", options=lista_vagas, index=0)
-
-    if vaga_selecionada:
-        df_filtrado_vaga = df_app[df_app['titulo_vaga'] == vaga_selecionada].copy()
-        
-        tab_ranking, tab_otimiza_vaga, tab_otimiza_cv = st.tabs([
-            "🏆 Ranking de Candidatos", 
-            "✨ Otimizar Vaga com IA",
-            "📄 Otimizar meu CV"
-        ])
-
-        with tab_ranking:
-            st.header(f"Ranking para: {vaga_selecionada}")
-            
-            colunas_categoricas = ['nivel profissional', 'nivel_academico', 'nivel_ingles', 'nivel_espanhol', 'vaga_sap', 'tipo_contratacao']
-            colunas_categoricas_existentes = [col for col in colunas_categoricas if col in df_filtrado_vaga.columns]
-            df_pred_processed = pd.get_dummies(df_filtrado_vaga, columns=colunas_categoricas_existentes, prefix=colunas_categoricas_existentes)
-            for col in model_columns:
-                if col in df_pred_processed.columns and df_pred_processed[col].dtype == 'object':
-                    df_pred_processed[col] = pd.to_numeric(df_pred_processed[col], errors='coerce').fillna(0)
-            X_pred = df_pred_processed.reindex(columns=model_columns, fill_value=0)
-
-            pred_probs = model.predict_proba(X_pred)[:, 1]
-            df_resultados = df_filtrado_vaga.copy()
-            df_resultados['match_score'] = (pred_probs * 100)
-            df_resultados = df_resultados.sort_values(by='match_score', ascending=False)
-            
-            c1, c2, c3 = st.columns(3)
-            c1.metric("Total de Candidatos", len(df_resultados))
-            c2.metric("Melhor Match Score", f"{df_resultados['match_score'].max():.2f}%")
-            c3.metric("Match Score Médio", f"{df_resultados['match_score'].mean():.2f}%")
-            
-            cols_ranking = ['nome', 'match_score', 'similitude_cv_vaga', 'anos_experiencia', 'email']
-            cols_ranking_existentes = [col for col in cols_ranking if col in df_resultados.columns]
-            
-            if cols_ranking_existentes:
-                st.dataframe(
-                    df_resultados[cols_ranking_existentes],
-                    use_container_width=True,
-                    column_config={
-                        "nome": st.column_config.TextColumn("Nome do Candidato", width="large"),
-                        "match_score": st.column_config.ProgressColumn("Match Score (%)", format="%.2f%%", min_value=0, max_value=100),
-                        "similitude_cv_vaga": st.column_config.NumberColumn("Similitude CV", format="%.2f"),
-                        "anos_experiencia": st.column_config.NumberColumn("Anos Exp.", format="%d anos"),
-                        "email": st.column_config.TextColumn("E-mail")
-                    },
-                    hide_index=True
-                )
-
-        with tab_otimiza_vaga:
-            st.header("🤖 Assistente de Otimização de Vaga")
-            st.markdown("A IA analisou os CVs dos candidatos com maior *match score* e sugere melhorias para a descrição da vaga.")
-            
-            common_skills, recommendations = gerar_recomendacoes_vaga(df_resultados)
-
-            st.markdown("---")
-            st.subheader("💡 Palavras-chave Recomendadas")
-            if recommendations:
-                st.success("Para atrair candidatos mais qualificados, considere adicionar as seguintes habilidades à descrição da vaga:")
-                cols_rec = st.columns(3)
-                for i, rec in enumerate(recommendations):
-                    with cols_rec[i % 3]:
-                        st.markdown(f"- **{rec}**")
-            else:
-                st.info("A descrição desta vaga já parece bem alinhada com as habilidades dos melhores candidatos. Bom trabalho!")
-
-            with st.expander("Ver lógica da IA"):
-                st.markdown("#### Como as recomendações foram geradas?")
-                st.write(f"1. A IA selecionou os **{max(1, int(len(df_resultados) * 0.20))} melhores candidatos** (top 20%) com base no *match score*.")
-                st.write("2. Analisou os CVs deste grupo e identificou as habilidades mais frequentes.")
-                st.code(f"Habilidades mais comuns no top 20%: {', '.join(common_skills[:5])}...")
-                st.write("3. Comparou essas habilidades com o texto da descrição da vaga atual.")
-                st.write("4. As sugestões acima são as habilidades frequentes nos melhores candidatos que **não** foram encontradas na sua descrição.")
-
-        with tab_otimiza_cv:
-            st.header(f"📄 Assistente de Otimização de CV para a vaga: **{vaga_selecionada}**")
-            st.markdown("Cole o texto do seu CV abaixo e a IA irá analisá-lo e sugerir melhorias.")
-            
-            cv_usuario = st.text_area("Cole o texto completo do seu CV aqui:", height=300, placeholder="Ex: Formação Acadêmica...")
-            
-            if st.button("Analisar meu CV", type="primary"):
-                if cv_usuario:
-                    lang_model = load_language_model()
-                    
-                    with st.spinner("Analisando seu CV..."):
-                        from sentence_transformers import util
-                        texto_vaga_completo = (str(df_filtrado_vaga['principais_atividades'].iloc[0]) + " " + str(df_filtrado_vaga['competencia_tecnicas_e_comportamentais'].iloc[0]))
-                        
-                        embedding_vaga = lang_model.encode(texto_vaga_completo, convert_to_tensor=True)
-                        embedding_cv = lang_model.encode(cv_usuario, convert_to_tensor=True)
-                        score_semantico = util.cos_sim(embedding_vaga, embedding_cv).item() * 100
-
-                        skills_list = [col.replace('skill_', '').replace('_', ' ') for col in model_columns if col.startswith('skill_')]
-                        habilidades_faltantes = []
-                        for skill in skills_list:
-                            if re.search(r'\b' + re.escape(skill) + r'\b', texto_vaga_completo, re.IGNORECASE) and not re.search(r'\b' + re.escape(skill) + r'\b', cv_usuario, re.IGNORECASE):
-                                habilidades_faltantes.append(skill.title())
-                                
-                    st.markdown("---")
-                    st.subheader("Resultados da Análise:")
-                    
-                    col_met, col_desc = st.columns(2)
-                    with col_met:
-                        st.metric("Score de Alinhamento Semântico", f"{score_semantico:.2f}%")
-                        st.progress(int(score_semantico))
-                    with col_desc:
-                        st.info("Este score mede o quão bem o seu CV 'soa' para esta vaga, com base no significado geral dos textos.")
-                    
-                    st.markdown("---")
-                    st.subheader("💡 Recomendações de Habilidades")
-                    if habilidades_faltantes:
-                        st.warning("Considere adicionar (se você as possui) as seguintes habilidades encontradas na descrição da vaga, mas que não foram detectadas em seu CV:")
-                        cols_skills = st.columns(4)
-                        for i, skill in enumerate(habilidades_faltantes[:12]):
-                            with cols_skills[i % 4]:
-                                st.markdown(f"- **{skill}**")
-                    else:
-                        st.success("Ótimo trabalho! Seu CV parece conter todas as habilidades chave mencionadas na descrição da vaga.")
-                else:
-                    st.error("Por favor, cole o texto do seu CV para análise.")
-else:
-    st.warning("A coluna 'titulo_vaga' não foi encontrada no dataset.")
\ No newline at end of file
+        return json.loads(texto)
+    except ValueError:
+        return texto
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dados', required=True, help="'gs://<bucket>' ou diretório com data/applicants.json, vagas.json e prospects.json.")
+    parser.add_argument('--cache', default=DIRETORIO_CACHE_PIPELINE_PADRAO)
+    parser.add_argument('--saida', default='.', help="Raiz onde models/ e data/ são gravados.")
+    parser.add_argument('--enviar', default=None, help="Envia os artefatos para este bucket (ex.: gs://<bucket>).")
+    parser.add_argument('--param', action='append', default=[], metavar='CHAVE=VALOR', help="Hiperparâmetro do XGBoost (repetível).")
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--paralelo', type=int, default=3, help="Etapas independentes executadas ao mesmo tempo.")
+    parser.add_argument('--processos-experiencia', type=int, default=None)
+    parser.add_argument('--sem-similaridade', action='store_true', help="Treina sem a feature de embeddings.")
+    parser.add_argument('--sem-indice', action='store_true', help="Não gera o índice de ranking.")
+    parser.add_argument('--percentual-top', type=float, default=None,
+                        help="Fração dos melhores candidatos usada nas recomendações de habilidades do índice (padrão 0.2).")
+    parser.add_argument('--forcar', nargs='*', default=[], metavar='ETAPA', help="Reexecuta estas etapas (e as que dependem delas) mesmo com cache.")
+    parser.add_argument('--instrumentar', action='store_true',
+                        help="Mede tempo, CPU, pico de RSS e linhas de cada sub-etapa e exporta para <cache>/instrumentacao.*")
+    parser.add_argument('--perfil', default=None, metavar='DIRETORIO', help="Grava um dump do cProfile por etapa executada.")
+    args = parser.parse_args()
+
+    parametros_xgboost = {}
+    for item in args.param:
+        chave, _, valor = item.partition('=')
+        parametros_xgboost[chave] = _valor_parametro(valor)
+
+    etapas = montar_etapas(args.dados, parametros_xgboost, test_size=args.test_size, seed=args.seed,
+                           com_similaridade=not args.sem_similaridade, com_indice=not args.sem_indice,
+                           processos_experiencia=args.processos_experiencia, raiz_saida=args.saida, enviar=args.enviar,
+                           percentual_top=args.percentual_top)
+    if args.instrumentar:
+        ativar()
+    inicio = time.perf_counter()
+    _, relatorio = executar_pipeline(etapas, args.cache, n_paralelo=args.paralelo, forcar=set(args.forcar),
+                                     diretorio_perfil=args.perfil)
+    imprimir_relatorio(relatorio, time.perf_counter() - inicio)
+    if args.instrumentar:
+        registro = Registro()
+        for linha in relatorio.values():
+            registro.incorporar(linha.get('medicoes', []), deslocamento=linha['inicio'])
+        registro.imprimir()
+        for caminho in registro.exportar(os.path.join(args.cache, 'instrumentacao')):
+            print(f"-> {caminho}")
+
+if __name__ == '__main__':
+    main()
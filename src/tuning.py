@@ -0,0 +1,299 @@
+# src/tuning.py
+"""Treino do XGBoost fora da memória, direto do Parquet, com busca de hiperparâmetros em k-fold.
+
+O df_mestre_preprocessado.parquet é lido em lotes (`iter_batches`, só as colunas que o
+codificador usa) e cada lote é codificado e entregue ao XGBoost por um `DataIter`: com
+`QuantileDMatrix` só a matriz já quantizada (1 byte por célula com max_bin <= 256) fica em
+memória, nunca a matriz float32 inteira; com `--memoria-externa` as páginas vão para o disco.
+
+A busca aleatória roda as tentativas em paralelo, cada uma num processo novo (o pico de
+memória medido é o da própria tentativa), com validação cruzada estratificada e early
+stopping em cada dobra. O melhor conjunto é retreinado com todas as linhas fora do teste e
+salvo como XGBClassifier em `models/`, compatível com o app, junto com precision/recall da
+classe "contratado" no teste e o log das tentativas (tempo e pico de memória de cada uma).
+
+Uso:
+    python -m src.tuning --dataset data/df_mestre_preprocessado.parquet --tentativas 20 --dobras 5 --processos 2
+    python -m src.tuning --dataset data/df_mestre_preprocessado.parquet --memoria-externa --tamanho-lote 20000
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import xgboost as xgb
+
+from src.artifacts import ARTEFATOS_APP
+from src.encoder import COLUNAS_CATEGORICAS, CodificadorFeatures
+
+COLUNA_ALVO = 'contratado'
+DOBRA_TESTE = -1
+PARAMETROS_BASE = {'objective': 'binary:logistic', 'eval_metric': 'aucpr', 'tree_method': 'hist'}
+# Primeira tentativa: os padrões do XGBoost usados no notebook (a busca nunca fica abaixo dele)
+PARAMETROS_INICIAIS = {'max_depth': 6, 'learning_rate': 0.3, 'min_child_weight': 1.0,
+                       'subsample': 1.0, 'colsample_bytree': 1.0, 'reg_lambda': 1.0}
+ESPACO_BUSCA = {
+    'max_depth': ('inteiro', 3, 10),
+    'learning_rate': ('log', 0.01, 0.3),
+    'min_child_weight': ('log', 1.0, 20.0),
+    'subsample': ('uniforme', 0.6, 1.0),
+    'colsample_bytree': ('uniforme', 0.5, 1.0),
+    'reg_lambda': ('log', 0.1, 10.0),
+}
+METRICAS_SELECAO = ('aucpr', 'f1', 'recall')
+
+def pico_memoria_mb():
+    """Pico de memória residente do processo atual (ru_maxrss vem em KB no Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+class IteradorParquet(xgb.DataIter):
+    """Entrega o Parquet ao XGBoost em lotes codificados, sem montar a matriz inteira.
+
+    Com `dobras`, só passam as linhas cuja dobra está em `incluir` (as dobras são indexadas
+    pela posição da linha no arquivo). Com `cache_prefix`, o DMatrix vira memória externa.
+    """
+
+    def __init__(self, caminho, codificador, tamanho_lote=50_000, dobras=None, incluir=None, cache_prefix=None):
+        super().__init__(cache_prefix=cache_prefix)
+        self.caminho = caminho
+        self.codificador = codificador
+        self.tamanho_lote = tamanho_lote
+        self.dobras = dobras
+        self.incluir = None if incluir is None else np.asarray(list(incluir))
+        self._colunas = codificador.colunas_entrada + [COLUNA_ALVO]
+        self._lotes = None
+
+    def reset(self):
+        self._lotes = None
+
+    def next(self, entrada):
+        if self._lotes is None:
+            self._lotes = pq.ParquetFile(self.caminho).iter_batches(batch_size=self.tamanho_lote, columns=self._colunas)
+            self._posicao = 0
+        for lote in self._lotes:
+            df = lote.to_pandas()
+            inicio, self._posicao = self._posicao, self._posicao + len(df)
+            if self.dobras is not None:
+                mascara = np.isin(self.dobras[inicio:self._posicao], self.incluir)
+                if not mascara.any():
+                    continue
+                df = df[mascara]
+            entrada(data=self.codificador.transform(df), label=df[COLUNA_ALVO].to_numpy(dtype=np.float32),
+                    feature_names=self.codificador.colunas)
+            return 1
+        return 0
+
+def ajustar_codificador(caminho, tamanho_lote=50_000):
+    """Ajusta o `CodificadorFeatures` lote a lote, lendo só as colunas de features."""
+    nomes = pq.read_schema(caminho).names
+    numericas = ['similitude_cv_vaga', 'anos_experiencia'] + [col for col in nomes if col.startswith('skill_')] + ['remuneracao']
+    colunas = [col for col in dict.fromkeys(numericas + COLUNAS_CATEGORICAS) if col in nomes]
+    lotes = pq.ParquetFile(caminho).iter_batches(batch_size=tamanho_lote, columns=colunas)
+    return CodificadorFeatures().fit_blocos(lote.to_pandas() for lote in lotes)
+
+def atribuir_dobras(y, n_dobras=5, test_size=0.2, seed=42):
+    """Dobra de cada linha (0..k-1), estratificada pelo alvo; o teste separado recebe DOBRA_TESTE."""
+    from sklearn.model_selection import StratifiedKFold, train_test_split
+    dobras = np.full(len(y), DOBRA_TESTE, dtype=np.int8)
+    linhas = np.arange(len(y))
+    if test_size:
+        linhas, _ = train_test_split(linhas, test_size=test_size, random_state=seed, stratify=y)
+    divisor = StratifiedKFold(n_splits=n_dobras, shuffle=True, random_state=seed)
+    for dobra, (_, validacao) in enumerate(divisor.split(linhas, y[linhas])):
+        dobras[linhas[validacao]] = dobra
+    return dobras
+
+def montar_matriz(caminho, codificador, dobras, incluir, max_bin=256, referencia=None, diretorio_cache=None, tamanho_lote=50_000):
+    """QuantileDMatrix (ou DMatrix em disco, com `diretorio_cache`) das linhas nas dobras `incluir`."""
+    if diretorio_cache:
+        iterador = IteradorParquet(caminho, codificador, tamanho_lote, dobras, incluir,
+                                   cache_prefix=os.path.join(diretorio_cache, f"dobras{'_'.join(map(str, incluir))}"))
+        return xgb.DMatrix(iterador)
+    iterador = IteradorParquet(caminho, codificador, tamanho_lote, dobras, incluir)
+    return xgb.QuantileDMatrix(iterador, max_bin=max_bin, ref=referencia)
+
+def sortear_parametros(rng, espaco=ESPACO_BUSCA):
+    parametros = {}
+    for nome, (tipo, minimo, maximo) in espaco.items():
+        if tipo == 'inteiro':
+            parametros[nome] = int(rng.integers(minimo, maximo + 1))
+        elif tipo == 'log':
+            parametros[nome] = round(float(np.exp(rng.uniform(np.log(minimo), np.log(maximo)))), 4)
+        else:
+            parametros[nome] = round(float(rng.uniform(minimo, maximo)), 4)
+    return parametros
+
+def _parametros_treino(parametros, y, max_bin, n_threads, seed):
+    """Parâmetros do `xgb.train`; scale_pos_weight = negativos / positivos das linhas de treino (notebook)."""
+    completos = {**PARAMETROS_BASE, 'max_bin': max_bin, 'nthread': n_threads, 'seed': seed, **parametros}
+    completos.setdefault('scale_pos_weight', float((y == 0).sum() / max((y == 1).sum(), 1)))
+    return completos
+
+def avaliar_tentativa(numero, parametros, config):
+    """Validação cruzada de um conjunto de hiperparâmetros (roda num processo do pool)."""
+    inicio, inicio_cpu = time.perf_counter(), time.process_time()
+    codificador = CodificadorFeatures.carregar(config['codificador'])
+    dobras = np.load(config['dobras'], mmap_mode='r')
+    y = np.load(config['alvo'], mmap_mode='r')
+    diretorio_cache = tempfile.mkdtemp(dir=config['diretorio_cache']) if config['diretorio_cache'] else None
+    aucpr, rodadas = [], []
+    verdadeiros_positivos = falsos_positivos = falsos_negativos = 0
+    try:
+        for dobra in range(config['n_dobras']):
+            treino = [d for d in range(config['n_dobras']) if d != dobra]
+            dtreino = montar_matriz(config['dataset'], codificador, dobras, treino, config['max_bin'],
+                                    diretorio_cache=diretorio_cache, tamanho_lote=config['tamanho_lote'])
+            dvalidacao = montar_matriz(config['dataset'], codificador, dobras, [dobra], config['max_bin'], referencia=dtreino,
+                                       diretorio_cache=diretorio_cache, tamanho_lote=config['tamanho_lote'])
+            y_treino = y[np.isin(dobras, treino)]
+            booster = xgb.train(_parametros_treino(parametros, y_treino, config['max_bin'], config['n_threads'], config['seed']),
+                                dtreino, num_boost_round=config['max_rodadas'], evals=[(dvalidacao, 'validacao')],
+                                early_stopping_rounds=config['paciencia'], verbose_eval=False)
+            previsto = booster.predict(dvalidacao, iteration_range=(0, booster.best_iteration + 1)) >= 0.5
+            real = dvalidacao.get_label() == 1
+            verdadeiros_positivos += int((previsto & real).sum())
+            falsos_positivos += int((previsto & ~real).sum())
+            falsos_negativos += int((~previsto & real).sum())
+            aucpr.append(float(booster.best_score))
+            rodadas.append(booster.best_iteration + 1)
+            del dtreino, dvalidacao, booster
+    finally:
+        if diretorio_cache:
+            shutil.rmtree(diretorio_cache, ignore_errors=True)
+
+    precision = verdadeiros_positivos / max(verdadeiros_positivos + falsos_positivos, 1)
+    recall = verdadeiros_positivos / max(verdadeiros_positivos + falsos_negativos, 1)
+    return {
+        'tentativa': numero, 'parametros': parametros,
+        'aucpr': float(np.mean(aucpr)), 'aucpr_dp': float(np.std(aucpr)),
+        'precision': precision, 'recall': recall, 'f1': 2 * precision * recall / max(precision + recall, 1e-12),
+        'rodadas': int(round(np.mean(rodadas))),
+        'segundos': time.perf_counter() - inicio, 'cpu_segundos': time.process_time() - inicio_cpu,
+        'pico_memoria_mb': pico_memoria_mb(),
+    }
+
+def buscar_hiperparametros(config, n_tentativas=20, n_processos=2, seed=42, caminho_log=None):
+    """Busca aleatória: `n_tentativas` conjuntos avaliados em paralelo; devolve os resultados por tentativa."""
+    rng = np.random.default_rng(seed)
+    candidatos = [dict(PARAMETROS_INICIAIS)] + [sortear_parametros(rng) for _ in range(n_tentativas - 1)]
+    resultados = []
+    print(f"-> {len(candidatos)} tentativas x {config['n_dobras']} dobras em {n_processos} processo(s)")
+    print(f"{'#':>3} | {'aucpr':>13} | {'precision':>9} | {'recall':>6} | {'rodadas':>7} | {'tempo':>7} | {'pico mem':>9} | parâmetros")
+    # Um processo novo por tentativa: o ru_maxrss medido no fim é o pico daquela tentativa
+    contexto = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=n_processos, mp_context=contexto, max_tasks_per_child=1) as executor:
+        futuros = [executor.submit(avaliar_tentativa, i, parametros, config) for i, parametros in enumerate(candidatos)]
+        for futuro in as_completed(futuros):
+            r = futuro.result()
+            resultados.append(r)
+            print(f"{r['tentativa']:>3} | {r['aucpr']:.4f}±{r['aucpr_dp']:.4f} | {r['precision']:>9.3f} | {r['recall']:>6.3f} | "
+                  f"{r['rodadas']:>7} | {r['segundos']:>6.1f}s | {r['pico_memoria_mb']:>6.0f} MB | {r['parametros']}")
+            if caminho_log:
+                with open(caminho_log, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(r, ensure_ascii=False) + '\n')
+    return sorted(resultados, key=lambda r: r['tentativa'])
+
+def treinar_final(config, parametros, n_rodadas, codificador, dobras, y):
+    """Retreina com todas as linhas fora do teste e devolve um XGBClassifier (o formato que o app carrega)."""
+    from xgboost import XGBClassifier
+    dtreino = montar_matriz(config['dataset'], codificador, dobras, range(config['n_dobras']), config['max_bin'], tamanho_lote=config['tamanho_lote'])
+    booster = xgb.train(_parametros_treino(parametros, y[dobras != DOBRA_TESTE], config['max_bin'], os.cpu_count(), config['seed']),
+                        dtreino, num_boost_round=n_rodadas)
+    model = XGBClassifier()
+    model.load_model(bytearray(booster.save_raw('json')))
+    return model, dtreino
+
+def avaliar_teste(config, model, codificador, dobras, referencia):
+    """Relatório de classificação no teste separado, como o metricas.json do pipeline de treino."""
+    from sklearn.metrics import classification_report, confusion_matrix
+    dteste = montar_matriz(config['dataset'], codificador, dobras, [DOBRA_TESTE], config['max_bin'],
+                           referencia=referencia, tamanho_lote=config['tamanho_lote'])
+    y_teste = dteste.get_label().astype(int)
+    y_pred = (model.get_booster().predict(dteste) >= 0.5).astype(int)
+    nomes = ['Não Contratado (0)', 'Contratado (1)']
+    print(classification_report(y_teste, y_pred, target_names=nomes, zero_division=0))
+    metricas = classification_report(y_teste, y_pred, target_names=nomes, output_dict=True, zero_division=0)
+    metricas['matriz_confusao'] = confusion_matrix(y_teste, y_pred, labels=[0, 1]).tolist()
+    return metricas
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dataset', default=ARTEFATOS_APP['dataset'])
+    parser.add_argument('--saida', default='.', help="Raiz onde models/ é gravado.")
+    parser.add_argument('--tentativas', type=int, default=20)
+    parser.add_argument('--dobras', type=int, default=5)
+    parser.add_argument('--processos', type=int, default=2, help="Tentativas avaliadas ao mesmo tempo.")
+    parser.add_argument('--threads', type=int, default=1, help="Threads do XGBoost por tentativa.")
+    parser.add_argument('--test-size', type=float, default=0.2, help="Fração separada para o teste final (0 = sem teste).")
+    parser.add_argument('--metrica', choices=METRICAS_SELECAO, default='aucpr', help="Métrica da validação cruzada que escolhe o melhor.")
+    parser.add_argument('--max-rodadas', type=int, default=1000)
+    parser.add_argument('--paciencia', type=int, default=50, help="Rodadas sem melhora no aucpr antes do early stopping.")
+    parser.add_argument('--max-bin', type=int, default=256)
+    parser.add_argument('--tamanho-lote', type=int, default=50_000, help="Linhas lidas do Parquet por lote.")
+    parser.add_argument('--memoria-externa', action='store_true', help="Páginas do DMatrix em disco em vez da QuantileDMatrix em memória.")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    diretorio_modelos = os.path.join(args.saida, os.path.dirname(ARTEFATOS_APP['modelo']))
+    os.makedirs(diretorio_modelos, exist_ok=True)
+    trabalho = tempfile.mkdtemp(prefix='busca_', dir=diretorio_modelos)
+    try:
+        inicio = time.perf_counter()
+        codificador = ajustar_codificador(args.dataset, args.tamanho_lote)
+        y = pq.read_table(args.dataset, columns=[COLUNA_ALVO])[COLUNA_ALVO].to_numpy().astype(np.int8)
+        dobras = atribuir_dobras(y, args.dobras, args.test_size, args.seed)
+        config = {
+            'dataset': args.dataset, 'codificador': os.path.join(trabalho, 'feature_encoder.joblib'),
+            'dobras': os.path.join(trabalho, 'dobras.npy'), 'alvo': os.path.join(trabalho, 'y.npy'),
+            'n_dobras': args.dobras, 'max_bin': args.max_bin, 'tamanho_lote': args.tamanho_lote,
+            'max_rodadas': args.max_rodadas, 'paciencia': args.paciencia, 'n_threads': args.threads, 'seed': args.seed,
+            'diretorio_cache': os.path.join(trabalho, 'paginas') if args.memoria_externa else None,
+        }
+        codificador.salvar(config['codificador'])
+        np.save(config['dobras'], dobras)
+        np.save(config['alvo'], y)
+        if config['diretorio_cache']:
+            os.makedirs(config['diretorio_cache'])
+        print(f"-> {len(y)} linhas, {len(codificador)} features, {int(y.sum())} contratados; "
+              f"teste: {int((dobras == DOBRA_TESTE).sum())} linhas")
+
+        caminho_log = os.path.join(diretorio_modelos, 'busca_tentativas.jsonl')
+        if os.path.exists(caminho_log):
+            os.remove(caminho_log)
+        resultados = buscar_hiperparametros(config, args.tentativas, args.processos, args.seed, caminho_log)
+        melhor = max(resultados, key=lambda r: r[args.metrica])
+        print(f"\n-> Melhor tentativa: #{melhor['tentativa']} ({args.metrica}={melhor[args.metrica]:.4f}), "
+              f"{melhor['rodadas']} rodadas: {melhor['parametros']}")
+
+        model, dtreino = treinar_final(config, melhor['parametros'], melhor['rodadas'], codificador, dobras, y)
+        metricas_teste = avaliar_teste(config, model, codificador, dobras, dtreino) if args.test_size else None
+        del dtreino
+    finally:
+        shutil.rmtree(trabalho, ignore_errors=True)
+
+    joblib.dump(model, os.path.join(args.saida, ARTEFATOS_APP['modelo']))
+    codificador.salvar(os.path.join(args.saida, ARTEFATOS_APP['codificador']))
+    joblib.dump(pd.Index(codificador.colunas), os.path.join(args.saida, ARTEFATOS_APP['colunas']))
+    resumo = {
+        'melhor': melhor, 'metrica_selecao': args.metrica, 'teste': metricas_teste,
+        'contratado': metricas_teste['Contratado (1)'] if metricas_teste else
+                      {'precision': melhor['precision'], 'recall': melhor['recall'], 'f1-score': melhor['f1']},
+        'tentativas': resultados, 'segundos_total': time.perf_counter() - inicio,
+    }
+    with open(os.path.join(diretorio_modelos, 'busca_hiperparametros.json'), 'w', encoding='utf-8') as f:
+        json.dump(resumo, f, ensure_ascii=False, indent=2)
+    print(f"-> Modelo salvo em {os.path.join(args.saida, ARTEFATOS_APP['modelo'])} "
+          f"(contratado: precision {resumo['contratado']['precision']:.3f}, recall {resumo['contratado']['recall']:.3f}) "
+          f"em {resumo['segundos_total']:.1f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,6 @@
+# tests/conftest.py
+import os
+import sys
+
+# Mesmo esquema dos scripts: `src` e `benchmarks` importados a partir da raiz do repositório
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -0,0 +1,21 @@
+# tests/test_codificador.py
+"""`CodificadorFeatures`: matriz densa e CSR iguais, inclusive com a instrumentação ligada."""
+import numpy as np
+import pytest
+
+from src.encoder import CodificadorFeatures
+from src.instrumentation import novo_registro
+from benchmarks.dados_sinteticos import gerar_df_mestre
+
+@pytest.mark.parametrize('ativo', [False, True])
+def test_esparso_igual_ao_denso(ativo):
+    registro = novo_registro(ativo=ativo)
+    try:
+        df = gerar_df_mestre(500, 10)
+        codificador = CodificadorFeatures()
+        esparsa = codificador.fit_transform(df, esparso=True)
+        np.testing.assert_array_equal(esparsa.toarray(), codificador.transform(df))
+    finally:
+        novo_registro()
+    if ativo:
+        assert [m['linhas'] for m in registro.medicoes if m['nome'] == 'codificar'] == [len(df), len(df)]
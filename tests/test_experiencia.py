@@ -0,0 +1,31 @@
+# tests/test_experiencia.py
+"""`calcular_experiencia_lote` contra o `calcular_experiencia` aplicado CV a CV."""
+import numpy as np
+import pytest
+
+from src.feature_engineering import calcular_experiencia, calcular_experiencia_lote
+from benchmarks.dados_sinteticos import gerar_cvs
+
+CVS = gerar_cvs(300, mediana=800) + [
+    '',
+    None,
+    'Analista 01/2015 – 12/2018; Desenvolvedor 2017 – atual',
+    'Janeiro de 2010 – 2012 e 2011 – 2013 (sobreposto)',
+    'Período inválido 2020 – 2018',
+]
+
+@pytest.mark.parametrize('mesclar', [False, True])
+def test_lote_igual_ao_calculo_por_cv(mesclar):
+    esperado = np.array([calcular_experiencia(cv, mesclar_sobreposicoes=mesclar) for cv in CVS], dtype=np.float32)
+    obtido = calcular_experiencia_lote(CVS, n_processos=1, tamanho_bloco=64, mesclar_sobreposicoes=mesclar)
+    np.testing.assert_array_equal(obtido, esperado)
+
+def test_lote_independe_do_numero_de_processos():
+    um = calcular_experiencia_lote(CVS, n_processos=1, tamanho_bloco=64)
+    dois = calcular_experiencia_lote(CVS, n_processos=2, tamanho_bloco=64)
+    np.testing.assert_array_equal(um, dois)
+
+def test_mesclar_nao_conta_periodo_sobreposto_duas_vezes():
+    cv = 'Analista: 2010 – 2014.\nConsultor: 2012 – 2016.'
+    assert calcular_experiencia(cv) == 8.0
+    assert calcular_experiencia(cv, mesclar_sobreposicoes=True) == 6.0
@@ -0,0 +1,67 @@
+# tests/test_incremental.py
+"""df_mestre incremental (particionado por vaga_id) contra a construção completa com `unir_dados`."""
+import json
+import os
+
+import pandas as pd
+
+from src.incremental import construir_df_mestre_incremental, ler_df_mestre
+from src.preprocessing import converter_dados_brutos, unir_dados
+from benchmarks.dados_sinteticos import gerar_dados
+
+def sem_features(df):
+    return df
+
+def construir_completo(diretorio_dados, diretorio_trabalho):
+    caminhos = converter_dados_brutos(diretorio_dados, diretorio_trabalho)
+    return unir_dados(*[pd.read_parquet(caminhos[nome]) for nome in ('applicants', 'prospects', 'vagas')])
+
+def normalizar(df):
+    return (df[sorted(df.columns)].astype({'vaga_id': str})
+            .sort_values(['vaga_id', 'codigo_profissional', 'data_candidatura']).reset_index(drop=True))
+
+def assert_igual_ao_completo(diretorio_dados, caminho_saida, tmp_path):
+    completo = construir_completo(diretorio_dados, str(tmp_path / 'completo'))
+    pd.testing.assert_frame_equal(normalizar(ler_df_mestre(caminho_saida)), normalizar(completo))
+
+def ler_json(diretorio, nome):
+    with open(os.path.join(diretorio, 'data', f'{nome}.json'), encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+def gravar_json(diretorio, nome, objeto):
+    with open(os.path.join(diretorio, 'data', f'{nome}.json'), 'w', encoding='utf-8') as arquivo:
+        json.dump(objeto, arquivo, ensure_ascii=False, indent=4)
+
+def test_incremental_igual_a_construcao_completa(tmp_path):
+    dados = str(tmp_path / 'bucket')
+    gerar_dados(dados, 90, mediana_cv=300)
+    saida, estado = str(tmp_path / 'df_mestre'), str(tmp_path / 'estado')
+    construir = lambda: construir_df_mestre_incremental(dados, saida, estado, funcao_features=sem_features, tamanho_lote=16)
+
+    assert len(construir()) == len(ler_json(dados, 'vagas'))
+    assert_igual_ao_completo(dados, saida, tmp_path)
+    # Nada mudou: os JSON nem são lidos
+    assert construir() == set()
+
+    applicants, vagas, prospects = (ler_json(dados, nome) for nome in ('applicants', 'vagas', 'prospects'))
+    # Nenhuma alteração toca a 1ª partição (a que o Arrow usaria para inferir o schema)
+    primeira = min(prospects)
+    ids_vagas = sorted(set(prospects) - {primeira}, key=lambda vaga: len(prospects[vaga]['prospects']), reverse=True)
+    # Candidato editado no lugar, com um campo que ainda não existia, e vaga com texto alterado
+    codigos_primeira = {p['codigo'] for p in prospects[primeira]['prospects']}
+    editado = next(p['codigo'] for vaga in ids_vagas for p in prospects[vaga]['prospects'] if p['codigo'] not in codigos_primeira)
+    applicants[editado]['cv_pt'] = 'CV atualizado 2015 – 2020 python'
+    applicants[editado]['informacoes_profissionais']['campo_novo'] = 'valor'
+    vagas[ids_vagas[1]]['perfil_vaga']['principais_atividades'] = 'Atividades novas'
+    # Candidato e candidatura novos, candidatura removida e vaga removida
+    applicants['novo'] = applicants[editado] | {'infos_basicas': {**applicants[editado]['infos_basicas'], 'codigo_profissional': 'novo'}}
+    prospects[ids_vagas[2]]['prospects'].append({**prospects[ids_vagas[2]]['prospects'][0], 'codigo': 'novo'})
+    prospects[ids_vagas[3]]['prospects'].pop()
+    del vagas[ids_vagas[4]], prospects[ids_vagas[4]]
+    for nome, objeto in (('applicants', applicants), ('vagas', vagas), ('prospects', prospects)):
+        gravar_json(dados, nome, objeto)
+
+    afetadas = construir()
+    vagas_do_editado = {vaga for vaga, dados_vaga in prospects.items() if any(p['codigo'] == editado for p in dados_vaga['prospects'])}
+    assert afetadas == vagas_do_editado | set(ids_vagas[1:5])
+    assert_igual_ao_completo(dados, saida, tmp_path)
@@ -0,0 +1,48 @@
+# tests/test_preprocessing.py
+"""Leitura em streaming dos JSON brutos e conversão em lotes para Parquet."""
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from src.preprocessing import achatar_prospects, converter_json_para_parquet, iterar_objeto_json
+
+OBJETO = {
+    '1': {'texto': 'aspas \" e barra \\\\ e unicode: ação – 🚀', 'numero': 12345, 'lista': [1.5, None, True], 'vazio': {}},
+    '2': {'aninhado': {'a': {'b': 'c'}}, 'numero': -0.25e3},
+    'três': 7,
+    '4': {},
+}
+
+@pytest.mark.parametrize('tamanho_leitura', [1, 3, 7, 1 << 20])
+@pytest.mark.parametrize('indent', [None, 4])
+def test_iterar_objeto_json_igual_ao_json_load(tamanho_leitura, indent):
+    texto = json.dumps(OBJETO, ensure_ascii=False, indent=indent)
+    assert dict(iterar_objeto_json(io.StringIO(texto), tamanho_leitura)) == OBJETO
+
+def test_iterar_objeto_json_vazio_e_invalido():
+    assert list(iterar_objeto_json(io.StringIO(' {} '))) == []
+    with pytest.raises(ValueError):
+        list(iterar_objeto_json(io.StringIO('[1, 2]')))
+
+def achatar_simples(chave, valor):
+    return [{'id': chave, **valor}]
+
+def test_colunas_que_aparecem_em_lotes_posteriores_sao_mantidas(tmp_path):
+    # Lotes de 2 registros: 'b' aparece no 2º lote e 'c' só no último
+    registros = {'1': {'a': 'x'}, '2': {'a': 'y'}, '3': {'a': 'z', 'b': 1}, '4': {}, '5': {'c': [1, 2]}}
+    caminho_json = tmp_path / 'dados.json'
+    caminho_json.write_text(json.dumps(registros), encoding='utf-8')
+    caminho_parquet = str(tmp_path / 'dados.parquet')
+
+    linhas = converter_json_para_parquet(str(caminho_json), caminho_parquet, achatar_simples, tamanho_lote=2)
+    assert linhas == 5
+    esperado = pd.DataFrame({'id': ['1', '2', '3', '4', '5'], 'a': ['x', 'y', 'z', None, None],
+                             'b': [None, None, '1', None, None], 'c': [None, None, None, None, '[1, 2]']})
+    pd.testing.assert_frame_equal(pd.read_parquet(caminho_parquet), esperado)
+    assert not list(tmp_path.glob('*.tmp'))
+
+def test_prospect_sem_codigo_e_ignorado():
+    vaga = {'titulo': 'Vaga', 'prospects': [{'codigo': '10', 'nome': 'A'}, {'nome': 'B'}, {'codigo': '', 'nome': 'C'}]}
+    assert [registro['codigo_profissional'] for registro in achatar_prospects('1', vaga)] == ['10']
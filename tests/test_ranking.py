@@ -0,0 +1,84 @@
+# tests/test_ranking.py
+"""Atualização incremental do índice de ranking contra a reconstrução completa."""
+import pandas as pd
+import pytest
+from xgboost import XGBClassifier
+
+from src.app_dataset import DatasetApp
+from src.encoder import CodificadorFeatures
+from src.ranking import IndiceRanking, atualizar_indice_ranking, construir_indice_ranking, obter_ranking
+from benchmarks.dados_sinteticos import gerar_df_mestre
+
+@pytest.fixture(scope='module')
+def treinado():
+    df = gerar_df_mestre(3000, 40).assign(codigo_profissional=lambda d: d.index.astype(str))
+    codificador = CodificadorFeatures().fit(df)
+    model = XGBClassifier(n_estimators=20, max_depth=4, tree_method='hist').fit(codificador.to_dataframe(df), df['contratado'])
+    return df, model, codificador
+
+def assert_indices_iguais(caminho_incremental, caminho_completo):
+    incremental, completo = IndiceRanking(caminho_incremental), IndiceRanking(caminho_completo)
+    assert sorted(incremental.vagas()) == sorted(completo.vagas())
+    assert incremental.explicacoes == completo.explicacoes
+    for vaga in completo.vagas():
+        pd.testing.assert_frame_equal(incremental.ranking(vaga), completo.ranking(vaga))
+        assert incremental.recomendacoes(vaga) == completo.recomendacoes(vaga)
+
+def test_incremental_igual_a_reconstrucao(treinado, tmp_path):
+    df, model, codificador = treinado
+    caminho = str(tmp_path / 'incremental.arrow')
+    construir_indice_ranking(df, model, codificador, caminho)
+
+    # Candidaturas novas em duas vagas, uma candidatura removida de outra, uma vaga inteira
+    # removida e, sem mudar as candidaturas, um candidato e um texto de vaga alterados no lugar
+    novas = df[df['titulo_vaga'].isin(['Vaga 1', 'Vaga 2'])].sample(frac=0.5, random_state=0)
+    novas = novas.assign(codigo_profissional='novo' + novas.index.astype(str))
+    removida = df.index[df['titulo_vaga'] == 'Vaga 3'][0]
+    df_atualizado = pd.concat([df.drop(index=removida)[lambda d: d['titulo_vaga'] != 'Vaga 4'], novas], ignore_index=True)
+    df_atualizado.loc[df_atualizado.index[df_atualizado['titulo_vaga'] == 'Vaga 5'][0], 'anos_experiencia'] += 10
+    df_atualizado.loc[df_atualizado['titulo_vaga'] == 'Vaga 6', 'principais_atividades'] = 'Atividades com python e docker'
+
+    alteradas = atualizar_indice_ranking(df_atualizado, model, codificador, caminho)
+    assert alteradas == {'Vaga 1', 'Vaga 2', 'Vaga 3', 'Vaga 4', 'Vaga 5', 'Vaga 6'}
+    assert atualizar_indice_ranking(df_atualizado, model, codificador, caminho) == set()
+    construir_indice_ranking(df_atualizado, model, codificador, str(tmp_path / 'completo.arrow'))
+    assert_indices_iguais(caminho, str(tmp_path / 'completo.arrow'))
+
+def test_so_remocao_de_vaga_mantem_valor_base(treinado, tmp_path):
+    df, model, codificador = treinado
+    caminho = str(tmp_path / 'incremental.arrow')
+    construir_indice_ranking(df, model, codificador, caminho)
+    valor_base = IndiceRanking(caminho).explicacoes['valor_base']
+
+    df_atualizado = df[df['titulo_vaga'] != 'Vaga 0']
+    assert atualizar_indice_ranking(df_atualizado, model, codificador, caminho) == {'Vaga 0'}
+    assert IndiceRanking(caminho).explicacoes['valor_base'] == valor_base
+    construir_indice_ranking(df_atualizado, model, codificador, str(tmp_path / 'completo.arrow'))
+    assert_indices_iguais(caminho, str(tmp_path / 'completo.arrow'))
+
+def test_contagens_de_skills_nao_dao_a_volta(treinado, tmp_path):
+    df, model, codificador = treinado
+    df = df.copy()
+    df.loc[df['titulo_vaga'] == 'Vaga 0', 'skill_python'] = [256, 300] + [0] * (int((df['titulo_vaga'] == 'Vaga 0').sum()) - 2)
+    caminho = str(tmp_path / 'indice.arrow')
+    construir_indice_ranking(df, model, codificador, caminho, top_k_explicacoes=0)
+    assert sorted(IndiceRanking(caminho).ranking('Vaga 0')['skill_python'])[-2:] == [256, 300]
+
+def test_troca_de_candidatura_com_mesma_contagem_vai_para_o_online(treinado, tmp_path):
+    df, model, codificador = treinado
+    caminho = str(tmp_path / 'indice.arrow')
+    construir_indice_ranking(df, model, codificador, caminho, top_k_explicacoes=0)
+    indice = IndiceRanking(caminho)
+
+    # Uma candidatura entra e outra sai da Vaga 1: a contagem não muda
+    df_atualizado = df.copy()
+    df_atualizado.loc[df_atualizado.index[df_atualizado['titulo_vaga'] == 'Vaga 1'][0], 'codigo_profissional'] = 'novo'
+    dataset = DatasetApp.de_dataframe(df_atualizado, codificador)
+    assert dataset.contagem('Vaga 1') == indice.contagem('Vaga 1')
+
+    def obter(vaga):
+        return obter_ranking(vaga, indice, lambda: dataset.candidaturas_da_vaga(vaga), model, codificador,
+                             assinatura=dataset.assinatura(vaga))
+    df_vaga, veio_do_indice = obter('Vaga 1')
+    assert not veio_do_indice and 'novo' in set(df_vaga['codigo_profissional'])
+    assert obter('Vaga 2')[1]
@@ -0,0 +1,31 @@
+# tests/test_score.py
+"""Retomada da pontuação em lote: parciais só valem para as mesmas entradas."""
+import os
+
+import pandas as pd
+import pytest
+
+from src.score import ExecucaoRetomavel, versao_entrada
+
+def parametros(caminho):
+    return {'entradas': [{'caminho': caminho, 'versao': versao_entrada(caminho)}], 'top_k': 10}
+
+def test_entrada_regerada_no_mesmo_caminho_nao_retoma(tmp_path):
+    caminho = str(tmp_path / 'df_mestre.parquet')
+    pd.DataFrame({'vaga_id': ['1', '2']}).to_parquet(caminho)
+    ExecucaoRetomavel(str(tmp_path / 'parciais'), parametros(caminho))
+    # Mesma entrada: retoma
+    ExecucaoRetomavel(str(tmp_path / 'parciais'), parametros(caminho))
+
+    pd.DataFrame({'vaga_id': ['1', '2', '3']}).to_parquet(caminho)
+    with pytest.raises(ValueError, match='--reiniciar'):
+        ExecucaoRetomavel(str(tmp_path / 'parciais'), parametros(caminho))
+    ExecucaoRetomavel(str(tmp_path / 'parciais'), parametros(caminho), reiniciar=True)
+
+def test_versao_de_diretorio_particionado_muda_com_uma_particao(tmp_path):
+    for vaga in ('1', '2'):
+        os.makedirs(tmp_path / f'vaga_id={vaga}')
+        pd.DataFrame({'x': [1]}).to_parquet(tmp_path / f'vaga_id={vaga}' / 'parte-0.parquet')
+    antes = versao_entrada(str(tmp_path))
+    pd.DataFrame({'x': [1, 2]}).to_parquet(tmp_path / 'vaga_id=2' / 'parte-0.parquet')
+    assert versao_entrada(str(tmp_path)) != antes
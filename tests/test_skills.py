@@ -0,0 +1,50 @@
+# tests/test_skills.py
+"""`ExtratorSkills` contra a contagem antiga (um `str.count` por habilidade)."""
+import random
+import re
+
+import pandas as pd
+
+from src.feature_engineering import ExtratorSkills, SKILLS_PADRAO, nome_coluna_skill
+
+def contar_antigo(serie, vocabulario):
+    return {nome_coluna_skill(skill): serie.str.count(skill, flags=re.IGNORECASE).fillna(0).astype(int) for skill in vocabulario}
+
+def contar_palavra_inteira(serie, vocabulario):
+    """Referência com a regra do extrator: uma regex de palavra inteira por habilidade."""
+    return {nome_coluna_skill(skill): serie.map(lambda texto: len(re.findall(r'(?<!\w)' + re.escape(skill) + r'(?!\w)', texto, re.IGNORECASE))
+                                                if isinstance(texto, str) else 0)
+            for skill in vocabulario}
+
+def gerar_textos(vocabulario, n=200, seed=0):
+    rng = random.Random(seed)
+    palavras = "experiência desenvolvimento sistemas projetos equipe cliente análise suporte dados".split()
+    textos = [' '.join(rng.choice(vocabulario).upper() if rng.random() < 0.1 else
+                       rng.choice(vocabulario) if rng.random() < 0.2 else rng.choice(palavras)
+                       for _ in range(rng.randint(20, 120)))
+              for _ in range(n)]
+    return textos + ['', None]
+
+def para_dataframe(matriz, extrator):
+    return pd.DataFrame(matriz.toarray(), columns=extrator.colunas)
+
+def test_igual_ao_str_count_quando_nenhuma_skill_contem_outra():
+    # Sem termos contidos em outros ('java' em 'javascript') nem metacaracteres de regex
+    # (o `str.count` lia '.net' como regex), as duas regras coincidem
+    vocabulario = [skill for skill in SKILLS_PADRAO
+                   if re.fullmatch(r'[\w ]+', skill) and not any(skill != outra and skill in outra for outra in SKILLS_PADRAO)]
+    serie = pd.Series(gerar_textos(vocabulario))
+    extrator = ExtratorSkills(vocabulario)
+    obtido = para_dataframe(extrator.contar(serie.tolist()), extrator)
+    pd.testing.assert_frame_equal(obtido, pd.DataFrame(contar_antigo(serie, vocabulario)), check_dtype=False)
+
+def test_igual_a_regex_de_palavra_inteira_com_vocabulario_padrao():
+    serie = pd.Series(gerar_textos(SKILLS_PADRAO, seed=1) + ['JavaScript, Java e API REST; .NET/C# com api'])
+    extrator = ExtratorSkills()
+    obtido = para_dataframe(extrator.contar(serie.tolist()), extrator)
+    pd.testing.assert_frame_equal(obtido, pd.DataFrame(contar_palavra_inteira(serie, SKILLS_PADRAO)), check_dtype=False)
+
+def test_java_nao_conta_dentro_de_javascript():
+    extrator = ExtratorSkills(['java', 'javascript', 'api', 'api rest'])
+    contagem = dict(zip(extrator.skills, extrator.contar(['javascript e java; API REST']).toarray()[0]))
+    assert contagem == {'java': 1, 'javascript': 1, 'api': 1, 'api rest': 1}